@@ -0,0 +1,21 @@
+from fastapi import Request
+from app.database.database_manager import DBManager
+from app.database.async_database_manager import AsyncDBManager
+from app.scraper.ScrapeJobs import ScrapeJobQueue
+
+# One DBManager (and so one "api" connection pool) for blocking callers
+_db = DBManager(pool_name="api")
+
+
+def get_db() -> DBManager:
+    return _db
+
+
+def get_async_db(request: Request) -> AsyncDBManager:
+    """The AsyncDBManager opened by the application lifespan"""
+    return request.app.state.db
+
+
+def get_scrape_jobs(request: Request) -> ScrapeJobQueue:
+    """The scrape job queue started by the application lifespan"""
+    return request.app.state.scrape_jobs
@@ -1,15 +1,17 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from typing import List
-from app.database.database_manager import DBManager
+from app.api.dependencies import get_async_db
+from app.database.async_database_manager import AsyncDBManager, DatabaseUnavailable
 from app.model.schemas import Category
 
 router = APIRouter()
-db = DBManager()
 
 @router.get("/categories", response_model=List[Category])
-async def get_categories():
+async def get_categories(db: AsyncDBManager = Depends(get_async_db)):
     try:
-        categories = db.get_all_categories()
+        categories = await db.get_all_categories()
         return categories
+    except DatabaseUnavailable:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching categories: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error fetching categories: {str(e)}")
@@ -1,13 +1,19 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List
-from app.database.database_manager import DBManager
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
+from app.api.dependencies import get_async_db
+from app.database.async_database_manager import AsyncDBManager
 from app.model.schemas import Product
 
 router = APIRouter()
-db = DBManager()
 
 @router.get("/best-deals", response_model=List[Product])
-async def get_best_deals(limit: int = Query(10, ge=1, le=50)):
+async def get_best_deals(
+    limit: int = Query(10, ge=1, le=50),
+    category_id: Optional[int] = Query(None, description="Only deals of this category"),
+    min_discount: Optional[float] = Query(None, ge=0, le=100, description="Minimum discount percentage"),
+    min_rating: Optional[float] = Query(None, ge=0, le=5, description="Minimum rating"),
+    db: AsyncDBManager = Depends(get_async_db)
+):
     
-    deals = db.get_best_deals(limit=limit)
-    return deals
\ No newline at end of file
+    deals = await db.get_best_deals(limit=limit, category_id=category_id, min_discount=min_discount, min_rating=min_rating)
+    return deals
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional
-from app.database.database_manager import DBManager
-from app.model.schemas import Product, ProductResponse
+from app.api.dependencies import get_async_db
+from app.database.async_database_manager import AsyncDBManager, DatabaseUnavailable
+from app.model.schemas import PriceHistoryResponse, Product, ProductResponse
 
 router = APIRouter()
-db = DBManager()
 
 @router.get("/products", response_model=ProductResponse)
 async def get_products(
@@ -16,12 +17,15 @@ async def get_products(
     min_rating: Optional[float] = Query(None, ge=0, le=5, description="Minimum rating"),
     sort_by: str = Query("id", description="Sort by field (id, price, discount_percent, rating)"),
     sort_order: str = Query("DESC", description="Sort order (ASC, DESC)"),
-    page: int = Query(1, ge=1, description="Page number"),
-    limit: int = Query(10, ge=1, le=100, description="Items per page")
+    page: int = Query(1, ge=1, description="Page number (ignored when a cursor is given)"),
+    limit: int = Query(10, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous response, for keyset paging"),
+    count_mode: str = Query("exact", pattern="^(exact|estimate|capped)$", description="How to compute total (exact, estimate, capped)"),
+    db: AsyncDBManager = Depends(get_async_db)
 ):
     try:
         offset = (page - 1) * limit
-        products, total_count = db.get_products(
+        products, total_count, next_cursor, total_is_exact = await db.get_products(
             category_id=category_id,
             brand=brand,
             min_price=min_price,
@@ -31,7 +35,9 @@ async def get_products(
             sort_by=sort_by,
             sort_order=sort_order,
             limit=limit,
-            offset=offset
+            offset=offset,
+            cursor=cursor,
+            count_mode=count_mode
         )
         
         total_pages = (total_count + limit - 1) // limit
@@ -39,16 +45,22 @@ async def get_products(
         return ProductResponse(
             products=products,
             total=total_count,
-            page=page,
+            total_is_exact=total_is_exact,
+            page=None if cursor else page,
             limit=limit,
-            total_pages=total_pages
+            total_pages=total_pages,
+            next_cursor=next_cursor
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except DatabaseUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching products: {str(e)}")
 
 @router.get("/products/{product_id}", response_model=Product)
-async def get_product(product_id: int):
-    product = db.get_product_by_id(product_id)
+async def get_product(product_id: int, db: AsyncDBManager = Depends(get_async_db)):
+    product = await db.get_product_by_id(product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     return product
@@ -56,3 +68,25 @@ async def get_product(product_id: int):
 
     
     
+
+
+@router.get("/products/{product_id}/history", response_model=PriceHistoryResponse)
+async def get_product_history(
+    product_id: int,
+    start: Optional[datetime] = Query(None, description="Start of the range (default: 90 days before end)"),
+    end: Optional[datetime] = Query(None, description="End of the range (default: now)"),
+    bucket: str = Query("day", pattern="^(raw|day|week|month)$", description="Downsampling (raw, day, week, month)"),
+    db: AsyncDBManager = Depends(get_async_db)
+):
+    # Naive timestamps are taken as UTC, like the daily buckets
+    end = end or datetime.now(timezone.utc)
+    end = end if end.tzinfo else end.replace(tzinfo=timezone.utc)
+    start = start or end - timedelta(days=90)
+    start = start if start.tzinfo else start.replace(tzinfo=timezone.utc)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+
+    points = await db.get_price_history(product_id, start, end, bucket)
+    if not points and not await db.get_product_by_id(product_id):
+        raise HTTPException(status_code=404, detail="Product not found")
+    return PriceHistoryResponse(product_id=product_id, bucket=bucket, start=start, end=end, points=points)
@@ -1,19 +1,24 @@
-from fastapi import APIRouter, HTTPException
-
-from app.scraper.amazon_scraper import AmazonScraper  # Make sure this import matches your scraper
+from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from app.api.dependencies import get_scrape_jobs
+from app.model.schemas import ScrapeJobStatus, ScrapeRequest
+from app.scraper.ScrapeJobs import ScrapeJobQueue
 
 router = APIRouter()
 
-@router.post("/scrape")
-def scrape_products():  
-    """Synchronous endpoint for synchronous scraping"""
-    try:
-        scraper = AmazonScraper()
-        result = scraper.run_full_scraping(max_categories=3, max_subcategories=5, max_products=10)  
-        
-        return {
-            "message": f"Scraping completed! Added {result} products",
-            "status": "success"
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error during scraping: {str(e)}")
\ No newline at end of file
+@router.post("/scrape", response_model=ScrapeJobStatus, status_code=202)
+def scrape_products(params: Optional[ScrapeRequest] = None, jobs: ScrapeJobQueue = Depends(get_scrape_jobs)):
+    """Queue a scraping run; an identical queued or running run is reused instead"""
+    job, _ = jobs.submit((params or ScrapeRequest()).model_dump())
+    return job.to_dict()
+
+@router.get("/scrape", response_model=List[ScrapeJobStatus])
+def list_scrape_jobs(jobs: ScrapeJobQueue = Depends(get_scrape_jobs)):
+    return [job.to_dict() for job in jobs.jobs()]
+
+@router.get("/scrape/{job_id}", response_model=ScrapeJobStatus)
+def get_scrape_job(job_id: str, jobs: ScrapeJobQueue = Depends(get_scrape_jobs)):
+    job = jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Scrape job not found")
+    return job.to_dict()
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends, Request
+from app.api.dependencies import get_async_db
+from app.database.async_database_manager import AsyncDBManager
+from app.api.response_cache import response_cache
+from app.database.count_cache import count_cache
+from app.database.pool import pool_stats
+
+router = APIRouter()
+
+@router.get("/stats/db")
+async def get_db_stats(db: AsyncDBManager = Depends(get_async_db)):
+    """Connection pool stats (checked out connections, wait times, connections created) and count cache hit rate"""
+    return {"async": db.pool_stats(), "sync": pool_stats(), "count_cache": count_cache.stats()}
+
+@router.get("/stats/cache")
+async def get_cache_stats(request: Request):
+    """Response cache hit/miss and 304 counters, and ingest events received from other processes"""
+    return dict(response_cache.stats(), ingest_listener=request.app.state.ingest_listener.stats())
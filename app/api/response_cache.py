@@ -0,0 +1,131 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+from app.utils import ingest_generation
+
+# GET paths whose responses only change when new data is ingested
+CACHED_PATHS = ("/api/categories", "/api/best-deals", "/api/products")
+
+
+class _CachedResponse:
+    def __init__(self, body: bytes, media_type: str, generation: int):
+        self.body = body
+        self.media_type = media_type
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        self.generation = generation
+        self.stored_at = time.monotonic()
+
+
+class ResponseCache:
+    """LRU of serialized JSON responses keyed by path and normalized query.
+
+    Entries die when the ingest generation moves on, after `ttl_seconds`, or
+    when more than `max_entries` are stored.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple, _CachedResponse]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(request: Request) -> Tuple:
+        """Path plus query parameters sorted, with empty values dropped"""
+        params = sorted((k, v) for k, v in request.query_params.multi_items() if v != "")
+        return (request.url.path, tuple(params))
+
+    def get(self, key: Tuple) -> Optional[_CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (
+                entry.generation != ingest_generation.current()
+                or time.monotonic() - entry.stored_at > self.ttl_seconds
+            ):
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Tuple, entry: _CachedResponse):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def count_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "not_modified": self.not_modified,
+                "evictions": self.evictions,
+                "generation": ingest_generation.current(),
+            }
+
+
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("RESPONSE_CACHE_ENTRIES", 512)),
+    ttl_seconds=float(os.getenv("RESPONSE_CACHE_TTL", 300)),
+)
+
+
+class ResponseCacheMiddleware(BaseHTTPMiddleware):
+    """Serves cached GET responses for CACHED_PATHS and answers If-None-Match with 304"""
+
+    def __init__(self, app, cache: ResponseCache = response_cache, paths=CACHED_PATHS):
+        super().__init__(app)
+        self.cache = cache
+        self.paths = paths
+
+    def _respond(self, request: Request, entry: _CachedResponse, status: str) -> Response:
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache", "X-Cache": status}
+        if entry.etag in request.headers.get("if-none-match", ""):
+            self.cache.count_not_modified()
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type=entry.media_type, headers=headers)
+
+    async def dispatch(self, request: Request, call_next):
+        if request.method != "GET" or request.url.path not in self.paths:
+            return await call_next(request)
+
+        key = self.cache.key(request)
+        entry = self.cache.get(key)
+        if entry is not None:
+            return self._respond(request, entry, "HIT")
+
+        generation = ingest_generation.current()
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        entry = _CachedResponse(body, response.media_type or response.headers.get("content-type", "application/json"), generation)
+        self.cache.put(key, entry)
+        return self._respond(request, entry, "MISS")
@@ -1,11 +1,11 @@
 from fastapi import FastAPI,HTTPException
 from typing import List, Optional
-from app.database.database_manager import DBManager
+from app.api.dependencies import get_db
 from app.model.schemas import Category, Product
 
 
 app = FastAPI(title="Amazon Best Deals API")
-db = DBManager()
+db = get_db()
 
 @app.get("/")
 async def root():
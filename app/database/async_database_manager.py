@@ -0,0 +1,212 @@
+import os
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import asyncpg
+from dotenv import load_dotenv
+from app.utils.logger import setup_logger
+from app.database import queries
+from app.database.count_cache import COUNT_CAP, count_cache
+from app.utils import ingest_generation
+
+load_dotenv()
+
+
+class DatabaseUnavailable(Exception):
+    """A read query failed; the API answers 503 rather than an empty (and cached) result"""
+
+
+class _AgedConnection(asyncpg.Connection):
+    """asyncpg connection that remembers when it was opened"""
+    __slots__ = ("opened_at",)
+
+
+class AsyncDBManager:
+    """asyncpg twin of DBManager's read queries for the FastAPI endpoints.
+
+    The pool is opened by `start()` and closed by `close()`, both called from
+    the application lifespan, so requests never wait on a blocking driver.
+    """
+
+    def __init__(self, min_size: int = None, max_size: int = None, max_lifetime: float = None):
+        self.connection_params = {
+            'host': os.getenv('DB_HOST', 'localhost'),
+            'database': os.getenv('DB_NAME', 'amazon_deals'),
+            'user': os.getenv('DB_USER', 'postgres'),
+            'password': os.getenv('DB_PASSWORD', ''),
+            'port': int(os.getenv('DB_PORT', '5432'))
+        }
+        self.min_size = min_size or int(os.getenv("DB_POOL_API_MIN", 2))
+        self.max_size = max_size or int(os.getenv("DB_POOL_API_MAX", 10))
+        self.max_lifetime = max_lifetime or float(os.getenv("DB_POOL_MAX_LIFETIME", 1800))
+        self.logger = setup_logger(__name__)
+        self.pool: Optional[asyncpg.Pool] = None
+        self.queries = 0
+        self.query_seconds = 0.0
+
+    async def start(self):
+        if self.pool is None:
+            self.pool = await asyncpg.create_pool(
+                min_size=self.min_size,
+                max_size=self.max_size,
+                # Recycle connections after this many queries; `connection` retires them after max_lifetime
+                max_queries=50000,
+                connection_class=_AgedConnection,
+                init=self._opened,
+                **self.connection_params,
+            )
+            self.logger.info(f"Async DB pool ready ({self.min_size}..{self.max_size} connections)")
+
+    async def close(self):
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
+    @staticmethod
+    async def _opened(conn: _AgedConnection):
+        conn.opened_at = time.monotonic()
+
+    @asynccontextmanager
+    async def connection(self):
+        """A pooled connection, closed on release once it is older than max_lifetime.
+
+        asyncpg only expires idle connections, so without this a busy
+        connection would never be recycled.
+        """
+        async with self.pool.acquire() as conn:
+            yield conn
+            if self.max_lifetime and time.monotonic() - conn.opened_at > self.max_lifetime:
+                # The pool opens a fresh connection on a later acquire
+                await conn.close()
+
+    async def fetch(self, query: str, *params) -> List[Dict]:
+        started = time.perf_counter()
+        try:
+            async with self.connection() as conn:
+                rows = await conn.fetch(queries.to_asyncpg(query), *params)
+            return [dict(row) for row in rows]
+        finally:
+            self.queries += 1
+            self.query_seconds += time.perf_counter() - started
+
+    async def get_all_categories(self) -> List[Dict]:
+        try:
+            return await self.fetch(queries.CATEGORIES_QUERY)
+        except Exception as e:
+            self.logger.error(f"Failed to get categories: {e}")
+            raise DatabaseUnavailable("categories") from e
+
+    async def get_products(
+        self,
+        category_id: Optional[int] = None,
+        brand: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_discount: Optional[float] = None,
+        min_rating: Optional[float] = None,
+        sort_by: str = "id",
+        sort_order: str = "DESC",
+        limit: int = 10,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        count_mode: str = "exact"
+    ) -> Tuple[List[Dict], int, Optional[str], bool]:
+        """Get products with filtering, sorting and pagination.
+
+        With a `cursor` (the `next_cursor` of the previous page) the page is
+        found by keyset seek in the cursor's ordering and `offset` is ignored.
+        Returns (products, total, next_cursor, total_is_exact); raises
+        ValueError for an invalid cursor and DatabaseUnavailable when a query
+        fails. See `count_products` for count_mode.
+        """
+        filters = dict(
+            category_id=category_id,
+            brand=brand,
+            min_price=min_price,
+            max_price=max_price,
+            min_discount=min_discount,
+            min_rating=min_rating,
+        )
+        if cursor:
+            sort_by, sort_order = queries.decode_cursor(cursor)[:2]
+            base_query, params = queries.products_keyset_query(cursor, limit, **filters)
+        else:
+            base_query, params = queries.products_query(sort_by, sort_order, limit, offset, **filters)
+        try:
+            total_count, exact = await self.count_products(filters, count_mode)
+            rows = await self.fetch(base_query, *params)
+            products, next_cursor = queries.page_result(rows, limit, sort_by, sort_order)
+            return products, total_count, next_cursor, exact
+        except Exception as e:
+            self.logger.error(f"Failed to get products: {e}")
+            raise DatabaseUnavailable("products") from e
+
+    async def count_products(self, filters: Dict, count_mode: str = "exact") -> Tuple[int, bool]:
+        """Total for a filter set as (total, is_exact), cached until the next ingest.
+
+        "exact" runs COUNT(*), "capped" stops counting past COUNT_CAP and
+        "estimate" returns the planner's row estimate without scanning.
+        """
+        key = count_cache.signature(count_mode, filters)
+        cached = count_cache.get(key)
+        if cached:
+            return cached
+        generation = ingest_generation.current()
+        if count_mode == "estimate":
+            query, params = queries.products_estimate_query(**filters)
+            async with self.connection() as conn:
+                plan = await conn.fetchval(queries.to_asyncpg(query), *params)
+            total, exact = queries.plan_rows(plan), False
+        elif count_mode == "capped":
+            query, params = queries.products_capped_count_query(COUNT_CAP, **filters)
+            counted = (await self.fetch(query, *params))[0]["total"]
+            total, exact = min(counted, COUNT_CAP), counted <= COUNT_CAP
+        else:
+            query, params = queries.products_count_query(**filters)
+            total, exact = (await self.fetch(query, *params))[0]["total"], True
+        count_cache.put(key, total, exact, generation)
+        return total, exact
+
+    async def get_product_by_id(self, product_id: int) -> Optional[Dict]:
+        try:
+            results = await self.fetch(queries.PRODUCT_BY_ID_QUERY, product_id)
+            return results[0] if results else None
+        except Exception as e:
+            self.logger.error(f"Failed to get product by ID {product_id}: {e}")
+            raise DatabaseUnavailable("product") from e
+
+    async def get_best_deals(self, limit: int = 10, category_id: Optional[int] = None,
+                             min_discount: Optional[float] = None, min_rating: Optional[float] = None) -> List[Dict]:
+        """Top products by deal_score, read from the best_deals ranking"""
+        query, params = queries.best_deals_query(limit, category_id, min_discount, min_rating)
+        try:
+            return await self.fetch(query, *params)
+        except Exception as e:
+            self.logger.error(f"Failed to get best deals: {e}")
+            raise DatabaseUnavailable("best deals") from e
+
+    async def get_price_history(self, product_id: int, start: datetime, end: datetime, bucket: str = "day") -> List[Dict]:
+        """A product's price series between `start` and `end`, downsampled to `bucket`"""
+        query, params = queries.price_history_query(product_id, start, end, bucket)
+        try:
+            return await self.fetch(query, *params)
+        except Exception as e:
+            self.logger.error(f"Failed to get price history of product {product_id}: {e}")
+            raise DatabaseUnavailable("price history") from e
+
+    def pool_stats(self) -> Dict:
+        if self.pool is None:
+            return {"open": False}
+        size = self.pool.get_size()
+        idle = self.pool.get_idle_size()
+        return {
+            "open": True,
+            "min_size": self.pool.get_min_size(),
+            "max_size": self.pool.get_max_size(),
+            "size": size,
+            "idle": idle,
+            "checked_out": size - idle,
+            "queries": self.queries,
+            "avg_query_ms": self.query_seconds / self.queries * 1000 if self.queries else 0.0,
+        }
@@ -0,0 +1,114 @@
+from typing import Dict, Iterable, Optional
+from app.database.database_manager import DBManager
+from app.utils.logger import setup_logger
+
+
+class CategoryTaskQueue:
+    """Postgres-backed queue of per-category scrape tasks (table category_tasks).
+
+    `claim` leases the oldest open task of a crawl with FOR UPDATE SKIP LOCKED,
+    so any number of workers on any number of hosts take disjoint tasks
+    without blocking each other. A worker keeps its lease alive with
+    `heartbeat`; once a lease expires the task is claimable again, until it
+    has been attempted `max_attempts` times.
+    """
+
+    def __init__(self, db_manager: DBManager = None, lease_seconds: float = 300.0, max_attempts: int = 3):
+        self.db_manager = db_manager or DBManager(pool_name="scraper")
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.logger = setup_logger(__name__)
+
+    def enqueue(self, crawl_id: str, category_ids: Iterable[int], max_products: int = 10, max_pages: int = 1) -> int:
+        """Add a task per category to `crawl_id`; categories already in the crawl are skipped"""
+        category_ids = sorted(set(category_ids))
+        if not category_ids:
+            return 0
+        with self.db_manager.get_cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO category_tasks (crawl_id, category_id, max_products, max_pages)
+                SELECT %s, category_id, %s, %s FROM unnest(%s::int[]) AS category_id
+                ON CONFLICT (crawl_id, category_id) DO NOTHING;
+            """, (crawl_id, max_products, max_pages, category_ids))
+            added = cursor.rowcount
+        self.logger.info(f"Enqueued {added} category tasks for crawl {crawl_id}")
+        return added
+
+    def claim(self, worker_id: str, crawl_id: Optional[str] = None) -> Optional[Dict]:
+        """Lease the next open task (with its category name and url), or None if there is none"""
+        with self.db_manager.get_cursor() as cursor:
+            # Expired leases that used their last attempt are given up on
+            cursor.execute("""
+                UPDATE category_tasks
+                SET status = 'failed', finished_at = NOW(), last_error = COALESCE(last_error, 'lease expired')
+                WHERE status = 'leased' AND lease_expires_at < NOW() AND attempts >= %s;
+            """, (self.max_attempts,))
+            cursor.execute("""
+                UPDATE category_tasks t
+                SET status = 'leased',
+                    leased_by = %s,
+                    attempts = t.attempts + 1,
+                    lease_expires_at = NOW() + make_interval(secs => %s),
+                    heartbeat_at = NOW()
+                FROM categories c
+                WHERE c.id = t.category_id AND t.id = (
+                    SELECT id FROM category_tasks
+                    WHERE (status = 'pending' OR (status = 'leased' AND lease_expires_at < NOW()))
+                      AND (%s::text IS NULL OR crawl_id = %s)
+                    ORDER BY id
+                    FOR UPDATE SKIP LOCKED
+                    LIMIT 1
+                )
+                RETURNING t.id, t.crawl_id, t.category_id, t.max_products, t.max_pages, t.attempts,
+                          c.name AS category_name, c.url AS category_url,
+                          c.last_scraped_at, c.last_changed_at, c.content_fingerprint;
+            """, (worker_id, self.lease_seconds, crawl_id, crawl_id))
+            task = cursor.fetchone()
+        return dict(task) if task else None
+
+    def heartbeat(self, task_id: int, worker_id: str) -> bool:
+        """Extend the lease; False if the task is no longer leased to `worker_id`"""
+        with self.db_manager.get_cursor() as cursor:
+            cursor.execute("""
+                UPDATE category_tasks
+                SET lease_expires_at = NOW() + make_interval(secs => %s), heartbeat_at = NOW()
+                WHERE id = %s AND leased_by = %s AND status = 'leased';
+            """, (self.lease_seconds, task_id, worker_id))
+            return cursor.rowcount == 1
+
+    def complete(self, task_id: int, worker_id: str, products_saved: int) -> bool:
+        """Mark the task done; False if the lease was lost to another worker"""
+        with self.db_manager.get_cursor() as cursor:
+            cursor.execute("""
+                UPDATE category_tasks
+                SET status = 'done', products_saved = %s, finished_at = NOW(), lease_expires_at = NULL
+                WHERE id = %s AND leased_by = %s AND status = 'leased';
+            """, (products_saved, task_id, worker_id))
+            return cursor.rowcount == 1
+
+    def fail(self, task_id: int, worker_id: str, error: str) -> bool:
+        """Release the task for a retry, or fail it once its attempts are used up"""
+        with self.db_manager.get_cursor() as cursor:
+            cursor.execute("""
+                UPDATE category_tasks
+                SET status = CASE WHEN attempts >= %s THEN 'failed' ELSE 'pending' END,
+                    finished_at = CASE WHEN attempts >= %s THEN NOW() END,
+                    last_error = %s,
+                    lease_expires_at = NULL
+                WHERE id = %s AND leased_by = %s AND status = 'leased';
+            """, (self.max_attempts, self.max_attempts, error[:1000], task_id, worker_id))
+            return cursor.rowcount == 1
+
+    def progress(self, crawl_id: str) -> Dict:
+        """Task counts per status and products saved so far for a crawl"""
+        with self.db_manager.get_cursor() as cursor:
+            cursor.execute("""
+                SELECT status, COUNT(*) AS tasks, COALESCE(SUM(products_saved), 0) AS products
+                FROM category_tasks WHERE crawl_id = %s GROUP BY status;
+            """, (crawl_id,))
+            rows = cursor.fetchall()
+        report = {"pending": 0, "leased": 0, "done": 0, "failed": 0, "products_saved": 0}
+        for row in rows:
+            report[row["status"]] = row["tasks"]
+            report["products_saved"] += row["products"]
+        return report
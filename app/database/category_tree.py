@@ -0,0 +1,94 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from psycopg2.extras import Json
+from app.database.database_manager import DBManager
+from app.utils.logger import setup_logger
+
+
+class CategoryTreeStore:
+    """Versioned category tree snapshots (table category_tree_snapshots).
+
+    A tree is {"departments": [{"name", "subcategories": [{"name", "url"}]}]}
+    as read from the site menu; `complete` says whether every department of
+    the menu is in it. A snapshot is fresh for `ttl_seconds` after it was last
+    confirmed by a scrape.
+    """
+
+    def __init__(self, db_manager: DBManager = None, ttl_seconds: float = 7 * 86400):
+        self.db_manager = db_manager or DBManager(pool_name="scraper")
+        self.ttl_seconds = ttl_seconds
+        self.logger = setup_logger(__name__)
+
+    @staticmethod
+    def digest(tree: Dict) -> str:
+        return hashlib.sha256(json.dumps(tree, sort_keys=True).encode()).hexdigest()
+
+    def latest(self, base_url: str) -> Optional[Dict]:
+        """Newest snapshot for `base_url`, or None"""
+        try:
+            with self.db_manager.get_cursor() as cursor:
+                cursor.execute("""
+                    SELECT version, complete, departments, categories, tree, created_at, checked_at
+                    FROM category_tree_snapshots
+                    WHERE base_url = %s
+                    ORDER BY version DESC
+                    LIMIT 1;
+                """, (base_url,))
+                snapshot = cursor.fetchone()
+            return dict(snapshot) if snapshot else None
+        except Exception as e:
+            self.logger.error(f"Failed to read the category tree snapshot: {e}")
+            return None
+
+    def is_fresh(self, snapshot: Optional[Dict], now: Optional[datetime] = None) -> bool:
+        if not snapshot:
+            return False
+        now = now or datetime.now(timezone.utc)
+        return (now - snapshot["checked_at"]).total_seconds() < self.ttl_seconds
+
+    def save(self, base_url: str, tree: Dict, complete: bool) -> Optional[int]:
+        """Store `tree` as a new version, or confirm the latest one if it is identical; returns the version"""
+        digest = self.digest(tree)
+        departments = len(tree["departments"])
+        categories = sum(len(d["subcategories"]) for d in tree["departments"])
+        try:
+            with self.db_manager.get_cursor() as cursor:
+                cursor.execute("""
+                    UPDATE category_tree_snapshots
+                    SET checked_at = NOW(), complete = complete OR %s
+                    WHERE version = (SELECT MAX(version) FROM category_tree_snapshots WHERE base_url = %s)
+                      AND digest = %s
+                    RETURNING version;
+                """, (complete, base_url, digest))
+                row = cursor.fetchone()
+                if row:
+                    self.logger.info(f"Category tree unchanged, confirmed version {row['version']}")
+                    return row["version"]
+                cursor.execute("""
+                    INSERT INTO category_tree_snapshots (base_url, digest, complete, departments, categories, tree)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                    RETURNING version;
+                """, (base_url, digest, complete, departments, categories, Json(tree)))
+                version = cursor.fetchone()["version"]
+            self.logger.info(f"Saved category tree version {version}: {departments} departments, {categories} categories")
+            return version
+        except Exception as e:
+            self.logger.error(f"Failed to save the category tree snapshot: {e}")
+            return None
+
+    @staticmethod
+    def covers(snapshot: Dict, max_categories: int) -> bool:
+        """Whether the snapshot holds the first `max_categories` departments a scrape would read"""
+        return snapshot["complete"] or snapshot["departments"] >= max_categories
+
+    @staticmethod
+    def flatten(tree: Dict, max_categories: int, max_subcategories: int) -> List[Dict[str, str]]:
+        """{"name": "Department > Subcategory", "url"} rows, limited like a live scrape"""
+        return [
+            {"name": f"{department['name']} > {sub['name']}", "url": sub["url"]}
+            for department in tree["departments"][:max_categories]
+            for sub in department["subcategories"][:max_subcategories]
+            if sub["name"] and sub["url"]
+        ]
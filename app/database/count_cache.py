@@ -0,0 +1,86 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from app.utils import ingest_generation
+
+COUNT_MODES = ("exact", "estimate", "capped")
+
+
+class CountCache:
+    """Filtered product totals keyed by normalized filter signature.
+
+    An entry is reused until products are ingested (the ingest generation
+    moves on) or it is older than `ttl_seconds`, which bounds staleness when
+    another process does the ingesting. Oldest entries are dropped past
+    `max_entries`.
+    """
+
+    def __init__(self, ttl_seconds: float = 300.0, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple, Tuple[int, bool, int, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def signature(mode: str, filters: Dict) -> Tuple:
+        """Order-independent key; unset filters and brand case do not matter"""
+        normalized = []
+        for name, value in sorted(filters.items()):
+            if value is None or value == "":
+                continue
+            if name == "brand":
+                value = value.lower()
+            elif isinstance(value, float) and value.is_integer():
+                value = int(value)
+            normalized.append((name, value))
+        return (mode, tuple(normalized))
+
+    def get(self, key: Tuple) -> Optional[Tuple[int, bool]]:
+        """(total, is_exact) if a fresh entry exists"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            total, exact, generation, stored_at = entry
+            if generation != ingest_generation.current() or time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return total, exact
+
+    def put(self, key: Tuple, total: int, exact: bool, generation: int):
+        """Store a total computed while `generation` was current"""
+        with self._lock:
+            self._entries[key] = (total, exact, generation, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "generation": ingest_generation.current(),
+            }
+
+
+# Shared by DBManager and AsyncDBManager in one process
+count_cache = CountCache(ttl_seconds=float(os.getenv("COUNT_CACHE_TTL", 300)))
+
+# Upper bound used by the "capped" count mode ("10000+")
+COUNT_CAP = int(os.getenv("COUNT_CAP", 10000))
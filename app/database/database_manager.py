@@ -1,15 +1,66 @@
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import Json, RealDictCursor, execute_values
 from contextlib import contextmanager
+from datetime import datetime, timezone
 import os
 from typing import List, Dict, Optional, Tuple
 from dotenv import load_dotenv
 from app.utils.logger import setup_logger
+from app.database.pool import get_pool
+from app.database import queries
+from app.database.ingest_events import notify_ingest
+from app.database.count_cache import COUNT_CAP, count_cache
+from app.utils import ingest_generation
 
 load_dotenv()
 
+# With a category id, serializes that category's best_deals refreshes across processes
+BEST_DEALS_LOCK_ID = 724_113_002
+
+PRODUCT_COLUMNS = (
+    "title", "brand", "price", "original_price", "discount_percent", "rating",
+    "reviews_count", "product_link", "asin", "image_url", "availability", "category_id",
+)
+
+# Positions in a PRODUCT_COLUMNS row of the values price_history records
+HISTORY_COLUMN_INDEXES = tuple(PRODUCT_COLUMNS.index(c) for c in (
+    "price", "original_price", "discount_percent", "rating", "reviews_count", "availability",
+))
+
+# Appends observations to price_history and folds them into the daily rollup
+PRICE_HISTORY_INSERT = """
+    WITH observed AS (
+        INSERT INTO price_history (product_id, price, original_price, discount_percent, rating, reviews_count, availability)
+        VALUES %s
+        RETURNING *
+    )
+    INSERT INTO price_history_daily AS d
+    SELECT product_id, (observed_at AT TIME ZONE 'UTC')::date, price, price, price, original_price,
+           discount_percent, rating, availability, 1, observed_at
+    FROM observed
+    ON CONFLICT (product_id, day) DO UPDATE SET
+        min_price = LEAST(d.min_price, EXCLUDED.min_price),
+        max_price = GREATEST(d.max_price, EXCLUDED.max_price),
+        last_price = CASE WHEN EXCLUDED.last_observed_at >= d.last_observed_at THEN EXCLUDED.last_price ELSE d.last_price END,
+        last_original_price = CASE WHEN EXCLUDED.last_observed_at >= d.last_observed_at
+                                   THEN EXCLUDED.last_original_price ELSE d.last_original_price END,
+        last_discount_percent = CASE WHEN EXCLUDED.last_observed_at >= d.last_observed_at
+                                     THEN EXCLUDED.last_discount_percent ELSE d.last_discount_percent END,
+        last_rating = CASE WHEN EXCLUDED.last_observed_at >= d.last_observed_at THEN EXCLUDED.last_rating ELSE d.last_rating END,
+        last_availability = CASE WHEN EXCLUDED.last_observed_at >= d.last_observed_at
+                                 THEN EXCLUDED.last_availability ELSE d.last_availability END,
+        observations = d.observations + 1,
+        last_observed_at = GREATEST(d.last_observed_at, EXCLUDED.last_observed_at);
+"""
+
 class DBManager:
-    def __init__(self):
+    """Query helpers on top of a shared, named connection pool.
+
+    Every DBManager with the same `pool_name` borrows from the same
+    process-wide pool ("api" for the FastAPI app, "scraper" for scraping runs).
+    """
+
+    def __init__(self, pool_name: str = "api"):
         self.connection_params = {
             'host': os.getenv('DB_HOST', 'localhost'),
             'database': os.getenv('DB_NAME', 'amazon_deals'),
@@ -17,20 +68,26 @@ class DBManager:
             'password': os.getenv('DB_PASSWORD', ''),
             'port': os.getenv('DB_PORT', '5432')
         }
+        self.pool_name = pool_name
         self.logger = setup_logger(__name__)
-    
+        # UTC month whose price_history partitions are known to exist
+        self._history_month = None
+
+    @property
+    def pool(self):
+        return get_pool(self.pool_name, self.connection_params)
+
     @contextmanager
     def get_connection(self):
-        conn = None
         try:
-            conn = psycopg2.connect(**self.connection_params)
-            yield conn
+            with self.pool.connection() as conn:
+                yield conn
         except Exception as e:
             self.logger.error(f"Database error: {e}")
             raise
-        finally:
-            if conn:
-                conn.close()
+
+    def pool_stats(self) -> Dict:
+        return self.pool.stats()
 
     @contextmanager
     def get_cursor(self, connection=None):
@@ -70,45 +127,13 @@ class DBManager:
             raise
         
     def insert_product(self, product_data: Dict) -> int:
-       
-        exist = self.execute_query(
-            "SELECT id FROM products WHERE title = %s OR product_link = %s", 
-            (product_data.get("title"), product_data.get("product_link"))
-        )
-        
-        if exist:
-            self.logger.info(f"Product already exists: {product_data.get('title')}")
-            return exist[0]["id"]  
-        
-        query = """
-            INSERT INTO products 
-            (title, brand, price, original_price, discount_percent, rating, reviews_count, product_link, image_url, availability, category_id)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            RETURNING id;
-        """
-        params = (
-            product_data.get("title"),
-            product_data.get("brand"),
-            product_data.get("price"),
-            product_data.get("original_price"),
-            product_data.get("discount_percent", 0.0),
-            product_data.get("rating"),
-            product_data.get("reviews_count", 0),
-            product_data.get("product_link"),
-            product_data.get("image_url"),
-            product_data.get("availability"),
-            product_data.get("category_id")
-        )
-        try:
-            with self.get_cursor() as cursor:
-                cursor.execute(query, params)
-                product_id = cursor.fetchone()["id"]
-                self.logger.info(f"Product inserted: {product_data.get('title')} (ID: {product_id})")
-                return product_id
-        except Exception as e:
-            self.logger.error(f"Failed to insert product '{product_data.get('title')}': {e}")
-            return None  
-        
+        """Insert or update one product and record the observation; returns its id"""
+        results = self.upsert_products([product_data])
+        if not results:
+            return None
+        self.logger.info(f"Product {'inserted' if results[0]['inserted'] else 'updated'}: {product_data.get('title')} (ID: {results[0]['id']})")
+        return results[0]["id"]
+
     def insert_category(self, name: str, url: str) -> int:
         check_query = "SELECT id FROM categories WHERE name = %s OR url = %s;"
         insert_query = "INSERT INTO categories (name, url) VALUES (%s, %s) RETURNING id;"
@@ -124,8 +149,10 @@ class DBManager:
 
                 cursor.execute(insert_query, (name, url))
                 new_id = cursor.fetchone()["id"]
-                self.logger.info(f"Category inserted: {name} (ID: {new_id})")
-                return new_id
+                notify_ingest(cursor, "categories", [new_id], 1)
+            ingest_generation.bump()
+            self.logger.info(f"Category inserted: {name} (ID: {new_id})")
+            return new_id
 
         except Exception as e:
             self.logger.error(f"Category insert failed for '{name}': {e}")
@@ -133,12 +160,191 @@ class DBManager:
             
 
 
+    def upsert_products(self, batch: List[Dict], page_size: int = 500, raise_errors: bool = False) -> List[Dict]:
+        """Insert or update a batch of products keyed on ASIN (or product_link without one).
+
+        Rows are written with multi-row VALUES statements of up to `page_size`
+        rows, and every row is also appended to price_history in the same
+        transaction. Returns one {"id", "product_link", "inserted"} dict per
+        distinct product, where `inserted` is False for rows that already existed
+        and were updated with the latest scraped values. A failed write is
+        logged and returns [], or is re-raised with `raise_errors`.
+        """
+        rows = {}
+        for product in batch:
+            if not product.get("product_link") or not product.get("title"):
+                self.logger.warning(f"Skipping product without link or title: {product.get('title')}")
+                continue
+            # A statement may not touch the same row twice, so keep the last copy of each product
+            rows[product.get("asin") or product["product_link"]] = (
+                product.get("title"),
+                product.get("brand"),
+                product.get("price"),
+                product.get("original_price"),
+                product.get("discount_percent") or 0.0,
+                product.get("rating"),
+                product.get("reviews_count") or 0,
+                product.get("product_link"),
+                product.get("asin"),
+                product.get("image_url"),
+                product.get("availability"),
+                product.get("category_id"),
+            )
+        if not rows:
+            return []
+        # Products are identified by ASIN; the few cards without one fall back to their link.
+        # Each group is written in key order, so concurrent batches lock shared rows in the same order.
+        asin, link = PRODUCT_COLUMNS.index("asin"), PRODUCT_COLUMNS.index("product_link")
+        with_asin = sorted((row for row in rows.values() if row[asin]), key=lambda row: row[asin])
+        without_asin = sorted((row for row in rows.values() if not row[asin]), key=lambda row: row[link])
+
+        query = f"""
+            INSERT INTO products ({", ".join(PRODUCT_COLUMNS)})
+            VALUES %s
+            ON CONFLICT ({{conflict}}) DO UPDATE SET
+                title = EXCLUDED.title,
+                brand = CASE WHEN EXCLUDED.brand IS NULL OR EXCLUDED.brand = 'Unknown'
+                             THEN products.brand ELSE EXCLUDED.brand END,
+                price = EXCLUDED.price,
+                original_price = EXCLUDED.original_price,
+                discount_percent = EXCLUDED.discount_percent,
+                rating = EXCLUDED.rating,
+                reviews_count = EXCLUDED.reviews_count,
+                product_link = EXCLUDED.product_link,
+                asin = COALESCE(EXCLUDED.asin, products.asin),
+                image_url = EXCLUDED.image_url,
+                availability = EXCLUDED.availability,
+                category_id = EXCLUDED.category_id,
+                updated_at = NOW()
+            RETURNING id, product_link, (xmax = 0) AS inserted;
+        """
+        try:
+            category_ids = [row[PRODUCT_COLUMNS.index("category_id")] for row in rows.values()]
+            by_link = {row[PRODUCT_COLUMNS.index("product_link")]: row for row in rows.values()}
+            self.ensure_history_partitions()
+            with self.get_cursor() as cursor:
+                results = []
+                for conflict, group in (("asin", with_asin), ("product_link", without_asin)):
+                    if group:
+                        results += execute_values(cursor, query.format(conflict=conflict), group, page_size=page_size, fetch=True)
+                observations = [
+                    (r["id"], *(by_link[r["product_link"]][i] for i in HISTORY_COLUMN_INDEXES)) for r in results
+                ]
+                execute_values(cursor, PRICE_HISTORY_INSERT, observations, page_size=page_size)
+                # Products that moved category also leave their old category's ranking
+                category_ids = sorted({c for c in category_ids if c})
+                category_ids += self._refresh_best_deals(cursor, category_ids, [r["id"] for r in results])
+                notify_ingest(cursor, "products", category_ids, len(results))
+            ingest_generation.bump()
+            inserted = sum(1 for r in results if r["inserted"])
+            self.logger.info(f"Upserted {len(results)} products ({inserted} inserted, {len(results) - inserted} updated)")
+            return [dict(r) for r in results]
+        except Exception as e:
+            self.logger.error(f"Bulk product upsert failed for {len(rows)} rows: {e}")
+            if raise_errors:
+                raise
+            return []
+
+    def ensure_history_partitions(self):
+        """Create this and next month's price_history partitions, once per month per process"""
+        month = datetime.now(timezone.utc).strftime("%Y%m")
+        if self._history_month == month:
+            return
+        with self.get_cursor() as cursor:
+            cursor.execute("SELECT price_history_ensure_partitions(NOW(), 2) AS created;")
+            created = cursor.fetchone()["created"]
+        if created:
+            self.logger.info(f"Created {created} price_history partitions")
+        self._history_month = month
+
+    def upsert_categories(self, batch: List[Dict], page_size: int = 500) -> List[Dict]:
+        """Insert or rename a batch of {"name", "url"} categories keyed on url.
+
+        Returns one {"id", "name", "url", "inserted"} dict per distinct url.
+        """
+        rows = {c["url"]: (c["name"], c["url"]) for c in batch if c.get("name") and c.get("url")}
+        if not rows:
+            return []
+
+        query = """
+            INSERT INTO categories (name, url)
+            VALUES %s
+            ON CONFLICT (url) DO UPDATE SET name = EXCLUDED.name
+            RETURNING id, name, url, (xmax = 0) AS inserted;
+        """
+        try:
+            with self.get_cursor() as cursor:
+                results = execute_values(cursor, query, list(rows.values()), page_size=page_size, fetch=True)
+                notify_ingest(cursor, "categories", [r["id"] for r in results], len(results))
+            ingest_generation.bump()
+            inserted = sum(1 for r in results if r["inserted"])
+            self.logger.info(f"Upserted {len(results)} categories ({inserted} inserted, {len(results) - inserted} updated)")
+            return [dict(r) for r in results]
+        except Exception as e:
+            self.logger.error(f"Bulk category upsert failed for {len(rows)} rows: {e}")
+            return []
+
     def get_all_categories(self) -> List[Dict]:
         try:
-            return self.execute_query("SELECT * FROM categories ORDER BY name;") or []
+            return self.execute_query(queries.CATEGORIES_QUERY) or []
         except:
             return []
 
+    def get_known_products(self, product_links: List[str]) -> Dict[str, Dict]:
+        """Stored price, availability and brand of the given links, keyed by link"""
+        links = sorted({link for link in product_links if link})
+        if not links:
+            return {}
+        try:
+            rows = self.execute_query(queries.KNOWN_PRODUCTS_QUERY, (links,)) or []
+            return {row["product_link"]: row for row in rows}
+        except Exception as e:
+            self.logger.error(f"Failed to look up {len(links)} known products: {e}")
+            return {}
+
+    def get_enrichment(self, asins: List[str]) -> List[Dict]:
+        """Cached detail-page field rows ({"asin", "field", "value", "fetched_at"}) of the given ASINs"""
+        asins = sorted({asin for asin in asins if asin})
+        if not asins:
+            return []
+        try:
+            return self.execute_query(queries.ENRICHMENT_QUERY, (asins,)) or []
+        except Exception as e:
+            self.logger.error(f"Failed to read the enrichment cache for {len(asins)} ASINs: {e}")
+            return []
+
+    def upsert_enrichment(self, rows: List[Tuple[str, str, object]], page_size: int = 500) -> int:
+        """Store freshly fetched (asin, field, value) detail values"""
+        rows = {(asin, field): (asin, field, Json(value)) for asin, field, value in rows if asin}
+        if not rows:
+            return 0
+        try:
+            with self.get_cursor() as cursor:
+                execute_values(cursor, """
+                    INSERT INTO product_enrichment (asin, field, value) VALUES %s
+                    ON CONFLICT (asin, field) DO UPDATE SET value = EXCLUDED.value, fetched_at = NOW();
+                """, list(rows.values()), page_size=page_size)
+            return len(rows)
+        except Exception as e:
+            self.logger.error(f"Failed to write {len(rows)} enrichment cache rows: {e}")
+            return 0
+
+    def mark_category_scraped(self, category_id: int, fingerprint: str, changed: bool) -> bool:
+        """Record a visit of a category's results and the fingerprint it found"""
+        try:
+            with self.get_cursor() as cursor:
+                cursor.execute("""
+                    UPDATE categories
+                    SET last_scraped_at = NOW(),
+                        last_changed_at = CASE WHEN %s THEN NOW() ELSE last_changed_at END,
+                        content_fingerprint = %s
+                    WHERE id = %s;
+                """, (changed, fingerprint, category_id))
+                return cursor.rowcount == 1
+        except Exception as e:
+            self.logger.error(f"Failed to mark category {category_id} as scraped: {e}")
+            return False
+
     def get_products(
         self, 
         category_id: Optional[int] = None,
@@ -150,89 +356,75 @@ class DBManager:
         sort_by: str = "id",
         sort_order: str = "DESC",
         limit: int = 10,
-        offset: int = 0
-    ) -> Tuple[List[Dict], int]:
-        """Get products with filtering, sorting and pagination"""
-        base_query = """
-            SELECT 
-                p.*, 
-                c.name AS category_name
-            FROM products p
-            LEFT JOIN categories c ON p.category_id = c.id
-            WHERE 1=1
-        """
-        count_query = """
-            SELECT COUNT(*) as total
-            FROM products p
-            LEFT JOIN categories c ON p.category_id = c.id
-            WHERE 1=1
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        count_mode: str = "exact"
+    ) -> Tuple[List[Dict], int, Optional[str], bool]:
+        """Get products with filtering, sorting and pagination.
+
+        With a `cursor` (the `next_cursor` of the previous page) the page is
+        found by keyset seek in the cursor's ordering and `offset` is ignored.
+        Returns (products, total, next_cursor, total_is_exact); raises
+        ValueError for an invalid cursor. See `count_products` for count_mode.
         """
-        
-        conditions = []
-        params = []
-        
-        # Build WHERE conditions
-        if category_id:
-            conditions.append("p.category_id = %s")
-            params.append(category_id)
-        if brand:
-            conditions.append("LOWER(p.brand) = LOWER(%s)")
-            params.append(brand)
-        if min_price is not None:
-            conditions.append("p.price >= %s")
-            params.append(min_price)
-        if max_price is not None:
-            conditions.append("p.price <= %s")
-            params.append(max_price)
-        if min_discount is not None:
-            conditions.append("p.discount_percent >= %s")
-            params.append(min_discount)
-        if min_rating is not None:
-            conditions.append("p.rating >= %s")
-            params.append(min_rating)
-        
-        # Add conditions to queries
-        where_clause = " AND ".join(conditions)
-        if where_clause:
-            base_query += f" AND {where_clause}"
-            count_query += f" AND {where_clause}"
-        
-        # Validate sort parameters
-        valid_sort_columns = ["id", "price", "discount_percent", "rating", "reviews_count"]
-        valid_sort_orders = ["ASC", "DESC"]
-        
-        sort_by = sort_by if sort_by in valid_sort_columns else "id"
-        sort_order = sort_order if sort_order in valid_sort_orders else "DESC"
-        
-        # Add sorting and pagination
-        base_query += f" ORDER BY p.{sort_by} {sort_order} LIMIT %s OFFSET %s"
-        params.extend([limit, offset])
-        
+        filters = dict(
+            category_id=category_id,
+            brand=brand,
+            min_price=min_price,
+            max_price=max_price,
+            min_discount=min_discount,
+            min_rating=min_rating,
+        )
+        if cursor:
+            sort_by, sort_order = queries.decode_cursor(cursor)[:2]
+            base_query, params = queries.products_keyset_query(cursor, limit, **filters)
+        else:
+            base_query, params = queries.products_query(sort_by, sort_order, limit, offset, **filters)
+
         try:
             # Get total count
-            total_result = self.execute_query(count_query, tuple(params[:-2])) or [{"total": 0}]
-            total_count = total_result[0]["total"]
+            total_count, exact = self.count_products(filters, count_mode)
             
             # Get paginated results
-            products = self.execute_query(base_query, tuple(params)) or []
+            rows = self.execute_query(base_query, tuple(params)) or []
+            products, next_cursor = queries.page_result(rows, limit, sort_by, sort_order)
             
-            return products, total_count
+            return products, total_count, next_cursor, exact
             
         except Exception as e:
             self.logger.error(f"Failed to get products: {e}")
-            return [], 0
+            return [], 0, None, True
+
+    def count_products(self, filters: Dict, count_mode: str = "exact") -> Tuple[int, bool]:
+        """Total for a filter set as (total, is_exact), cached until the next ingest.
+
+        "exact" runs COUNT(*), "capped" stops counting past COUNT_CAP and
+        "estimate" returns the planner's row estimate without scanning.
+        """
+        key = count_cache.signature(count_mode, filters)
+        cached = count_cache.get(key)
+        if cached:
+            return cached
+        generation = ingest_generation.current()
+        if count_mode == "estimate":
+            query, params = queries.products_estimate_query(**filters)
+            with self.get_cursor() as cursor:
+                cursor.execute(query, tuple(params))
+                plan = cursor.fetchone()["QUERY PLAN"]
+            total, exact = queries.plan_rows(plan), False
+        elif count_mode == "capped":
+            query, params = queries.products_capped_count_query(COUNT_CAP, **filters)
+            counted = self.execute_query(query, tuple(params))[0]["total"]
+            total, exact = min(counted, COUNT_CAP), counted <= COUNT_CAP
+        else:
+            query, params = queries.products_count_query(**filters)
+            total, exact = self.execute_query(query, tuple(params))[0]["total"], True
+        count_cache.put(key, total, exact, generation)
+        return total, exact
         
     def get_product_by_id(self, product_id: int) -> Optional[Dict]:
-        query = """
-            SELECT 
-                p.*, 
-                c.name AS category_name
-            FROM products p
-            LEFT JOIN categories c ON p.category_id = c.id
-            WHERE p.id = %s;
-        """
         try:
-            results = self.execute_query(query, (product_id,))
+            results = self.execute_query(queries.PRODUCT_BY_ID_QUERY, (product_id,))
             if results:
                 return results[0]
             return None
@@ -240,20 +432,76 @@ class DBManager:
             self.logger.error(f"Failed to get product by ID {product_id}: {e}")
             return None
 
-    def get_best_deals(self, limit: int = 10) -> List[Dict]:
-        
-        query = """
-            SELECT 
-                p.*, 
-                c.name AS category_name
-            FROM products p
-            LEFT JOIN categories c ON p.category_id = c.id
-            WHERE p.discount_percent > 0 OR p.rating > 0
-            ORDER BY p.discount_percent DESC, p.rating DESC
-            LIMIT %s;
-        """
+    def get_best_deals(self, limit: int = 10, category_id: Optional[int] = None,
+                       min_discount: Optional[float] = None, min_rating: Optional[float] = None) -> List[Dict]:
+        """Top products by deal_score, read from the best_deals ranking"""
+        query, params = queries.best_deals_query(limit, category_id, min_discount, min_rating)
         try:
-            return self.execute_query(query, (limit,)) or []
+            return self.execute_query(query, tuple(params)) or []
         except Exception as e:
             self.logger.error(f"Failed to get best deals: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    def get_price_history(self, product_id: int, start: datetime, end: datetime, bucket: str = "day") -> List[Dict]:
+        """A product's price series between `start` and `end`, downsampled to `bucket`"""
+        query, params = queries.price_history_query(product_id, start, end, bucket)
+        try:
+            return self.execute_query(query, tuple(params)) or []
+        except Exception as e:
+            self.logger.error(f"Failed to get price history of product {product_id}: {e}")
+            return []
+
+    def refresh_best_deals(self, category_ids, cursor=None) -> int:
+        """Re-rank the best_deals rows of the given categories; returns rows written.
+
+        With a `cursor` the refresh joins that cursor's transaction (and its
+        errors propagate), so an ingest and its ranking commit together.
+        """
+        category_ids = sorted({c for c in category_ids if c})
+        if not category_ids:
+            return 0
+        if cursor is not None:
+            self._refresh_best_deals(cursor, category_ids)
+            return cursor.rowcount
+        try:
+            with self.get_cursor() as cursor:
+                self._refresh_best_deals(cursor, category_ids)
+                written = cursor.rowcount
+                notify_ingest(cursor, "best_deals", category_ids, written)
+            ingest_generation.bump()
+            return written
+        except Exception as e:
+            self.logger.error(f"Best deals refresh failed for categories {category_ids}: {e}")
+            return 0
+
+    def _refresh_best_deals(self, cursor, category_ids: List[int], product_ids: List[int] = None) -> List[int]:
+        """Re-rank `category_ids`, plus any other category `product_ids` are still ranked in; returns those others
+
+        An upserted product may have moved category, and its row in the old
+        category's ranking must not outlive the move.
+        """
+        self._lock_best_deals(cursor, category_ids)
+        moved_from = []
+        if product_ids:
+            cursor.execute(
+                "SELECT DISTINCT category_id FROM best_deals WHERE product_id = ANY(%s) AND category_id <> ALL(%s);",
+                (product_ids, category_ids),
+            )
+            moved_from = sorted(row["category_id"] for row in cursor.fetchall())
+            self._lock_best_deals(cursor, moved_from)
+        category_ids = category_ids + moved_from
+        if not category_ids:
+            return []
+        cursor.execute("DELETE FROM best_deals WHERE category_id = ANY(%s);", (category_ids,))
+        cursor.execute(queries.REFRESH_BEST_DEALS_QUERY, (category_ids,))
+        self.logger.info(f"Refreshed best deals of {len(category_ids)} categories ({cursor.rowcount} rows)")
+        return moved_from
+
+    def _lock_best_deals(self, cursor, category_ids: List[int]):
+        """Take each category's best_deals lock until commit, in the given (sorted) order.
+
+        Concurrent refreshes of one category would collide on (category_id,
+        rank); ingests of other categories go ahead in parallel.
+        """
+        for category_id in category_ids:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s, %s);", (BEST_DEALS_LOCK_ID, category_id))
@@ -0,0 +1,120 @@
+"""Ingest change events over Postgres LISTEN/NOTIFY.
+
+DBManager's ingest methods `pg_notify` INGEST_CHANNEL inside the transaction
+that writes the rows, so the event is delivered only once they are committed.
+Each API worker runs an IngestListener that bumps its ingest generation,
+which invalidates the count and response caches of that worker.
+"""
+import asyncio
+import json
+import os
+import uuid
+from typing import Callable, Dict, Iterable, Optional
+import asyncpg
+from app.utils import ingest_generation
+from app.utils.logger import setup_logger
+
+INGEST_CHANNEL = "ingest_events"
+
+# (pid, token) of this process; pids repeat across hosts and containers
+_source = (None, None)
+
+
+def process_token() -> str:
+    """Random id of this process, sent with its events so it can ignore its own"""
+    global _source
+    if _source[0] != os.getpid():
+        # A forked worker must not inherit its parent's token
+        _source = (os.getpid(), uuid.uuid4().hex)
+    return _source[1]
+
+
+def encode_event(kind: str, category_ids: Iterable[int] = (), count: int = 0) -> str:
+    """NOTIFY payload for `count` rows of `kind` ("products" or "categories")"""
+    return json.dumps({
+        "kind": kind,
+        "categories": sorted({c for c in category_ids if c}),
+        "count": count,
+        "pid": os.getpid(),
+        "source": process_token(),
+    })
+
+
+def notify_ingest(cursor, kind: str, category_ids: Iterable[int] = (), count: int = 0):
+    """Queue an ingest event on the cursor's transaction"""
+    cursor.execute("SELECT pg_notify(%s, %s);", (INGEST_CHANNEL, encode_event(kind, category_ids, count)))
+
+
+class IngestListener:
+    """Keeps one asyncpg connection LISTENing on INGEST_CHANNEL.
+
+    Every event from another process bumps the local ingest generation and is
+    passed to `on_event`. The connection is re-established after it drops;
+    since events may have been missed meanwhile, a reconnect bumps the
+    generation as well.
+    """
+
+    def __init__(self, connection_params: Dict, on_event: Optional[Callable[[Dict], None]] = None,
+                 retry_seconds: float = 5.0):
+        self.connection_params = connection_params
+        self.on_event = on_event
+        self.retry_seconds = retry_seconds
+        self.logger = setup_logger(__name__)
+        self.events = 0
+        self.reconnects = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def _handle(self, connection, pid, channel, payload):
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            event = {"kind": "unknown"}
+        if event.get("source") == process_token():
+            # Ingested by this process, which bumped its generation already
+            return
+        self.events += 1
+        ingest_generation.bump()
+        self.logger.debug(f"Ingest event from pid {event.get('pid')}: {event.get('count')} {event.get('kind')}")
+        if self.on_event:
+            self.on_event(event)
+
+    async def _run(self):
+        first = True
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(**self.connection_params)
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _: lost.set())
+                await connection.add_listener(INGEST_CHANNEL, self._handle)
+                if not first:
+                    self.reconnects += 1
+                    ingest_generation.bump()
+                    self.logger.info("Ingest listener reconnected")
+                first = False
+                await lost.wait()
+                self.logger.warning("Ingest listener connection lost")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.warning(f"Ingest listener could not connect: {e}")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(self.retry_seconds)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict:
+        return {"running": self._task is not None and not self._task.done(), "events": self.events, "reconnects": self.reconnects}
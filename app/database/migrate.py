@@ -0,0 +1,272 @@
+"""Versioned schema migrations for the products database.
+
+Migrations are the numbered .sql files in app/database/migrations, applied in
+order, each in its own transaction, and recorded in `schema_migrations`.
+
+    python -m app.database.migrate upgrade     # apply pending migrations
+    python -m app.database.migrate status      # applied / pending / modified
+    python -m app.database.migrate explain     # check the DBManager queries use indexes
+"""
+import argparse
+import hashlib
+import os
+import re
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from app.database.database_manager import DBManager
+from app.database import queries
+from app.utils.logger import setup_logger
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "migrations")
+MIGRATION_FILE = re.compile(r"^(\d+)_([\w-]+)\.sql$")
+
+# Arbitrary constant so concurrent `upgrade` runs wait for each other
+MIGRATION_LOCK_ID = 724_113_001
+
+
+class Migration:
+    def __init__(self, version: int, name: str, path: str):
+        self.version = version
+        self.name = name
+        self.path = path
+
+    @property
+    def sql(self) -> str:
+        with open(self.path, encoding="utf-8") as f:
+            return f.read()
+
+    @property
+    def checksum(self) -> str:
+        return hashlib.sha256(self.sql.encode("utf-8")).hexdigest()
+
+
+def discover(directory: str = MIGRATIONS_DIR) -> List[Migration]:
+    """Migration files of `directory` in version order"""
+    migrations = []
+    for filename in os.listdir(directory):
+        match = MIGRATION_FILE.match(filename)
+        if match:
+            migrations.append(Migration(int(match.group(1)), match.group(2), os.path.join(directory, filename)))
+    migrations.sort(key=lambda m: m.version)
+    versions = [m.version for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"Duplicate migration versions in {directory}")
+    return migrations
+
+
+class Migrator:
+    """Applies and inspects migrations through a DBManager connection"""
+
+    def __init__(self, db_manager: DBManager = None, directory: str = MIGRATIONS_DIR):
+        self.db_manager = db_manager or DBManager(pool_name="migrate")
+        self.directory = directory
+        self.logger = setup_logger(__name__)
+
+    def _ensure_table(self, cursor):
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                checksum TEXT NOT NULL,
+                applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+            );
+        """)
+
+    def applied(self) -> Dict[int, Dict]:
+        with self.db_manager.get_cursor() as cursor:
+            self._ensure_table(cursor)
+            cursor.execute("SELECT version, name, checksum, applied_at FROM schema_migrations ORDER BY version;")
+            return {row["version"]: row for row in cursor.fetchall()}
+
+    def pending(self) -> List[Migration]:
+        applied = self.applied()
+        return [m for m in discover(self.directory) if m.version not in applied]
+
+    def upgrade(self, target: Optional[int] = None) -> List[Migration]:
+        """Apply pending migrations up to `target` (all by default) and return them"""
+        done = []
+        with self.db_manager.get_connection() as conn:
+            with self.db_manager.get_cursor(conn) as cursor:
+                self._ensure_table(cursor)
+                cursor.execute("SELECT pg_advisory_lock(%s);", (MIGRATION_LOCK_ID,))
+            try:
+                for migration in discover(self.directory):
+                    if target is not None and migration.version > target:
+                        break
+                    with self.db_manager.get_cursor(conn) as cursor:
+                        cursor.execute("SELECT 1 FROM schema_migrations WHERE version = %s;", (migration.version,))
+                        if cursor.fetchone():
+                            continue
+                        self.logger.info(f"Applying migration {migration.version:04d}_{migration.name}")
+                        cursor.execute(migration.sql)
+                        cursor.execute(
+                            "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s);",
+                            (migration.version, migration.name, migration.checksum),
+                        )
+                    done.append(migration)
+            finally:
+                with self.db_manager.get_cursor(conn) as cursor:
+                    cursor.execute("SELECT pg_advisory_unlock(%s);", (MIGRATION_LOCK_ID,))
+        self.logger.info(f"Applied {len(done)} migrations")
+        return done
+
+    def status(self) -> List[Tuple[int, str, str]]:
+        """(version, name, state) per migration; state is applied, pending or modified"""
+        applied = self.applied()
+        rows = []
+        for migration in discover(self.directory):
+            row = applied.get(migration.version)
+            if row is None:
+                state = "pending"
+            elif row["checksum"] != migration.checksum:
+                state = "modified"
+            else:
+                state = f"applied {row['applied_at']:%Y-%m-%d %H:%M}"
+            rows.append((migration.version, migration.name, state))
+        return rows
+
+    def explain(self, products: int = 20000, categories: int = 50) -> List[Tuple[str, List[str]]]:
+        """EXPLAIN every DBManager read query against seeded data.
+
+        Seeds `products` rows in a transaction that is always rolled back, then
+        plans each query with sequential scans disabled: a Seq Scan that
+        survives `enable_seqscan = off` means no index can serve the query.
+        Returns (query name, seq scanned tables) per query.
+        """
+        results = []
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                self._seed(cursor, products, categories)
+                cursor.execute("ANALYZE categories; ANALYZE products; ANALYZE best_deals; ANALYZE price_history; ANALYZE price_history_daily;")
+                cursor.execute("SET LOCAL enable_seqscan = off;")
+                for name, query, params in explain_cases():
+                    cursor.execute(f"EXPLAIN (FORMAT JSON) {query}", tuple(params))
+                    plan = cursor.fetchone()[0]
+                    results.append((name, seq_scans(plan[0]["Plan"])))
+            finally:
+                conn.rollback()
+                cursor.close()
+        return results
+
+    def _seed(self, cursor, products: int, categories: int):
+        cursor.execute("""
+            INSERT INTO categories (name, url)
+            SELECT 'Seed > Category ' || g, 'https://seed.invalid/c/' || g
+            FROM generate_series(1, %s) g;
+        """, (categories,))
+        cursor.execute("""
+            INSERT INTO products (title, brand, price, original_price, discount_percent, rating,
+                                  reviews_count, product_link, availability, category_id)
+            SELECT 'Seed product ' || g,
+                   'Brand ' || (g %% 200),
+                   CASE WHEN g %% 10 = 0 THEN NULL ELSE (g %% 500) + 0.99 END,
+                   (g %% 500) + 20.99,
+                   g %% 60,
+                   CASE WHEN g %% 7 = 0 THEN NULL ELSE 1 + (g %% 40) / 10.0 END,
+                   g %% 5000,
+                   'https://seed.invalid/p/' || g,
+                   'In Stock',
+                   (SELECT MIN(id) FROM categories WHERE url LIKE 'https://seed.invalid/%%') + (g %% %s)
+            FROM generate_series(1, %s) g;
+        """, (categories, products))
+        cursor.execute("SELECT array_agg(id) FROM categories WHERE url LIKE 'https://seed.invalid/c/%%';")
+        cursor.execute(queries.REFRESH_BEST_DEALS_QUERY, (cursor.fetchone()[0],))
+        # A month of daily observations for the first 100 seeded products
+        cursor.execute("SELECT price_history_ensure_partitions(NOW() - interval '1 month', 2);")
+        cursor.execute("""
+            INSERT INTO price_history (product_id, observed_at, price, original_price, discount_percent, rating, reviews_count, availability)
+            SELECT p.id, NOW() - make_interval(days => d), p.price, p.original_price, p.discount_percent, p.rating, p.reviews_count, p.availability
+            FROM (SELECT * FROM products WHERE product_link LIKE 'https://seed.invalid/%%' ORDER BY id LIMIT 100) p
+            CROSS JOIN generate_series(0, 29) d;
+        """)
+        cursor.execute("""
+            INSERT INTO price_history_daily
+            SELECT product_id, (observed_at AT TIME ZONE 'UTC')::date, MIN(price), MAX(price), MAX(price), MAX(original_price),
+                   MAX(discount_percent), MAX(rating), MAX(availability), COUNT(*), MAX(observed_at)
+            FROM price_history GROUP BY 1, 2
+            ON CONFLICT (product_id, day) DO NOTHING;
+        """)
+
+
+def explain_cases() -> List[Tuple[str, str, List]]:
+    """(name, query, params) for each read query shape DBManager issues"""
+    cases = [
+        ("categories", queries.CATEGORIES_QUERY, []),
+        ("product by id", queries.PRODUCT_BY_ID_QUERY, [1]),
+        ("known products", queries.KNOWN_PRODUCTS_QUERY, [["https://seed.invalid/p/1", "https://seed.invalid/p/2"]]),
+        ("enrichment cache", queries.ENRICHMENT_QUERY, [["B000000001", "B000000002"]]),
+        ("best deals", *queries.best_deals_query(10)),
+        ("best deals in category", *queries.best_deals_query(10, category_id=1)),
+        ("best deals above thresholds", *queries.best_deals_query(10, min_discount=40, min_rating=4.5)),
+        ("insert_category duplicate check", "SELECT id FROM categories WHERE name = %s OR url = %s;",
+         ["Seed > Category 1", "https://seed.invalid/c/1"]),
+    ]
+    filter_samples = {
+        "category_id": 1,
+        "brand": "brand 42",
+        "min_price": 450,
+        "max_price": 5,
+        "min_discount": 55,
+        "min_rating": 4.8,
+    }
+    for name, value in filter_samples.items():
+        filters = {name: value}
+        cases.append((f"products {name}", *queries.products_query(limit=10, **filters)))
+        cases.append((f"count {name}", *queries.products_count_query(**filters)))
+    for sort_by in queries.VALID_SORT_COLUMNS:
+        for sort_order in queries.VALID_SORT_ORDERS:
+            cases.append((f"products by {sort_by} {sort_order}", *queries.products_query(sort_by, sort_order, 10, 0)))
+            cursor = queries.encode_cursor(sort_by, sort_order, {"id": 100, sort_by: 10})
+            cases.append((f"keyset by {sort_by} {sort_order}", *queries.products_keyset_query(cursor, 10)))
+    cases.append(("capped count", *queries.products_capped_count_query(10000)))
+    end = datetime.now(timezone.utc)
+    for bucket in queries.HISTORY_BUCKETS:
+        cases.append((f"price history by {bucket}", *queries.price_history_query(1, end - timedelta(days=90), end, bucket)))
+    return cases
+
+
+def seq_scans(plan: Dict) -> List[str]:
+    """Tables read by Seq Scan anywhere in a JSON plan node"""
+    tables = []
+    if plan.get("Node Type") == "Seq Scan":
+        tables.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        tables.extend(seq_scans(child))
+    return tables
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.database.migrate", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    upgrade = commands.add_parser("upgrade", help="apply pending migrations")
+    upgrade.add_argument("--target", type=int, help="stop after this version")
+    commands.add_parser("status", help="list migrations and whether they are applied")
+    explain = commands.add_parser("explain", help="check that no DBManager query needs a sequential scan")
+    explain.add_argument("--products", type=int, default=20000, help="rows to seed (rolled back afterwards)")
+    args = parser.parse_args(argv)
+
+    migrator = Migrator()
+    if args.command == "upgrade":
+        for migration in migrator.upgrade(args.target):
+            print(f"applied {migration.version:04d}_{migration.name}")
+        return 0
+    if args.command == "status":
+        for version, name, state in migrator.status():
+            print(f"{version:04d}_{name:<30} {state}")
+        return 0
+
+    failures = 0
+    for name, tables in migrator.explain(args.products):
+        if tables:
+            failures += 1
+            print(f"SEQ SCAN  {name}: {', '.join(tables)}")
+        else:
+            print(f"ok        {name}")
+    print(f"{failures} queries need a sequential scan")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
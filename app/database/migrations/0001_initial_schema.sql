@@ -0,0 +1,45 @@
+-- Base tables. IF NOT EXISTS / ADD COLUMN IF NOT EXISTS so databases that were
+-- created by hand before migrations existed are brought in line, not rejected.
+
+CREATE TABLE IF NOT EXISTS categories (
+    id SERIAL PRIMARY KEY,
+    name TEXT NOT NULL,
+    url TEXT NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS products (
+    id SERIAL PRIMARY KEY,
+    title TEXT NOT NULL,
+    brand TEXT,
+    price NUMERIC(10, 2),
+    original_price NUMERIC(10, 2),
+    discount_percent NUMERIC(5, 2) NOT NULL DEFAULT 0,
+    rating NUMERIC(3, 2),
+    reviews_count INTEGER NOT NULL DEFAULT 0,
+    product_link TEXT NOT NULL,
+    image_url TEXT,
+    availability TEXT,
+    category_id INTEGER REFERENCES categories (id) ON DELETE SET NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE categories ADD COLUMN IF NOT EXISTS created_at TIMESTAMPTZ NOT NULL DEFAULT NOW();
+ALTER TABLE products ADD COLUMN IF NOT EXISTS created_at TIMESTAMPTZ NOT NULL DEFAULT NOW();
+ALTER TABLE products ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW();
+
+-- The keyset pagination sorts on these directly, so they must not be NULL
+UPDATE products SET discount_percent = 0 WHERE discount_percent IS NULL;
+UPDATE products SET reviews_count = 0 WHERE reviews_count IS NULL;
+ALTER TABLE products ALTER COLUMN discount_percent SET DEFAULT 0, ALTER COLUMN discount_percent SET NOT NULL;
+ALTER TABLE products ALTER COLUMN reviews_count SET DEFAULT 0, ALTER COLUMN reviews_count SET NOT NULL;
+
+-- Bulk upserts conflict on these keys; keep the newest row of any duplicates
+DELETE FROM products a USING products b WHERE a.product_link = b.product_link AND a.id < b.id;
+UPDATE products p SET category_id = d.keep
+FROM (SELECT id, MAX(id) OVER (PARTITION BY url) AS keep FROM categories) d
+WHERE p.category_id = d.id AND d.id <> d.keep;
+DELETE FROM categories a USING categories b WHERE a.url = b.url AND a.id < b.id;
+CREATE UNIQUE INDEX IF NOT EXISTS products_product_link_key ON products (product_link);
+CREATE UNIQUE INDEX IF NOT EXISTS categories_url_key ON categories (url);
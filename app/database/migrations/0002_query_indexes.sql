@@ -0,0 +1,27 @@
+-- Indexes for the predicates and orderings built in app/database/queries.py
+
+-- category_id filter, paged by id
+CREATE INDEX IF NOT EXISTS products_category_id_idx ON products (category_id, id);
+
+-- brand filter is case-insensitive
+CREATE INDEX IF NOT EXISTS products_brand_lower_idx ON products (LOWER(brand));
+
+-- insert_product's "title = %s OR product_link = %s" duplicate check
+CREATE INDEX IF NOT EXISTS products_title_idx ON products (title);
+
+-- Range filters
+CREATE INDEX IF NOT EXISTS products_price_idx ON products (price);
+CREATE INDEX IF NOT EXISTS products_rating_idx ON products (rating);
+
+-- Sort keys with the id tie-breaker, matching SORT_EXPRESSIONS for keyset seeks;
+-- discount_percent and reviews_count are NOT NULL so they also serve range filters
+CREATE INDEX IF NOT EXISTS products_price_sort_idx ON products ((COALESCE(price, 0)), id);
+CREATE INDEX IF NOT EXISTS products_rating_sort_idx ON products ((COALESCE(rating, 0)), id);
+CREATE INDEX IF NOT EXISTS products_discount_sort_idx ON products (discount_percent, id);
+CREATE INDEX IF NOT EXISTS products_reviews_sort_idx ON products (reviews_count, id);
+
+-- get_best_deals ordering
+CREATE INDEX IF NOT EXISTS products_best_deals_idx ON products (discount_percent DESC, rating DESC);
+
+-- get_all_categories ordering
+CREATE INDEX IF NOT EXISTS categories_name_idx ON categories (name);
@@ -0,0 +1,61 @@
+-- Stored deal score and a per-category best-deals ranking.
+--
+-- deal_score rewards the discount, scaled up to 1.5x by rating, plus the
+-- rating weighted by how many reviews back it up:
+--   discount_percent * (0.5 + rating / 10) + rating * ln(1 + reviews_count)
+-- e.g. 50% off at 4.5 stars with 1000 reviews scores 47.5 + 31.1 = 78.6.
+
+ALTER TABLE products ADD COLUMN IF NOT EXISTS deal_score DOUBLE PRECISION
+    GENERATED ALWAYS AS (
+        discount_percent::float8 * (0.5 + COALESCE(rating, 0)::float8 / 10)
+        + COALESCE(rating, 0)::float8 * LN(1 + reviews_count)
+    ) STORED;
+
+-- Superseded by best_deals below
+DROP INDEX IF EXISTS products_best_deals_idx;
+
+-- Ranks one category at a time when best_deals is refreshed
+CREATE INDEX IF NOT EXISTS products_category_deal_score_idx ON products (category_id, deal_score DESC, id);
+
+-- Top products per category, denormalized so /api/best-deals reads one small
+-- table in deal_score order without joining or sorting products
+CREATE TABLE IF NOT EXISTS best_deals (
+    category_id INTEGER NOT NULL REFERENCES categories (id) ON DELETE CASCADE,
+    rank INTEGER NOT NULL,
+    product_id INTEGER NOT NULL REFERENCES products (id) ON DELETE CASCADE,
+    deal_score DOUBLE PRECISION NOT NULL,
+    title TEXT NOT NULL,
+    brand TEXT,
+    price NUMERIC(10, 2),
+    original_price NUMERIC(10, 2),
+    discount_percent NUMERIC(5, 2) NOT NULL,
+    rating NUMERIC(3, 2),
+    reviews_count INTEGER NOT NULL,
+    product_link TEXT NOT NULL,
+    image_url TEXT,
+    availability TEXT,
+    category_name TEXT NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (category_id, rank)
+);
+
+CREATE INDEX IF NOT EXISTS best_deals_score_idx ON best_deals (deal_score DESC, product_id);
+CREATE INDEX IF NOT EXISTS best_deals_category_score_idx ON best_deals (category_id, deal_score DESC, product_id);
+CREATE INDEX IF NOT EXISTS best_deals_product_idx ON best_deals (product_id);
+
+-- Initial ranking; later refreshes only touch the categories of each ingest batch
+INSERT INTO best_deals
+SELECT ranked.category_id, ranked.rank, ranked.id, ranked.deal_score, ranked.title, ranked.brand,
+       ranked.price, ranked.original_price, ranked.discount_percent, ranked.rating, ranked.reviews_count,
+       ranked.product_link, ranked.image_url, ranked.availability, ranked.category_name,
+       ranked.created_at, ranked.updated_at
+FROM (
+    SELECT p.*, c.name AS category_name,
+           ROW_NUMBER() OVER (PARTITION BY p.category_id ORDER BY p.deal_score DESC, p.id) AS rank
+    FROM products p
+    JOIN categories c ON c.id = p.category_id
+    WHERE p.deal_score > 0
+) ranked
+WHERE ranked.rank <= 100
+ON CONFLICT DO NOTHING;
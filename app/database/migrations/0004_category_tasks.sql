@@ -0,0 +1,26 @@
+-- Work queue of per-category product scrapes shared by scraper processes.
+-- Workers claim rows with FOR UPDATE SKIP LOCKED and hold them under a lease
+-- they extend by heartbeat; a lease that runs out makes the task claimable
+-- again until max attempts are used up.
+
+CREATE TABLE IF NOT EXISTS category_tasks (
+    id BIGSERIAL PRIMARY KEY,
+    crawl_id TEXT NOT NULL,
+    category_id INTEGER NOT NULL REFERENCES categories (id) ON DELETE CASCADE,
+    max_products INTEGER NOT NULL,
+    max_pages INTEGER NOT NULL DEFAULT 1,
+    status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'leased', 'done', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    leased_by TEXT,
+    lease_expires_at TIMESTAMPTZ,
+    heartbeat_at TIMESTAMPTZ,
+    products_saved INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    finished_at TIMESTAMPTZ,
+    UNIQUE (crawl_id, category_id)
+);
+
+-- Claim scans only open tasks, in id order
+CREATE INDEX IF NOT EXISTS category_tasks_open_idx ON category_tasks (id)
+    WHERE status IN ('pending', 'leased');
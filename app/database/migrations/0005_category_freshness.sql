@@ -0,0 +1,8 @@
+-- Per-category freshness for incremental re-scrapes. content_fingerprint is a
+-- hash of the first results page as last seen; last_scraped_at is the last
+-- visit of any kind, last_changed_at the last visit that found the page
+-- changed and so scraped the category in full.
+
+ALTER TABLE categories ADD COLUMN IF NOT EXISTS last_scraped_at TIMESTAMPTZ;
+ALTER TABLE categories ADD COLUMN IF NOT EXISTS last_changed_at TIMESTAMPTZ;
+ALTER TABLE categories ADD COLUMN IF NOT EXISTS content_fingerprint TEXT;
@@ -0,0 +1,78 @@
+-- Append-only price history. Every ingested observation of a product is a
+-- row of price_history, range partitioned by month on observed_at so a
+-- history read only touches the months it asks for and old months can be
+-- dropped whole. There is no foreign key to products: checking one per row
+-- would slow the bulk inserts, and history outlives deleted products.
+--
+-- price_history_daily is maintained in the same transaction as the insert
+-- and holds one row per product and UTC day, so day/week/month series never
+-- read the raw observations.
+
+CREATE TABLE IF NOT EXISTS price_history (
+    product_id INTEGER NOT NULL,
+    observed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    price NUMERIC(10, 2),
+    original_price NUMERIC(10, 2),
+    discount_percent NUMERIC(5, 2) NOT NULL DEFAULT 0,
+    rating NUMERIC(3, 2),
+    reviews_count INTEGER NOT NULL DEFAULT 0,
+    availability TEXT
+) PARTITION BY RANGE (observed_at);
+
+CREATE INDEX IF NOT EXISTS price_history_product_observed_idx ON price_history (product_id, observed_at);
+
+-- Creates the monthly partitions covering `months` months from `start`'s month
+CREATE OR REPLACE FUNCTION price_history_ensure_partitions(start TIMESTAMPTZ, months INTEGER)
+RETURNS INTEGER LANGUAGE plpgsql AS $$
+DECLARE
+    month_start TIMESTAMPTZ;
+    created INTEGER := 0;
+    partition_name TEXT;
+BEGIN
+    FOR i IN 0 .. months - 1 LOOP
+        month_start := date_trunc('month', start AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' + make_interval(months => i);
+        partition_name := 'price_history_' || to_char(month_start AT TIME ZONE 'UTC', 'YYYYMM');
+        IF to_regclass(partition_name) IS NULL THEN
+            -- Another ingest may be creating the same month; wait for it, then look again
+            PERFORM pg_advisory_xact_lock(724113003);
+            CONTINUE WHEN to_regclass(partition_name) IS NOT NULL;
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF price_history FOR VALUES FROM (%L) TO (%L)',
+                partition_name, month_start, month_start + interval '1 month'
+            );
+            created := created + 1;
+        END IF;
+    END LOOP;
+    RETURN created;
+END;
+$$;
+
+SELECT price_history_ensure_partitions(NOW() - interval '1 month', 4);
+
+CREATE TABLE IF NOT EXISTS price_history_daily (
+    product_id INTEGER NOT NULL,
+    day DATE NOT NULL,
+    min_price NUMERIC(10, 2),
+    max_price NUMERIC(10, 2),
+    last_price NUMERIC(10, 2),
+    last_original_price NUMERIC(10, 2),
+    last_discount_percent NUMERIC(5, 2) NOT NULL,
+    last_rating NUMERIC(3, 2),
+    last_availability TEXT,
+    observations INTEGER NOT NULL,
+    last_observed_at TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (product_id, day)
+);
+
+-- Products scraped before history existed start with their current values
+INSERT INTO price_history (product_id, observed_at, price, original_price, discount_percent, rating, reviews_count, availability)
+SELECT id, updated_at, price, original_price, discount_percent, rating, reviews_count, availability
+FROM products
+WHERE updated_at >= date_trunc('month', NOW() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' - interval '1 month'
+  AND NOT EXISTS (SELECT 1 FROM price_history);
+
+INSERT INTO price_history_daily
+SELECT id, (updated_at AT TIME ZONE 'UTC')::date, price, price, price, original_price, discount_percent,
+       rating, availability, 1, updated_at
+FROM products
+ON CONFLICT (product_id, day) DO NOTHING;
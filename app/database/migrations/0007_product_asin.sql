@@ -0,0 +1,65 @@
+-- Canonical product identity. Result links carry per-session ref= and
+-- tracking parameters, so one product used to be stored once per URL it was
+-- seen under. Products now carry their ASIN, unique, and product_link is the
+-- canonical <host>/dp/<ASIN> URL the scraper derives from it.
+
+ALTER TABLE products ADD COLUMN IF NOT EXISTS asin TEXT;
+
+UPDATE products
+SET asin = substring(product_link FROM '/(?:dp|gp/product|gp/aw/d)/([A-Z0-9]{10})(?:[/?&#]|$)')
+WHERE asin IS NULL;
+
+-- Merge rows that turn out to be the same ASIN into the newest one
+CREATE TEMP TABLE asin_duplicates ON COMMIT DROP AS
+SELECT id, keep
+FROM (SELECT id, MAX(id) OVER (PARTITION BY asin) AS keep FROM products WHERE asin IS NOT NULL) d
+WHERE id <> keep;
+
+UPDATE price_history h SET product_id = d.keep FROM asin_duplicates d WHERE h.product_id = d.id;
+
+INSERT INTO price_history_daily AS t
+SELECT d.keep, h.day, MIN(h.min_price), MAX(h.max_price),
+       (ARRAY_AGG(h.last_price ORDER BY h.last_observed_at DESC))[1],
+       (ARRAY_AGG(h.last_original_price ORDER BY h.last_observed_at DESC))[1],
+       (ARRAY_AGG(h.last_discount_percent ORDER BY h.last_observed_at DESC))[1],
+       (ARRAY_AGG(h.last_rating ORDER BY h.last_observed_at DESC))[1],
+       (ARRAY_AGG(h.last_availability ORDER BY h.last_observed_at DESC))[1],
+       SUM(h.observations), MAX(h.last_observed_at)
+FROM price_history_daily h
+JOIN asin_duplicates d ON h.product_id = d.id
+GROUP BY d.keep, h.day
+ON CONFLICT (product_id, day) DO UPDATE SET
+    min_price = LEAST(t.min_price, EXCLUDED.min_price),
+    max_price = GREATEST(t.max_price, EXCLUDED.max_price),
+    last_price = CASE WHEN EXCLUDED.last_observed_at > t.last_observed_at THEN EXCLUDED.last_price ELSE t.last_price END,
+    last_original_price = CASE WHEN EXCLUDED.last_observed_at > t.last_observed_at
+                               THEN EXCLUDED.last_original_price ELSE t.last_original_price END,
+    last_discount_percent = CASE WHEN EXCLUDED.last_observed_at > t.last_observed_at
+                                 THEN EXCLUDED.last_discount_percent ELSE t.last_discount_percent END,
+    last_rating = CASE WHEN EXCLUDED.last_observed_at > t.last_observed_at THEN EXCLUDED.last_rating ELSE t.last_rating END,
+    last_availability = CASE WHEN EXCLUDED.last_observed_at > t.last_observed_at
+                             THEN EXCLUDED.last_availability ELSE t.last_availability END,
+    observations = t.observations + EXCLUDED.observations,
+    last_observed_at = GREATEST(t.last_observed_at, EXCLUDED.last_observed_at);
+
+-- Keep the brand a merged duplicate had found, if the survivor has none
+UPDATE products p SET brand = found.brand
+FROM (
+    SELECT d.keep, MAX(dup.brand) AS brand
+    FROM asin_duplicates d JOIN products dup ON dup.id = d.id
+    WHERE dup.brand IS NOT NULL AND dup.brand <> 'Unknown'
+    GROUP BY d.keep
+) found
+WHERE p.id = found.keep AND (p.brand IS NULL OR p.brand = 'Unknown');
+
+DELETE FROM price_history_daily h USING asin_duplicates d WHERE h.product_id = d.id;
+DELETE FROM products p USING asin_duplicates d WHERE p.id = d.id;
+
+UPDATE products SET product_link = substring(product_link FROM '^https?://[^/]+') || '/dp/' || asin
+WHERE asin IS NOT NULL AND product_link ~ '^https?://'
+  AND product_link <> substring(product_link FROM '^https?://[^/]+') || '/dp/' || asin;
+
+UPDATE best_deals b SET product_link = p.product_link
+FROM products p WHERE b.product_id = p.id AND b.product_link <> p.product_link;
+
+CREATE UNIQUE INDEX IF NOT EXISTS products_asin_key ON products (asin);
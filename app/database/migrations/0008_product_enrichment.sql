@@ -0,0 +1,18 @@
+-- Detail-page fields per ASIN, so the scraper can skip product page loads for
+-- values it fetched recently. One row per (asin, field); how long a value is
+-- trusted is decided by the scraper's per-field TTLs, not stored here.
+
+CREATE TABLE IF NOT EXISTS product_enrichment (
+    asin TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value JSONB,
+    fetched_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (asin, field)
+);
+
+-- Brands found before the cache existed
+INSERT INTO product_enrichment (asin, field, value, fetched_at)
+SELECT asin, 'brand', to_jsonb(brand), updated_at
+FROM products
+WHERE asin IS NOT NULL AND brand IS NOT NULL AND brand <> 'Unknown'
+ON CONFLICT (asin, field) DO NOTHING;
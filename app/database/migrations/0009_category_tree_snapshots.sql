@@ -0,0 +1,18 @@
+-- Versioned snapshots of the department/subcategory tree read from the site
+-- menu. A scrape that finds the same tree as the latest version only moves
+-- its checked_at; a different tree becomes a new version. Runs reuse the
+-- latest version without a browser while checked_at is within their TTL.
+
+CREATE TABLE IF NOT EXISTS category_tree_snapshots (
+    version SERIAL PRIMARY KEY,
+    base_url TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    complete BOOLEAN NOT NULL,
+    departments INTEGER NOT NULL,
+    categories INTEGER NOT NULL,
+    tree JSONB NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    checked_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS category_tree_snapshots_latest_idx ON category_tree_snapshots (base_url, version DESC);
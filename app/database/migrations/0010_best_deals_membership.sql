@@ -0,0 +1,20 @@
+-- Rebuild best_deals after two ranking fixes: products that moved category
+-- could keep a stale row in their old category's ranking, and rating-only
+-- products (no discount, no reviews, so deal_score 0) were left out, unlike
+-- the original discount-or-rating best deals.
+
+DELETE FROM best_deals;
+
+INSERT INTO best_deals
+SELECT ranked.category_id, ranked.rank, ranked.id, ranked.deal_score, ranked.title, ranked.brand,
+       ranked.price, ranked.original_price, ranked.discount_percent, ranked.rating, ranked.reviews_count,
+       ranked.product_link, ranked.image_url, ranked.availability, ranked.category_name,
+       ranked.created_at, ranked.updated_at
+FROM (
+    SELECT p.*, c.name AS category_name,
+           ROW_NUMBER() OVER (PARTITION BY p.category_id ORDER BY p.deal_score DESC, p.id) AS rank
+    FROM products p
+    JOIN categories c ON c.id = p.category_id
+    WHERE p.discount_percent > 0 OR p.rating > 0
+) ranked
+WHERE ranked.rank <= 100;
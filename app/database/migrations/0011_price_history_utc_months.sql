@@ -0,0 +1,73 @@
+-- price_history partitions on UTC month boundaries whatever the server
+-- TimeZone. 0006 added make_interval and '1 month' to a timestamptz, which
+-- follows the session TimeZone, so outside UTC the partition bounds drifted
+-- off the month and could leave gaps no partition accepts; an ingest landing
+-- in one rolled back with its product upsert. The month arithmetic is now
+-- done on the UTC wall-clock timestamp, and partitions created with drifted
+-- bounds are rebuilt.
+
+SET LOCAL TimeZone = 'UTC';
+
+-- Creates the monthly partitions covering `months` months from `start`'s month
+CREATE OR REPLACE FUNCTION price_history_ensure_partitions(start TIMESTAMPTZ, months INTEGER)
+RETURNS INTEGER LANGUAGE plpgsql AS $$
+DECLARE
+    first_month TIMESTAMP := date_trunc('month', start AT TIME ZONE 'UTC');
+    month TIMESTAMP;
+    created INTEGER := 0;
+    partition_name TEXT;
+BEGIN
+    FOR i IN 0 .. months - 1 LOOP
+        month := first_month + make_interval(months => i);
+        partition_name := 'price_history_' || to_char(month, 'YYYYMM');
+        IF to_regclass(partition_name) IS NULL THEN
+            -- Another ingest may be creating the same month; wait for it, then look again
+            PERFORM pg_advisory_xact_lock(724113003);
+            CONTINUE WHEN to_regclass(partition_name) IS NOT NULL;
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF price_history FOR VALUES FROM (%L) TO (%L)',
+                partition_name, month AT TIME ZONE 'UTC', (month + interval '1 month') AT TIME ZONE 'UTC'
+            );
+            created := created + 1;
+        END IF;
+    END LOOP;
+    RETURN created;
+END;
+$$;
+
+-- Move the rows of every partition whose bounds are not its UTC month aside,
+-- drop those partitions, and re-insert the rows into correct ones
+DO $$
+DECLARE
+    part RECORD;
+    month TIMESTAMP;
+    span RECORD;
+BEGIN
+    CREATE TEMP TABLE price_history_misplaced (LIKE price_history) ON COMMIT DROP;
+    FOR part IN
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) AS bound
+        FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'price_history'::regclass
+    LOOP
+        month := to_date(right(part.relname, 6), 'YYYYMM')::timestamp;
+        CONTINUE WHEN part.bound = format(
+            'FOR VALUES FROM (%L) TO (%L)',
+            month AT TIME ZONE 'UTC', (month + interval '1 month') AT TIME ZONE 'UTC'
+        );
+        EXECUTE format('INSERT INTO price_history_misplaced SELECT * FROM %I', part.relname);
+        EXECUTE format('DROP TABLE %I', part.relname);
+        PERFORM price_history_ensure_partitions(month AT TIME ZONE 'UTC', 1);
+        RAISE NOTICE 'Rebuilt partition % (was %)', part.relname, part.bound;
+    END LOOP;
+
+    SELECT MIN(observed_at) AS first, MAX(observed_at) AS last INTO span FROM price_history_misplaced;
+    IF span.first IS NOT NULL THEN
+        PERFORM price_history_ensure_partitions(
+            span.first,
+            (EXTRACT(YEAR FROM age(date_trunc('month', span.last), date_trunc('month', span.first))) * 12
+             + EXTRACT(MONTH FROM age(date_trunc('month', span.last), date_trunc('month', span.first))))::int + 1
+        );
+        INSERT INTO price_history SELECT * FROM price_history_misplaced;
+    END IF;
+END;
+$$;
@@ -0,0 +1,28 @@
+-- Scrape jobs submitted through the API, shared by every API worker process.
+-- A job is claimed with FOR UPDATE SKIP LOCKED by whichever worker is free,
+-- status polls work from any worker, and the partial unique index on the
+-- parameter key merges identical submissions while one is queued or running.
+-- A running job's lease is extended by its worker; a job whose lease runs out
+-- lost its worker and is failed.
+
+CREATE TABLE IF NOT EXISTS scrape_jobs (
+    job_id TEXT PRIMARY KEY,
+    job_key TEXT NOT NULL,
+    params JSONB NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'running', 'succeeded', 'failed', 'cancelled')),
+    error TEXT,
+    merged_submissions INTEGER NOT NULL DEFAULT 0,
+    submitted_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    started_at TIMESTAMPTZ,
+    finished_at TIMESTAMPTZ,
+    categories_total INTEGER,
+    categories_done INTEGER NOT NULL DEFAULT 0,
+    products_ingested INTEGER NOT NULL DEFAULT 0,
+    claimed_by TEXT,
+    lease_expires_at TIMESTAMPTZ
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS scrape_jobs_active_key ON scrape_jobs (job_key)
+    WHERE status IN ('queued', 'running');
+
+CREATE INDEX IF NOT EXISTS scrape_jobs_submitted_idx ON scrape_jobs (submitted_at DESC);
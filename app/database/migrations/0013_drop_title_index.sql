@@ -0,0 +1,6 @@
+-- products_title_idx (0002) served insert_product's "title = %s OR
+-- product_link = %s" duplicate check. Ingestion is now an ON CONFLICT upsert
+-- on asin / product_link and no query filters or orders by title, so the
+-- index only slowed every product write.
+
+DROP INDEX IF EXISTS products_title_idx;
@@ -0,0 +1,223 @@
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+import psycopg2
+from psycopg2 import extensions
+from app.utils.logger import setup_logger
+
+
+class PoolTimeout(Exception):
+    """No connection became free within the pool's wait timeout"""
+
+
+class _PooledConnection:
+    def __init__(self, conn):
+        self.conn = conn
+        self.created_at = time.monotonic()
+
+
+class ConnectionPool:
+    """Thread-safe psycopg2 connection pool with a bounded connection lifetime.
+
+    Callers borrow with `connection()`; when all `max_size` connections are
+    checked out they wait up to `timeout` seconds for one to come back.
+    Connections older than `max_lifetime` seconds, or left broken by the last
+    borrower, are closed on return instead of going back to the idle list.
+    """
+
+    def __init__(self, name: str, connection_params: Dict, min_size: int = 1, max_size: int = 10,
+                 max_lifetime: float = 1800.0, timeout: float = 30.0):
+        self.name = name
+        self.connection_params = connection_params
+        self.min_size = min_size
+        self.max_size = max(max_size, 1)
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.logger = setup_logger(__name__)
+
+        self._cond = threading.Condition()
+        self._idle: List[_PooledConnection] = []
+        self._in_use: Dict[int, _PooledConnection] = {}
+        self._closed = False
+
+        self.connections_created = 0
+        self.connections_closed = 0
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+
+        for _ in range(self.min_size):
+            try:
+                self._idle.append(self._connect())
+            except Exception as e:
+                self.logger.warning(f"Pool '{name}' could not open its initial connections: {e}")
+                break
+
+    def _connect(self) -> _PooledConnection:
+        conn = psycopg2.connect(**self.connection_params)
+        self.connections_created += 1
+        return _PooledConnection(conn)
+
+    def _expired(self, pooled: _PooledConnection) -> bool:
+        return self.max_lifetime and time.monotonic() - pooled.created_at > self.max_lifetime
+
+    def _discard(self, pooled: _PooledConnection):
+        self.connections_closed += 1
+        try:
+            pooled.conn.close()
+        except Exception:
+            pass
+
+    def getconn(self):
+        """Check out a connection, waiting for one if the pool is at max_size"""
+        started = time.monotonic()
+        waited = False
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolTimeout(f"Pool '{self.name}' is closed")
+                while self._idle:
+                    pooled = self._idle.pop()
+                    if pooled.conn.closed or self._expired(pooled):
+                        self._discard(pooled)
+                        continue
+                    return self._checkout(pooled, started, waited)
+                if len(self._in_use) < self.max_size:
+                    # Reserve the slot before connecting outside the lock
+                    placeholder = _PooledConnection(None)
+                    self._in_use[id(placeholder)] = placeholder
+                    break
+                remaining = self.timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeout(f"Pool '{self.name}' exhausted: {self.max_size} connections in use for {self.timeout:.0f}s")
+                waited = True
+                self._cond.wait(remaining)
+
+        try:
+            pooled = self._connect()
+        except Exception:
+            with self._cond:
+                del self._in_use[id(placeholder)]
+                self._cond.notify()
+            raise
+        with self._cond:
+            del self._in_use[id(placeholder)]
+            return self._checkout(pooled, started, waited)
+
+    def _checkout(self, pooled: _PooledConnection, started: float, waited: bool):
+        elapsed = time.monotonic() - started
+        self._in_use[id(pooled.conn)] = pooled
+        self.checkouts += 1
+        if waited:
+            self.waits += 1
+        self.wait_seconds += elapsed
+        self.max_wait_seconds = max(self.max_wait_seconds, elapsed)
+        return pooled.conn
+
+    def putconn(self, conn, broken: bool = False):
+        """Return a connection, closing it if it is broken, expired or the pool is closed"""
+        with self._cond:
+            pooled = self._in_use.pop(id(conn), None)
+            if pooled is None:
+                return
+            if not broken and not conn.closed and conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except Exception:
+                    broken = True
+            if self._closed or broken or conn.closed or self._expired(pooled):
+                self._discard(pooled)
+            else:
+                self._idle.append(pooled)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of the block"""
+        conn = self.getconn()
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self.putconn(conn, broken)
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                "name": self.name,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "idle": len(self._idle),
+                "checked_out": len(self._in_use),
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "avg_wait_ms": self.wait_seconds / self.checkouts * 1000 if self.checkouts else 0.0,
+                "max_wait_ms": self.max_wait_seconds * 1000,
+                "timeouts": self.timeouts,
+                "connections_created": self.connections_created,
+                "connections_closed": self.connections_closed,
+            }
+
+    def close(self):
+        """Close idle connections now and checked out ones when they come back"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            for pooled in idle:
+                self._discard(pooled)
+            self._cond.notify_all()
+
+
+# Default sizes per pool name; DB_POOL_<NAME>_MIN / _MAX override them
+POOL_SIZES = {
+    "api": (2, 10),
+    "scraper": (1, 4),
+}
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name: str, connection_params: Dict) -> ConnectionPool:
+    """The process-wide pool called `name`, created on first use"""
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None or pool._closed:
+            min_size, max_size = POOL_SIZES.get(name, (1, 10))
+            prefix = f"DB_POOL_{name.upper()}"
+            pool = _pools[name] = ConnectionPool(
+                name,
+                connection_params,
+                min_size=int(os.getenv(f"{prefix}_MIN", min_size)),
+                max_size=int(os.getenv(f"{prefix}_MAX", max_size)),
+                max_lifetime=float(os.getenv("DB_POOL_MAX_LIFETIME", 1800)),
+                timeout=float(os.getenv("DB_POOL_TIMEOUT", 30)),
+            )
+        return pool
+
+
+def pool_stats(name: Optional[str] = None) -> Dict[str, Dict]:
+    """Stats of every open pool, or only of `name`"""
+    with _pools_lock:
+        pools = {n: p for n, p in _pools.items() if name is None or n == name}
+    return {n: p.stats() for n, p in pools.items()}
+
+
+def close_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_pools)
@@ -0,0 +1,315 @@
+"""SQL shared by the sync (psycopg2) and async (asyncpg) data access layers.
+
+Builders return `(query, params)` with psycopg2 `%s` placeholders;
+`to_asyncpg` rewrites them to asyncpg's numbered `$n` form.
+"""
+import base64
+import json
+import re
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+VALID_SORT_COLUMNS = ["id", "price", "discount_percent", "rating", "reviews_count"]
+VALID_SORT_ORDERS = ["ASC", "DESC"]
+
+# Keyset sort keys; NULL prices and ratings sort as 0 so the row comparison is
+# total. Each has a matching (expression, id) index in migrations/0002.
+SORT_EXPRESSIONS = {
+    "id": "p.id",
+    "price": "COALESCE(p.price, 0)",
+    "discount_percent": "p.discount_percent",
+    "rating": "COALESCE(p.rating, 0)",
+    "reviews_count": "p.reviews_count",
+}
+
+PRODUCT_SELECT = """
+    SELECT
+        p.*,
+        c.name AS category_name
+    FROM products p
+    LEFT JOIN categories c ON p.category_id = c.id
+"""
+
+CATEGORIES_QUERY = "SELECT * FROM categories ORDER BY name;"
+
+PRODUCT_BY_ID_QUERY = PRODUCT_SELECT + " WHERE p.id = %s;"
+
+# Stored values an incremental re-scrape compares freshly scraped cards against
+KNOWN_PRODUCTS_QUERY = "SELECT product_link, price, availability, brand FROM products WHERE product_link = ANY(%s);"
+
+# Cached detail-page fields of a set of ASINs
+ENRICHMENT_QUERY = "SELECT asin, field, value, fetched_at FROM product_enrichment WHERE asin = ANY(%s);"
+
+# Products kept per category in the best_deals ranking
+BEST_DEALS_PER_CATEGORY = 100
+
+BEST_DEALS_SELECT = """
+    SELECT
+        product_id AS id, category_id, deal_score, title, brand, price, original_price,
+        discount_percent, rating, reviews_count, product_link, image_url, availability,
+        category_name, created_at, updated_at
+    FROM best_deals
+"""
+
+# Re-rank the given categories (%s is an int array) from products
+REFRESH_BEST_DEALS_QUERY = f"""
+    INSERT INTO best_deals
+    SELECT ranked.category_id, ranked.rank, ranked.id, ranked.deal_score, ranked.title, ranked.brand,
+           ranked.price, ranked.original_price, ranked.discount_percent, ranked.rating, ranked.reviews_count,
+           ranked.product_link, ranked.image_url, ranked.availability, ranked.category_name,
+           ranked.created_at, ranked.updated_at
+    FROM categories c
+    CROSS JOIN LATERAL (
+        SELECT p.*, c.name AS category_name,
+               ROW_NUMBER() OVER (ORDER BY p.deal_score DESC, p.id) AS rank
+        FROM products p
+        WHERE p.category_id = c.id AND (p.discount_percent > 0 OR p.rating > 0)
+        ORDER BY p.deal_score DESC, p.id
+        LIMIT {BEST_DEALS_PER_CATEGORY}
+    ) ranked
+    WHERE c.id = ANY(%s);
+"""
+
+
+def _numeric(value) -> Decimal:
+    """A NUMERIC bound as the decimal it was written as.
+
+    asyncpg encodes a float as its exact binary expansion (19.99 becomes
+    19.989999...), which would drop rows equal to the bound; psycopg2 sends
+    the float's repr. Both layers get the same value this way.
+    """
+    return Decimal(str(value))
+
+
+def best_deals_query(limit: int = 10, category_id: Optional[int] = None, min_discount: Optional[float] = None,
+                     min_rating: Optional[float] = None) -> Tuple[str, List]:
+    """Top products by deal_score from the best_deals ranking, optionally per category and above thresholds"""
+    conditions = []
+    params = []
+    if category_id:
+        conditions.append("category_id = %s")
+        params.append(category_id)
+    if min_discount is not None:
+        conditions.append("discount_percent >= %s")
+        params.append(_numeric(min_discount))
+    if min_rating is not None:
+        conditions.append("rating >= %s")
+        params.append(_numeric(min_rating))
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = f"{BEST_DEALS_SELECT} {where} ORDER BY deal_score DESC, product_id LIMIT %s"
+    return query, params + [limit]
+
+
+# Downsampling of /api/products/{id}/history; "raw" returns the observations themselves
+HISTORY_BUCKETS = ("raw", "day", "week", "month")
+
+# Most raw observations one history request returns
+RAW_HISTORY_LIMIT = 5000
+
+PRICE_HISTORY_POINT = """
+    MIN(min_price) AS min_price,
+    MAX(max_price) AS max_price,
+    (ARRAY_AGG(last_price ORDER BY day DESC))[1] AS last_price,
+    (ARRAY_AGG(last_original_price ORDER BY day DESC))[1] AS last_original_price,
+    (ARRAY_AGG(last_discount_percent ORDER BY day DESC))[1] AS last_discount_percent,
+    (ARRAY_AGG(last_rating ORDER BY day DESC))[1] AS last_rating,
+    (ARRAY_AGG(last_availability ORDER BY day DESC))[1] AS last_availability,
+    SUM(observations)::int AS observations
+"""
+
+
+def price_history_query(product_id: int, start: datetime, end: datetime, bucket: str = "day") -> Tuple[str, List]:
+    """One row per `bucket` of a product's price observations between `start` and `end` (inclusive).
+
+    Day, week and month buckets are read from the price_history_daily rollup,
+    with day boundaries in UTC; raw observations come from the partitioned
+    price_history, pruned to the months the range covers.
+    """
+    if bucket not in HISTORY_BUCKETS:
+        raise ValueError(f"Invalid bucket: {bucket}")
+    if bucket == "raw":
+        query = """
+            SELECT observed_at AS bucket_start, price AS min_price, price AS max_price, price AS last_price,
+                   original_price AS last_original_price, discount_percent AS last_discount_percent,
+                   rating AS last_rating, availability AS last_availability, 1 AS observations
+            FROM price_history
+            WHERE product_id = %s AND observed_at >= %s AND observed_at <= %s
+            ORDER BY observed_at
+            LIMIT %s
+        """
+        return query, [product_id, start, end, RAW_HISTORY_LIMIT]
+
+    first_day = start.astimezone(timezone.utc).date()
+    last_day = end.astimezone(timezone.utc).date()
+    if bucket == "day":
+        query = """
+            SELECT (day::timestamp AT TIME ZONE 'UTC') AS bucket_start, min_price, max_price, last_price,
+                   last_original_price, last_discount_percent, last_rating, last_availability, observations
+            FROM price_history_daily
+            WHERE product_id = %s AND day >= %s AND day <= %s
+            ORDER BY day
+        """
+    else:
+        query = f"""
+            SELECT (date_trunc('{bucket}', day)::timestamp AT TIME ZONE 'UTC') AS bucket_start, {PRICE_HISTORY_POINT}
+            FROM price_history_daily
+            WHERE product_id = %s AND day >= %s AND day <= %s
+            GROUP BY 1
+            ORDER BY 1
+        """
+    return query, [product_id, first_day, last_day]
+
+
+def product_filters(
+    category_id: Optional[int] = None,
+    brand: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_discount: Optional[float] = None,
+    min_rating: Optional[float] = None,
+) -> Tuple[str, List]:
+    """WHERE clause (starting with "WHERE 1=1") and params for the product filters"""
+    conditions = []
+    params = []
+    if category_id:
+        conditions.append("p.category_id = %s")
+        params.append(category_id)
+    if brand:
+        conditions.append("LOWER(p.brand) = LOWER(%s)")
+        params.append(brand)
+    if min_price is not None:
+        conditions.append("p.price >= %s")
+        params.append(_numeric(min_price))
+    if max_price is not None:
+        conditions.append("p.price <= %s")
+        params.append(_numeric(max_price))
+    if min_discount is not None:
+        conditions.append("p.discount_percent >= %s")
+        params.append(_numeric(min_discount))
+    if min_rating is not None:
+        conditions.append("p.rating >= %s")
+        params.append(_numeric(min_rating))
+
+    where = "WHERE 1=1"
+    if conditions:
+        where += " AND " + " AND ".join(conditions)
+    return where, params
+
+
+def _sort(sort_by: str, sort_order: str) -> Tuple[str, str]:
+    sort_by = sort_by if sort_by in VALID_SORT_COLUMNS else "id"
+    sort_order = sort_order.upper() if sort_order and sort_order.upper() in VALID_SORT_ORDERS else "DESC"
+    return sort_by, sort_order
+
+
+def _order_by(sort_by: str, sort_order: str) -> str:
+    if sort_by == "id":
+        return f"ORDER BY p.id {sort_order}"
+    return f"ORDER BY {SORT_EXPRESSIONS[sort_by]} {sort_order}, p.id {sort_order}"
+
+
+def products_query(sort_by: str = "id", sort_order: str = "DESC", limit: int = 10, offset: int = 0, **filters) -> Tuple[str, List]:
+    """Filtered, sorted page of products by offset.
+
+    Fetches one row more than `limit` so the caller can tell whether a next
+    page exists (see `page_result`).
+    """
+    where, params = product_filters(**filters)
+    sort_by, sort_order = _sort(sort_by, sort_order)
+    query = f"{PRODUCT_SELECT} {where} {_order_by(sort_by, sort_order)} LIMIT %s OFFSET %s"
+    return query, params + [limit + 1, offset]
+
+
+def products_keyset_query(cursor: str, limit: int = 10, **filters) -> Tuple[str, List]:
+    """Filtered page of products after the row a cursor points at.
+
+    Seeks with a row comparison on (sort key, id) instead of skipping rows, so
+    every page costs the same however deep it is. Raises ValueError for a
+    malformed cursor.
+    """
+    sort_by, sort_order, value, last_id = decode_cursor(cursor)
+    where, params = product_filters(**filters)
+    op = "<" if sort_order == "DESC" else ">"
+    if sort_by == "id":
+        where += f" AND p.id {op} %s"
+        params.append(last_id)
+    else:
+        where += f" AND ({SORT_EXPRESSIONS[sort_by]}, p.id) {op} (%s, %s)"
+        params.extend([value, last_id])
+    query = f"{PRODUCT_SELECT} {where} {_order_by(sort_by, sort_order)} LIMIT %s"
+    return query, params + [limit + 1]
+
+
+def encode_cursor(sort_by: str, sort_order: str, row: Dict) -> str:
+    """Opaque cursor pointing just past `row` in the given ordering"""
+    sort_by, sort_order = _sort(sort_by, sort_order)
+    value = row.get(sort_by)
+    payload = [sort_by, sort_order, str(value) if value is not None else "0", row["id"]]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str, Decimal, int]:
+    """(sort_by, sort_order, sort value, id) of a cursor made by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_by, sort_order, value, last_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if sort_by not in VALID_SORT_COLUMNS or sort_order not in VALID_SORT_ORDERS:
+            raise ValueError(f"unknown ordering {sort_by} {sort_order}")
+        if sort_by in ("id", "reviews_count"):
+            value = int(value)
+        else:
+            value = Decimal(value)
+            # NaN and Infinity would seek past every row instead of failing
+            if not value.is_finite():
+                raise ValueError(f"non-finite sort value {value}")
+        return sort_by, sort_order, value, int(last_id)
+    except (ValueError, TypeError, ArithmeticError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+
+def page_result(rows: List[Dict], limit: int, sort_by: str, sort_order: str) -> Tuple[List[Dict], Optional[str]]:
+    """Trim the extra lookahead row and build the cursor of the next page"""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(sort_by, sort_order, rows[-1])
+
+
+def products_count_query(**filters) -> Tuple[str, List]:
+    """Number of products matching the filters.
+
+    No filter touches categories and the join is on its primary key, so the
+    count skips the join.
+    """
+    where, params = product_filters(**filters)
+    return f"SELECT COUNT(*) AS total FROM products p {where}", params
+
+
+def products_capped_count_query(cap: int, **filters) -> Tuple[str, List]:
+    """Matching products counted up to cap + 1, so a broad filter stops early"""
+    where, params = product_filters(**filters)
+    query = f"SELECT COUNT(*) AS total FROM (SELECT 1 FROM products p {where} LIMIT %s) capped"
+    return query, params + [cap + 1]
+
+
+def products_estimate_query(**filters) -> Tuple[str, List]:
+    """Planner plan for the count, read with `plan_rows`"""
+    where, params = product_filters(**filters)
+    return f"EXPLAIN (FORMAT JSON) SELECT 1 FROM products p {where}", params
+
+
+def plan_rows(plan) -> int:
+    """Estimated row count of an EXPLAIN (FORMAT JSON) result"""
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+_PLACEHOLDER = re.compile(r"%s")
+
+
+def to_asyncpg(query: str) -> str:
+    """Rewrite `%s` placeholders as `$1, $2, ...`"""
+    counter = iter(range(1, 10_000))
+    return _PLACEHOLDER.sub(lambda _: f"${next(counter)}", query)
@@ -0,0 +1,132 @@
+import json
+import uuid
+from typing import Dict, List, Optional, Tuple
+from psycopg2.extras import Json
+from app.database.database_manager import DBManager
+from app.utils.logger import setup_logger
+
+JOB_COLUMNS = """
+    job_id, params, status, error, merged_submissions, submitted_at, started_at, finished_at,
+    categories_total, categories_done, products_ingested
+"""
+
+
+class ScrapeJobStore:
+    """Postgres-backed scrape jobs (table scrape_jobs), shared by all API workers.
+
+    `submit` merges a submission into the queued or running job with the same
+    parameters, whichever process created it. `claim` hands the oldest queued
+    job to one worker under a lease that `heartbeat` extends; running jobs
+    whose lease expired are failed, since their worker is gone. Finished jobs
+    are kept up to `history` of them.
+    """
+
+    def __init__(self, db_manager: DBManager = None, lease_seconds: float = 120.0, history: int = 100):
+        self.db_manager = db_manager or DBManager(pool_name="api")
+        self.lease_seconds = lease_seconds
+        self.history = history
+        self.logger = setup_logger(__name__)
+
+    @staticmethod
+    def key(params: Dict) -> str:
+        """Submissions with equal keys are merged into one job"""
+        return json.dumps(params, sort_keys=True)
+
+    def _reap(self, cursor):
+        cursor.execute("""
+            UPDATE scrape_jobs
+            SET status = 'failed', finished_at = NOW(), error = 'worker lost', lease_expires_at = NULL
+            WHERE status = 'running' AND lease_expires_at < NOW();
+        """)
+        if cursor.rowcount:
+            self.logger.warning(f"Failed {cursor.rowcount} scrape jobs whose worker stopped renewing their lease")
+
+    def submit(self, params: Dict) -> Tuple[Dict, bool]:
+        """Queue a job for `params`, or count a merge into the active one; (job row, merged)"""
+        with self.db_manager.get_cursor() as cursor:
+            self._reap(cursor)
+            cursor.execute(f"""
+                INSERT INTO scrape_jobs (job_id, job_key, params)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (job_key) WHERE status IN ('queued', 'running')
+                DO UPDATE SET merged_submissions = scrape_jobs.merged_submissions + 1
+                RETURNING {JOB_COLUMNS}, (xmax = 0) AS inserted;
+            """, (uuid.uuid4().hex, self.key(params), Json(params)))
+            job = dict(cursor.fetchone())
+        return job, not job.pop("inserted")
+
+    def claim(self, worker_id: str) -> Optional[Dict]:
+        """Start the oldest queued job for `worker_id`, or None if there is none"""
+        with self.db_manager.get_cursor() as cursor:
+            self._reap(cursor)
+            cursor.execute(f"""
+                UPDATE scrape_jobs
+                SET status = 'running', started_at = NOW(), claimed_by = %s,
+                    lease_expires_at = NOW() + make_interval(secs => %s)
+                WHERE job_id = (
+                    SELECT job_id FROM scrape_jobs
+                    WHERE status = 'queued'
+                    ORDER BY submitted_at
+                    FOR UPDATE SKIP LOCKED
+                    LIMIT 1
+                )
+                RETURNING {JOB_COLUMNS};
+            """, (worker_id, self.lease_seconds))
+            job = cursor.fetchone()
+        return dict(job) if job else None
+
+    def heartbeat(self, worker_id: str) -> int:
+        """Extend the leases of every job `worker_id` is running; returns how many"""
+        with self.db_manager.get_cursor() as cursor:
+            cursor.execute("""
+                UPDATE scrape_jobs SET lease_expires_at = NOW() + make_interval(secs => %s)
+                WHERE claimed_by = %s AND status = 'running';
+            """, (self.lease_seconds, worker_id))
+            return cursor.rowcount
+
+    def progress(self, job_id: str, categories_total: Optional[int] = None, categories_done: int = 0,
+                 products_ingested: int = 0) -> Optional[Dict]:
+        """Record progress of a running job; returns the updated row"""
+        with self.db_manager.get_cursor() as cursor:
+            cursor.execute(f"""
+                UPDATE scrape_jobs
+                SET categories_total = COALESCE(%s, categories_total),
+                    categories_done = categories_done + %s,
+                    products_ingested = products_ingested + %s
+                WHERE job_id = %s
+                RETURNING {JOB_COLUMNS};
+            """, (categories_total, categories_done, products_ingested, job_id))
+            job = cursor.fetchone()
+        return dict(job) if job else None
+
+    def finish(self, job_id: str, status: str, error: Optional[str] = None) -> Optional[Dict]:
+        """End a job as succeeded, failed or cancelled, and trim the history"""
+        with self.db_manager.get_cursor() as cursor:
+            cursor.execute(f"""
+                UPDATE scrape_jobs
+                SET status = %s, error = %s, finished_at = NOW(), lease_expires_at = NULL
+                WHERE job_id = %s
+                RETURNING {JOB_COLUMNS};
+            """, (status, error, job_id))
+            job = cursor.fetchone()
+            cursor.execute("""
+                DELETE FROM scrape_jobs WHERE job_id IN (
+                    SELECT job_id FROM scrape_jobs
+                    WHERE status NOT IN ('queued', 'running')
+                    ORDER BY submitted_at DESC
+                    OFFSET %s
+                );
+            """, (self.history,))
+        return dict(job) if job else None
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self.db_manager.get_cursor() as cursor:
+            cursor.execute(f"SELECT {JOB_COLUMNS} FROM scrape_jobs WHERE job_id = %s;", (job_id,))
+            job = cursor.fetchone()
+        return dict(job) if job else None
+
+    def recent(self, limit: int = 100) -> List[Dict]:
+        """Jobs, newest first"""
+        with self.db_manager.get_cursor() as cursor:
+            cursor.execute(f"SELECT {JOB_COLUMNS} FROM scrape_jobs ORDER BY submitted_at DESC LIMIT %s;", (limit,))
+            return [dict(job) for job in cursor.fetchall()]
@@ -52,10 +52,33 @@ with col_scrape:
         try:
             resp = requests.post(f"{API_URL}/scrape")
             resp.raise_for_status()
-            st.success("✅ Scraping started successfully!")
+            job = resp.json()
+            st.session_state["scrape_job_id"] = job["job_id"]
+            if job["merged_submissions"]:
+                st.info("A scrape with these settings is already in progress, following it.")
+            else:
+                st.success("✅ Scraping started successfully!")
         except Exception as e:
             st.error(f"❌ Error starting scraping: {e}")
 
+if st.session_state.get("scrape_job_id"):
+    try:
+        resp = requests.get(f"{API_URL}/scrape/{st.session_state['scrape_job_id']}")
+        resp.raise_for_status()
+        job = resp.json()
+        total = job["categories_total"] or 0
+        st.progress(job["categories_done"] / total if total else 0.0)
+        st.write(
+            f"Scrape {job['status']}: {job['categories_done']}/{total or '?'} categories, "
+            f"{job['products_ingested']} products ({job['products_per_minute']:.1f}/min)"
+        )
+        if job["error"]:
+            st.error(job["error"])
+        if job["status"] in ("queued", "running"):
+            st.button("Refresh scrape status")
+    except Exception as e:
+        st.error(f"❌ Error fetching scrape status: {e}")
+
 
 
 def display_product_card(product: Dict[str, Any]):
@@ -164,7 +187,8 @@ with tab2:
             "limit": items_per_page,
             "sort_by": sort_by,
             "sort_order": sort_order,
-            "page": 1
+            "page": 1,
+            "count_mode": "capped"
         }
 
         if min_price > 0: params["min_price"] = min_price
@@ -186,7 +210,8 @@ with tab2:
             if not products:
                 st.warning("No products found.")
             else:
-                st.success(f"Found {data['total']} products")
+                total = f"{data['total']:,}" if data.get("total_is_exact", True) else f"{data['total']:,}+"
+                st.success(f"Found {total} products")
                 for product in products:
                     display_product_card(product)
 
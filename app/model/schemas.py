@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 class ProductBase(BaseModel):
@@ -11,6 +11,7 @@ class ProductBase(BaseModel):
     rating: Optional[float] = None
     reviews_count: int = 0
     product_link: str
+    asin: Optional[str] = None
     image_url: Optional[str] = None
     availability: Optional[str] = None
 
@@ -20,6 +21,7 @@ class ProductCreate(ProductBase):
 class Product(ProductBase):
     id: int
     category_name: str
+    deal_score: Optional[float] = None
     created_at: datetime
     updated_at: datetime
     
@@ -42,9 +44,29 @@ class Category(CategoryBase):
 class ProductResponse(BaseModel):
     products: List[Product]
     total: int
-    page: int
+    total_is_exact: bool = True
+    page: Optional[int] = None
     limit: int
     total_pages: int
+    next_cursor: Optional[str] = None
+
+class PricePoint(BaseModel):
+    bucket_start: datetime
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    last_price: Optional[float] = None
+    last_original_price: Optional[float] = None
+    last_discount_percent: Optional[float] = None
+    last_rating: Optional[float] = None
+    last_availability: Optional[str] = None
+    observations: int = 0
+
+class PriceHistoryResponse(BaseModel):
+    product_id: int
+    bucket: str
+    start: datetime
+    end: datetime
+    points: List[PricePoint]
 
 class FilterParams(BaseModel):
     category_id: Optional[int] = None
@@ -58,5 +80,27 @@ class FilterParams(BaseModel):
 
 class BestDealsParams(BaseModel):
     limit: int = 10
-    min_discount: float = 20.0
-    min_rating: float = 4.0
\ No newline at end of file
+    category_id: Optional[int] = None
+    min_discount: Optional[float] = None
+    min_rating: Optional[float] = None
+
+class ScrapeRequest(BaseModel):
+    max_categories: int = 3
+    max_subcategories: int = 5
+    max_products: int = 10
+    max_pages: int = 1
+
+class ScrapeJobStatus(BaseModel):
+    job_id: str
+    status: str
+    params: Dict[str, int]
+    merged_submissions: int = 0
+    submitted_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    categories_total: Optional[int] = None
+    categories_done: int = 0
+    products_ingested: int = 0
+    elapsed_seconds: float = 0.0
+    products_per_minute: float = 0.0
+    error: Optional[str] = None
@@ -0,0 +1,229 @@
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Dict, List, Tuple
+from urllib.parse import urljoin, urlparse
+from playwright.async_api import async_playwright
+from app.utils.logger import setup_logger
+from .BrowserPool import LAUNCH_ARGS, USER_AGENT, STEALTH_SCRIPT
+from .DetailEnricher import DetailEnricher
+from .html_parser import parse_next_page_url, parse_products
+from .RateLimiter import HostRateLimiter
+from .parsing import CARD_SELECTOR, NEXT_PAGE_SELECTOR, build_product_data, extract_cards_async, is_captcha_page_async
+
+
+class AsyncScrapeEngine:
+    """Scrapes category result pages concurrently with playwright.async_api.
+
+    Each of the `browsers` Chromium instances runs at most `pages_per_browser`
+    pages at once, and no host gets more than `pages_per_host` pages in flight
+    across all browsers. With extraction_mode="html" the page HTML is parsed in
+    a process pool of `parse_workers` while the browsers keep navigating.
+    `run()` is a blocking facade for synchronous callers.
+    """
+
+    def __init__(self, db_manager, headless: bool = True, base_url="https://www.amazon.com",
+                 browsers: int = 1, pages_per_browser: int = 4, pages_per_host: int = 4,
+                 extraction_mode: str = "bulk", parse_workers: int = 2, snapshot_cache=None,
+                 route_policy=None, rate_limiter=None, enrichment_cache=None):
+        self.db_manager = db_manager
+        self.headless = headless
+        self.base_url = base_url
+        self.browsers = max(1, browsers)
+        self.pages_per_browser = max(1, pages_per_browser)
+        self.pages_per_host = max(1, pages_per_host)
+        self.extraction_mode = extraction_mode
+        self.parse_workers = max(1, parse_workers)
+        self.logger = setup_logger(__name__)
+        self.snapshot_cache = snapshot_cache
+        self.route_policy = route_policy
+        self.rate_limiter = rate_limiter or HostRateLimiter()
+        self.detail_enricher = DetailEnricher(snapshot_cache=snapshot_cache, rate_limiter=self.rate_limiter, enrichment_cache=enrichment_cache)
+
+        self._playwright = None
+        self._contexts = []
+        self._slots = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._parse_pool = None
+
+    async def start(self):
+        """Launch the browsers and fill the page slot queue"""
+        self._playwright = await async_playwright().start()
+        self._slots = asyncio.Queue()
+        if self.extraction_mode == "html":
+            self._parse_pool = ProcessPoolExecutor(max_workers=self.parse_workers)
+        for index in range(self.browsers):
+            browser = await self._playwright.chromium.launch(headless=self.headless, args=LAUNCH_ARGS)
+            context = await browser.new_context(
+                viewport={"width": 1920, "height": 1080},
+                user_agent=USER_AGENT,
+            )
+            await context.add_init_script(STEALTH_SCRIPT)
+            self._contexts.append(context)
+            for _ in range(self.pages_per_browser):
+                self._slots.put_nowait(index)
+        self.logger.info(f"Async engine started: {self.browsers} browser(s) x {self.pages_per_browser} pages")
+
+    async def close(self):
+        """Close every browser and stop Playwright"""
+        for context in self._contexts:
+            try:
+                await context.browser.close()
+            except Exception as e:
+                self.logger.debug(f"Cleanup error: {e}")
+        self._contexts = []
+        if self._parse_pool:
+            self._parse_pool.shutdown(wait=False, cancel_futures=True)
+            self._parse_pool = None
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+    @asynccontextmanager
+    async def page(self, url: str, kind: str = None):
+        """Open a page once both a host permit and a browser slot are free"""
+        host = urlparse(url).netloc
+        host_limit = self._host_limits.setdefault(host, asyncio.Semaphore(self.pages_per_host))
+        async with host_limit:
+            index = await self._slots.get()
+            page = None
+            traffic = None
+            try:
+                page = await self._contexts[index].new_page()
+                if self.route_policy and kind:
+                    traffic = await self.route_policy.attach_async(page, kind)
+                yield page
+            finally:
+                if traffic:
+                    await traffic.settle()
+                if page:
+                    await page.close()
+                if traffic:
+                    self.route_policy.record(traffic)
+                self._slots.put_nowait(index)
+
+    async def _goto(self, page, url: str, **kwargs):
+        """Navigate under the shared rate limiter and report the outcome back to it"""
+        await self.rate_limiter.acquire_async(url)
+        started = time.monotonic()
+        response = None
+        try:
+            response = await page.goto(url, **kwargs)
+            return response
+        finally:
+            self.rate_limiter.feedback(
+                url,
+                status=response.status if response else None,
+                elapsed=time.monotonic() - started,
+                captcha=await is_captcha_page_async(page),
+            )
+
+    def detail_page(self, url: str):
+        """Page for a product detail fetch"""
+        return self.page(url, "detail")
+
+    async def scrape_category(self, category: Dict, max_products: int = 10, max_pages: int = 1, refresh=None, seen=None) -> Tuple[List[Dict], bool]:
+        """Scrape a category's results pages, following the pagination.
+
+        With a CategoryRefresh, an unchanged first page ends the category and
+        only new or changed products get their detail page fetched. With a
+        run's SeenProducts, products already taken earlier in the run are
+        dropped. Returns the products and whether the scrape completed; after
+        an error it returns the products gathered so far and False.
+        """
+        products = []
+        url = category["url"]
+        try:
+            for page_number in range(1, max_pages + 1):
+                if not url or len(products) >= max_products:
+                    break
+                page_products, url = await self._scrape_results_page(category, url, max_products - len(products))
+                if page_products is None:
+                    break
+                if refresh and page_number == 1 and not refresh.first_page(page_products):
+                    self.logger.info(f"Results of {category['name']} unchanged since the last scrape, skipping")
+                    return [], True
+                products.extend(seen.first_sightings(page_products) if seen is not None else page_products)
+
+            pending = await asyncio.to_thread(refresh.needs_details, products) if refresh else products
+            await self.detail_enricher.enrich_async(pending, self.detail_page)
+
+            self.logger.info(f"Scraping completed for category {category['name']}. Total products scraped: {len(products)}")
+            return products, True
+        except Exception as e:
+            self.logger.error(f"Error scraping products from category {category['name']}: {e}")
+            return products, False
+
+    async def _scrape_results_page(self, category: Dict, url: str, limit: int):
+        """Products of one results page and the next page's URL; None products in replay on a miss"""
+        products = []
+        next_url = None
+        html = self.snapshot_cache.lookup(url) if self.snapshot_cache else None
+        if html is not None:
+            return parse_products(html, self.base_url, category["name"], category["id"], limit), parse_next_page_url(html, self.base_url)
+        if self.snapshot_cache and self.snapshot_cache.replay:
+            self.logger.warning(f"No snapshot for {url} of category {category['name']}, skipping in replay mode")
+            return None, None
+
+        async with self.page(url, "search") as page:
+            self.logger.info(f"Navigating to category: {category['name']}")
+            await self._goto(page, url, wait_until="load", timeout=60000)
+            await page.wait_for_selector(CARD_SELECTOR, timeout=15000)
+            if self.snapshot_cache or self.extraction_mode == "html":
+                html = await page.content()
+                if self.snapshot_cache:
+                    self.snapshot_cache.store(url, html)
+
+            if self.extraction_mode != "html":
+                for raw in await extract_cards_async(page, limit):
+                    product_data = build_product_data(raw, self.base_url, category["name"], category["id"])
+                    if product_data:
+                        products.append(product_data)
+                next_link = await page.query_selector(NEXT_PAGE_SELECTOR)
+                href = await next_link.get_attribute("href") if next_link else None
+                next_url = urljoin(self.base_url, href) if href else None
+
+        if self.extraction_mode == "html":
+            # Parse outside the page slot so another worker can navigate meanwhile
+            products = await asyncio.get_running_loop().run_in_executor(
+                self._parse_pool, parse_products,
+                html, self.base_url, category["name"], category["id"], limit,
+            )
+            next_url = parse_next_page_url(html, self.base_url)
+        return products, next_url
+
+    async def _scrape_and_save(self, category: Dict, max_products: int, max_pages: int, on_category_done=None, refresh=None, seen=None) -> int:
+        products, completed = await self.scrape_category(category, max_products, max_pages, refresh, seen)
+        saved = await asyncio.to_thread(self.db_manager.upsert_products, products)
+        # A failed scrape keeps the old fingerprint so the next run looks again
+        if refresh and completed:
+            await asyncio.to_thread(refresh.finish)
+        self.logger.info(f"Saved {len(saved)} products to the database for category {category['name']}.")
+        if on_category_done:
+            on_category_done(category, len(saved))
+        return len(saved)
+
+    async def scrape_categories(self, categories: List[Dict], max_products: int = 10, max_pages: int = 1, on_category_done=None,
+                                refreshes: Dict = None, seen=None) -> int:
+        """Scrape and save every category concurrently, returning the number of products saved.
+
+        `on_category_done(category, saved)` is called as each category is saved.
+        `refreshes` maps category ids to their CategoryRefresh in incremental runs;
+        `seen` is the run's SeenProducts.
+        """
+        refreshes = refreshes or {}
+        await self.start()
+        try:
+            counts = await asyncio.gather(*[
+                self._scrape_and_save(category, max_products, max_pages, on_category_done, refreshes.get(category["id"]), seen)
+                for category in categories
+            ])
+            return sum(counts)
+        finally:
+            await self.close()
+
+    def run(self, categories: List[Dict], max_products: int = 10, max_pages: int = 1, on_category_done=None, refreshes: Dict = None,
+            seen=None) -> int:
+        """Blocking entry point for the synchronous workflows"""
+        return asyncio.run(self.scrape_categories(categories, max_products, max_pages, on_category_done, refreshes, seen))
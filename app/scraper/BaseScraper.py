@@ -1,51 +1,32 @@
 import time
-import random
-from playwright.sync_api import sync_playwright
+from .BrowserPool import BrowserPool
+from .RateLimiter import HostRateLimiter
+from .parsing import is_captcha_page
 
 class BaseScraper:
-    def __init__(self,db_manager,headless: bool = True, base_url="https://www.amazon.com"):
+    def __init__(self,db_manager,headless: bool = True, base_url="https://www.amazon.com", browser_pool: BrowserPool = None, snapshot_cache=None, rate_limiter: HostRateLimiter = None):
         self.headless = headless
         self.db_manager = db_manager
         self.base_url = base_url
+        # Share the caller's pool so one browser serves every category of a run
+        self.browser_pool = browser_pool or BrowserPool(headless=headless)
+        # Optional SnapshotCache serving stored HTML instead of the network
+        self.snapshot_cache = snapshot_cache
+        # Shared per-host pacing; replaces fixed random sleeps between requests
+        self.rate_limiter = rate_limiter or HostRateLimiter()
         
-    def _random_delay(self, min_seconds: float=1.0, max_seconds: float=3.0):
-        """Add random delay between operations"""
-        delay = random.uniform(min_seconds, max_seconds)
-        time.sleep(delay)
-    
-    def setup_browser(self):
-        """Setup Playwright browser with anti-detection measures"""
+    def _goto(self, page, url: str, **kwargs):
+        """Navigate under the rate limiter and report the outcome back to it"""
+        self.rate_limiter.acquire(url)
+        started = time.monotonic()
+        response = None
         try:
-            playwright = sync_playwright().start()
-            browser = playwright.chromium.launch(
-                headless=self.headless,
-                args=[
-                    "--no-sandbox",
-                    "--disable-setuid-sandbox",
-                    "--disable-blink-features=AutomationControlled",
-                    "--disable-dev-shm-usage",
-                ],
+            response = page.goto(url, **kwargs)
+            return response
+        finally:
+            self.rate_limiter.feedback(
+                url,
+                status=response.status if response else None,
+                elapsed=time.monotonic() - started,
+                captcha=is_captcha_page(page),
             )
-
-            context = browser.new_context(
-                viewport={"width": 1920, "height": 1080},
-                user_agent=(
-                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/119.0.0.0 Safari/537.36"
-                ),
-            )
-
-            # Add stealth scripts
-            context.add_init_script(
-                """
-                Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
-                Object.defineProperty(navigator, 'plugins', { get: () => [1,2,3,4,5] });
-                """
-            )
-
-            return playwright, browser, context
-
-        except Exception as e:
-            self.logger.error(f"Browser setup failed: {e}")
-            raise 
\ No newline at end of file
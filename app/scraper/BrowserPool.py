@@ -0,0 +1,173 @@
+from contextlib import contextmanager
+from typing import List, Optional
+from playwright.sync_api import sync_playwright
+from app.utils.logger import setup_logger
+
+LAUNCH_ARGS = [
+    "--no-sandbox",
+    "--disable-setuid-sandbox",
+    "--disable-blink-features=AutomationControlled",
+    "--disable-dev-shm-usage",
+]
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/119.0.0.0 Safari/537.36"
+)
+
+STEALTH_SCRIPT = """
+    Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
+    Object.defineProperty(navigator, 'plugins', { get: () => [1,2,3,4,5] });
+"""
+
+
+class BrowserPool:
+    """Long-lived Chromium shared by the scrapers of one run.
+
+    The browser is launched once and hands out warm pages from a single
+    context. The context is recycled after `max_pages_per_context` pages or
+    once a returned page reports a JS heap above `max_heap_mb`. Playwright's
+    sync API is thread-bound, so a pool must only be used from the thread
+    that started it. With a RoutePolicy, pages borrowed with a `kind` get
+    that kind's request blocking rules for as long as they are borrowed.
+    """
+
+    def __init__(self, headless: bool = True, max_pages_per_context: int = 50, max_heap_mb: float = 512.0, route_policy=None):
+        self.headless = headless
+        self.route_policy = route_policy
+        self.max_pages_per_context = max_pages_per_context
+        self.max_heap_mb = max_heap_mb
+        self.logger = setup_logger(__name__)
+
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._idle_pages = []
+        self._handles = []
+        self._borrowed = 0
+        self._pages_served = 0
+        self._recycle_pending = False
+        self.contexts_created = 0
+
+    def start(self):
+        """Launch the browser if it is not running yet"""
+        if self._browser and self._browser.is_connected():
+            return
+        try:
+            self._playwright = sync_playwright().start()
+            self._browser = self._playwright.chromium.launch(headless=self.headless, args=LAUNCH_ARGS)
+            self.logger.info("Browser launched")
+        except Exception as e:
+            self.logger.error(f"Browser setup failed: {e}")
+            self.close()
+            raise
+
+    def context(self):
+        """Return the warm browser context, creating or recycling it as needed"""
+        self.start()
+        if self._recycle_pending and self._borrowed == 0:
+            self._close_context()
+        if self._context is None:
+            self._context = self._browser.new_context(
+                viewport={"width": 1920, "height": 1080},
+                user_agent=USER_AGENT,
+            )
+            # Add stealth scripts
+            self._context.add_init_script(STEALTH_SCRIPT)
+            self._pages_served = 0
+            self.contexts_created += 1
+        return self._context
+
+    @contextmanager
+    def page(self, kind: Optional[str] = None):
+        """Borrow a page from the warm context and give it back afterwards"""
+        context = self.context()
+        page = self._idle_pages.pop() if self._idle_pages else context.new_page()
+        traffic = self.route_policy.attach(page, kind) if self.route_policy and kind else None
+        self._borrowed += 1
+        self._pages_served += 1
+        try:
+            yield page
+        finally:
+            self._borrowed -= 1
+            if traffic:
+                self.route_policy.detach(page, traffic)
+            self._release(page)
+
+    def track(self, handles) -> List:
+        """Register ElementHandles to be disposed when their page is returned"""
+        if isinstance(handles, list):
+            self._handles.extend(h for h in handles if h)
+        elif handles:
+            self._handles.append(handles)
+        return handles
+
+    def dispose_handles(self):
+        """Dispose every tracked ElementHandle"""
+        handles, self._handles = self._handles, []
+        for handle in handles:
+            try:
+                handle.dispose()
+            except Exception:
+                pass
+
+    def _heap_mb(self, page) -> Optional[float]:
+        try:
+            used = page.evaluate("() => performance.memory ? performance.memory.usedJSHeapSize : 0")
+            return used / (1024 * 1024)
+        except Exception:
+            return None
+
+    def _release(self, page):
+        if self._borrowed == 0:
+            self.dispose_handles()
+        if page.is_closed():
+            return
+
+        heap_mb = self._heap_mb(page)
+        if heap_mb is not None and heap_mb > self.max_heap_mb:
+            self.logger.info(f"Page heap at {heap_mb:.0f} MB, recycling context")
+            self._recycle_pending = True
+        elif self._pages_served >= self.max_pages_per_context:
+            self.logger.info(f"Context served {self._pages_served} pages, recycling context")
+            self._recycle_pending = True
+
+        if self._recycle_pending:
+            page.close()
+            if self._borrowed == 0:
+                self._close_context()
+            return
+
+        try:
+            # Drop the previous document so the idle page holds no DOM
+            page.goto("about:blank")
+            self._idle_pages.append(page)
+        except Exception as e:
+            self.logger.debug(f"Could not reset page, closing it: {e}")
+            page.close()
+
+    def _close_context(self):
+        self.dispose_handles()
+        self._idle_pages = []
+        if self._context:
+            try:
+                self._context.close()
+            except Exception as e:
+                self.logger.debug(f"Context close error: {e}")
+        self._context = None
+        self._recycle_pending = False
+
+    def close(self):
+        """Close the context, the browser and Playwright"""
+        try:
+            self._close_context()
+            if self._browser:
+                self._browser.close()
+            if self._playwright:
+                self._playwright.stop()
+        except Exception as e:
+            self.logger.debug(f"Cleanup error: {e}")
+        finally:
+            self._browser = None
+            self._playwright = None
@@ -1,12 +1,18 @@
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from urllib.parse import urljoin
-import time
+from app.database.category_tree import CategoryTreeStore
 from app.utils.logger import setup_logger
 from .BaseScraper import BaseScraper
+from .html_parser import parse_menu_section
+from .parsing import extract_menu_sections, menu_departments, menu_links
 class CategoryScraper(BaseScraper):
-    def __init__(self, db_manager,headless: bool = True, base_url="https://www.amazon.com"):
-        super().__init__(db_manager,headless,base_url)
+    def __init__(self, db_manager,headless: bool = True, base_url="https://www.amazon.com", browser_pool=None, extraction_mode: str = "browser", snapshot_cache=None, rate_limiter=None, tree_store: CategoryTreeStore = None):
+        super().__init__(db_manager,headless,base_url,browser_pool,snapshot_cache,rate_limiter)
         self.logger = setup_logger(__name__)  
+        # "html" parses the menu markup offline instead of reading ElementHandles
+        self.extraction_mode = extraction_mode
+        # Versioned category tree snapshots reused across runs
+        self.tree_store = tree_store
         
     
     
@@ -22,7 +28,7 @@ class CategoryScraper(BaseScraper):
             try:
                 logo = page.wait_for_selector("#nav-bb-logo", timeout=5000)
                 logo.click(force=True)
-                self._random_delay(2, 4)
+                page.wait_for_load_state("domcontentloaded")
                 menu = page.wait_for_selector("#nav-hamburger-menu", timeout=10000)
                 menu.scroll_into_view_if_needed()
                 menu.click(force=True)
@@ -39,20 +45,10 @@ class CategoryScraper(BaseScraper):
             self.logger.warning("Could not find main department section.")
             return []
         
-        main_categories = section.query_selector_all("a.hmenu-item")[:max_categories]
+        main_categories = self.browser_pool.track(section.query_selector_all("a.hmenu-item"))[:max_categories]
         self.logger.info(f"Found {len(main_categories)} main categories")
         return main_categories
     
-    def handle_see_all_category(self, page, cat, name):
-        """Handle 'See All' category click"""
-        try:
-            page.evaluate("(element) => element.click()", cat)
-            self._random_delay(1, 2)
-            return True
-        except Exception as e:
-            self.logger.warning(f"Failed to click 'See All' for {name}: {e}")
-            return False
-    
     def scroll_and_click_category(self, page, cat, name):
         """Scroll to and click on a category"""
         try:
@@ -63,7 +59,8 @@ class CategoryScraper(BaseScraper):
                     container.scrollTop = el.offsetTop - container.offsetTop;
                 }
             """, cat)
-            self._random_delay(0.5, 1.5)
+            # Opening a department may fetch its panel, so pace it like a request
+            self.rate_limiter.acquire(self.base_url)
             page.evaluate("(element) => element.click()", cat)
             return True
         except Exception as e:
@@ -75,25 +72,15 @@ class CategoryScraper(BaseScraper):
         try:
             # Wait for the SPECIFIC category section to load
             page.wait_for_selector(f'section[aria-labelledby="{main_category_name}"]', timeout=10000)
-            self._random_delay(1, 2)
             
-            # Get subcategories from the specific category section
-            category_section = page.query_selector(f'section[aria-labelledby="{main_category_name}"]')
-            if not category_section:
+            if self.extraction_mode == "html":
+                filtered_subcats = parse_menu_section(page.content(), main_category_name, self.base_url)
+            else:
+                filtered_subcats = self._read_menu_section(page, main_category_name)
+            if filtered_subcats is None:
                 self.logger.warning(f"Could not find section for category: {main_category_name}")
                 return []
             
-            subcats = category_section.query_selector_all("a.hmenu-item")
-            
-            # Filter subcategories
-            filtered_subcats = []
-            for subcat in subcats:
-                sub_name = subcat.text_content().strip()
-                sub_url = subcat.get_attribute("href")
-                
-                if sub_name and sub_url and len(sub_name) > 2:
-                    filtered_subcats.append(subcat)
-            
             self.logger.info(f"Found {len(filtered_subcats)} actual subcategories under {main_category_name}")
             return filtered_subcats
             
@@ -101,6 +88,25 @@ class CategoryScraper(BaseScraper):
             self.logger.warning(f"Failed to extract subcategories for {main_category_name}: {e}")
             return []
     
+    def _read_menu_section(self, page, main_category_name) -> Optional[List[Dict[str, str]]]:
+        """Read a department's subcategory links from the live DOM"""
+        # Get subcategories from the specific category section
+        category_section = page.query_selector(f'section[aria-labelledby="{main_category_name}"]')
+        if not category_section:
+            return None
+        
+        subcats = self.browser_pool.track(category_section.query_selector_all("a.hmenu-item"))
+        
+        # Filter subcategories
+        filtered_subcats = []
+        for subcat in subcats:
+            sub_name = subcat.text_content().strip()
+            sub_url = subcat.get_attribute("href")
+            
+            if sub_name and sub_url and len(sub_name) > 2:
+                filtered_subcats.append({"name": sub_name, "url": urljoin(self.base_url, sub_url)})
+        return filtered_subcats
+    
     def navigate_back_to_main_menu(self, page):
         """Navigate back to the main menu"""
         back_button = page.query_selector("a.hmenu-item.hmenu-back-button")
@@ -108,90 +114,85 @@ class CategoryScraper(BaseScraper):
             page.evaluate("(element) => element.click()", back_button)
             # Wait for main menu to actually reload
             page.wait_for_selector('section[aria-labelledby="Shop by Department"]', timeout=8000)
-            time.sleep(2)
             return True
         else:
             # Fallback - refresh and re-open menu
+            self.rate_limiter.acquire(page.url)
             page.reload()
-            self._random_delay(3, 5)
             menu = page.wait_for_selector("#nav-hamburger-menu", timeout=10000)
             menu.click(force=True)
             page.wait_for_selector("#hmenu-content", timeout=15000)
             return False
 
-    def scrape_and_save_categories(self,max_categories:int =5,max_subcategories:int =10) -> List[Dict[str, str]]:
-        """Main method to scrape categories and save them to database"""
-        categories = []
-        try:
-            playwright, browser, context = self.setup_browser()
-            page = context.new_page()
-            page.goto(self.base_url, wait_until="load", timeout=60000)
-            self._random_delay(3, 6)
+    def read_menu_tree(self, page, max_categories: int = 5) -> Tuple[Dict, bool]:
+        """Department/subcategory tree of the open menu, and whether it has every department.
 
-            # Open hamburger menu
-            if not self.open_hamburger_menu(page):
-                return []
-
-            self._random_delay(2, 4)
-            page.wait_for_selector("#hmenu-content", timeout=15000)
+        One page.evaluate reads every section the menu has rendered. Only the
+        departments among the first `max_categories` whose panel is not in the
+        DOM yet are opened one by one.
+        """
+        sections = extract_menu_sections(page)
+        names = menu_departments(sections)
+        handles = {}
+        if not names:
+            handles = {cat.text_content().strip(): cat for cat in self.get_main_categories(page, max_categories=max_categories)}
+            names = [name for name in handles if len(name) > 2 and name.lower() != "see all"]
 
-            # Get main categories
-            main_categories = self.get_main_categories(page,max_categories=max_categories)
-            if not main_categories:
-                return []
-
-            for cat in main_categories:
-                name = cat.text_content().strip()
-                if not name:
-                    continue
-
-                self.logger.info(f"Opening main category: {name}")
+        subcategories = {name: menu_links(sections.get(name, []), self.base_url) for name in names}
+        missing = [name for name in names[:max_categories] if not subcategories[name]]
+        if missing:
+            self.logger.info(f"{len(missing)} department panels not rendered yet, opening them")
+            handles = handles or {cat.text_content().strip(): cat for cat in self.get_main_categories(page, max_categories=len(names) + 1)}
+        for name in missing:
+            if name in handles and self.scroll_and_click_category(page, handles[name], name):
+                subcategories[name] = self.extract_subcategories(page, name)
+                self.navigate_back_to_main_menu(page)
 
-                # Check for "See All"
-                if name.lower() == "see all":
-                    self.handle_see_all_category(page, cat, name)
-                    continue
+        departments = [{"name": name, "subcategories": subcategories[name]} for name in names if subcategories[name]]
+        complete = len(departments) == len(names)
+        self.logger.info(f"Read {len(departments)} of {len(names)} departments from the menu")
+        return {"departments": departments}, complete
 
-                # Scroll and click category
-                if not self.scroll_and_click_category(page, cat, name):
-                    continue
+    def scrape_and_save_categories(self,max_categories:int =5,max_subcategories:int =10, refresh: bool = False) -> List[Dict[str, str]]:
+        """Main method to scrape categories and save them to database.
 
-                # Extract subcategories
-                subcats = self.extract_subcategories(page, name)
-                
-                for subcat in subcats[:max_subcategories]:
-                    sub_name = subcat.text_content().strip()
-                    sub_url = subcat.get_attribute("href")
-                    if sub_name and sub_url:
-                        full_name = f"{name} > {sub_name}"
-                        full_url = urljoin(self.base_url, sub_url)
-                        
-                        
-                        try:
-                            category_id = self.db_manager.insert_category(full_name, full_url)
-                            categories.append({
-                                "id": category_id,
-                                "name": full_name, 
-                                "url": full_url
-                            })
-                            self.logger.info(f"ADDED to DB: {full_name} (ID: {category_id})")
-                        except Exception as e:
-                            self.logger.error(f"Failed to insert category '{full_name}': {e}")
+        A fresh category tree snapshot that covers `max_categories` is reused
+        without opening a browser, unless `refresh` is set.
+        """
+        if self.tree_store and not refresh:
+            snapshot = self.tree_store.latest(self.base_url)
+            if self.tree_store.is_fresh(snapshot) and self.tree_store.covers(snapshot, max_categories):
+                self.logger.info(f"Using category tree version {snapshot['version']} checked at {snapshot['checked_at']}")
+                return self.save_categories(CategoryTreeStore.flatten(snapshot["tree"], max_categories, max_subcategories))
 
-                # Navigate back to main menu
-                self.navigate_back_to_main_menu(page)
+        try:
+            with self.browser_pool.page("menu") as page:
+                self._goto(page, self.base_url, wait_until="load", timeout=60000)
 
-            self.logger.info(f"Total categories scraped and saved: {len(categories)}")
-            return categories
+                # Open hamburger menu
+                if not self.open_hamburger_menu(page):
+                    return []
 
+                page.wait_for_selector("#hmenu-content", timeout=15000)
+                tree, complete = self.read_menu_tree(page, max_categories)
         except Exception as e:
             self.logger.error(f"Error getting categories: {e}")
             return []
 
-        finally:
-            try:
-                context.close()
-                browser.close()
-                playwright.stop()
-            except Exception as e:
-                self.logger.debug(f"Cleanup error: {e}")
\ No newline at end of file
+        if not tree["departments"]:
+            return []
+        if self.tree_store:
+            self.tree_store.save(self.base_url, tree, complete)
+        return self.save_categories(CategoryTreeStore.flatten(tree, max_categories, max_subcategories))
+
+    def save_categories(self, batch: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Upsert flattened categories; returns them with their ids"""
+        categories = []
+        for saved in self.db_manager.upsert_categories(batch):
+            categories.append({
+                "id": saved["id"],
+                "name": saved["name"],
+                "url": saved["url"]
+            })
+        self.logger.info(f"Total categories scraped and saved: {len(categories)}")
+        return categories
@@ -0,0 +1,178 @@
+"""Scraper process that works through a shared crawl of category tasks.
+
+    python -m app.scraper.CategoryWorker enqueue --max-products 20     # prints the crawl id
+    python -m app.scraper.CategoryWorker work --crawl <crawl id>       # run on as many hosts as you like
+    python -m app.scraper.CategoryWorker status --crawl <crawl id>
+"""
+import argparse
+import os
+import socket
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+from app.database.category_tasks import CategoryTaskQueue
+from app.utils.logger import setup_logger
+from .FreshnessPolicy import SKIP, FreshnessPolicy
+from .SeenProducts import SeenProducts
+
+
+class _Heartbeat(threading.Thread):
+    """Extends a task lease in the background while the browser works"""
+
+    def __init__(self, tasks: CategoryTaskQueue, task_id: int, worker_id: str, interval: float):
+        super().__init__(name=f"heartbeat-{task_id}", daemon=True)
+        self.tasks = tasks
+        self.task_id = task_id
+        self.worker_id = worker_id
+        self.interval = interval
+        self.lost = False
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                if not self.tasks.heartbeat(self.task_id, self.worker_id):
+                    self.lost = True
+                    return
+            except Exception:
+                # A missed beat is fine as long as a later one lands before the lease ends
+                continue
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+class CategoryWorker:
+    """Claims category tasks from a CategoryTaskQueue and scrapes them with one AmazonScraper.
+
+    The scrape itself runs on the calling thread (Playwright's sync API is
+    thread-bound) while a heartbeat thread keeps the lease alive every
+    `heartbeat_seconds`. Run one worker per process; start more processes, on
+    this or other hosts, to scale out. With a FreshnessPolicy, tasks are
+    scraped incrementally and fresh categories are completed without a load.
+    """
+
+    def __init__(self, scraper=None, tasks: CategoryTaskQueue = None, worker_id: str = None,
+                 heartbeat_seconds: float = None, freshness: FreshnessPolicy = None):
+        if scraper is None:
+            from .amazon_scraper import AmazonScraper
+            scraper = AmazonScraper()
+        self.scraper = scraper
+        self.tasks = tasks or CategoryTaskQueue(scraper.db_manager)
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.heartbeat_seconds = heartbeat_seconds or self.tasks.lease_seconds / 3
+        self.freshness = freshness
+        self.logger = setup_logger(__name__)
+        self.tasks_done = 0
+        self.products_saved = 0
+        # Dedups cards across the categories this worker scrapes for one crawl
+        self._seen_crawl = None
+        self.seen = SeenProducts()
+
+    def run(self, crawl_id: Optional[str] = None, wait_seconds: float = 0, poll_seconds: float = 5.0) -> int:
+        """Work until no task is left (after waiting up to `wait_seconds` for new ones); returns tasks done"""
+        started = time.monotonic()
+        idle_since = None
+        while True:
+            task = self.tasks.claim(self.worker_id, crawl_id)
+            if task is None:
+                idle_since = idle_since or time.monotonic()
+                if time.monotonic() - idle_since >= wait_seconds:
+                    break
+                time.sleep(poll_seconds)
+                continue
+            idle_since = None
+            self._run_task(task)
+
+        elapsed = time.monotonic() - started
+        self.logger.info(
+            f"Worker {self.worker_id} finished {self.tasks_done} tasks, {self.products_saved} products "
+            f"in {elapsed:.0f}s ({self.products_saved / elapsed * 60 if elapsed else 0:.1f} products/min)"
+        )
+        return self.tasks_done
+
+    def _run_task(self, task):
+        self.logger.info(f"Task {task['id']}: {task['category_name']} (attempt {task['attempts']})")
+        refresh = None
+        if self.freshness:
+            category = dict(task, id=task["category_id"])
+            decision = self.freshness.plan(category)
+            if decision == SKIP:
+                self.tasks.complete(task["id"], self.worker_id, 0)
+                self.tasks_done += 1
+                return
+            refresh = self.freshness.refresh(self.scraper.db_manager, category, decision)
+        if task["crawl_id"] != self._seen_crawl:
+            # A new crawl must re-save products the previous one already took
+            self._seen_crawl = task["crawl_id"]
+            self.seen = SeenProducts()
+        heartbeat = _Heartbeat(self.tasks, task["id"], self.worker_id, self.heartbeat_seconds)
+        heartbeat.start()
+        try:
+            saved = self.scraper.product_scraper.scrape_products_and_save_to_database(
+                category_id=task["category_id"],
+                category_name=task["category_name"],
+                category_url=task["category_url"],
+                max_products=task["max_products"],
+                max_pages=task["max_pages"],
+                refresh=refresh,
+                seen=self.seen,
+                raise_errors=True,
+            )
+        except Exception as e:
+            heartbeat.stop()
+            self.logger.error(f"Task {task['id']} failed: {e}")
+            self.tasks.fail(task["id"], self.worker_id, str(e))
+            return
+        heartbeat.stop()
+        if self.tasks.complete(task["id"], self.worker_id, saved):
+            self.tasks_done += 1
+            self.products_saved += saved
+        else:
+            self.logger.warning(f"Lease on task {task['id']} was lost before it finished; another worker retries it")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.scraper.CategoryWorker", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    enqueue = commands.add_parser("enqueue", help="queue a task per category in the database")
+    enqueue.add_argument("--crawl", help="crawl id (default: crawl-<timestamp>)")
+    enqueue.add_argument("--max-products", type=int, default=10)
+    enqueue.add_argument("--max-pages", type=int, default=1)
+    work = commands.add_parser("work", help="claim and scrape tasks until none are left")
+    work.add_argument("--crawl", help="only take tasks of this crawl")
+    work.add_argument("--wait", type=float, default=0, help="seconds to wait for new tasks before exiting")
+    work.add_argument("--lease", type=float, default=300, help="lease length in seconds")
+    work.add_argument("--no-headless", action="store_true")
+    work.add_argument("--incremental", action="store_true", help="skip fresh and unchanged categories")
+    status = commands.add_parser("status", help="task counts of a crawl")
+    status.add_argument("--crawl", required=True)
+    args = parser.parse_args(argv)
+
+    if args.command == "enqueue":
+        tasks = CategoryTaskQueue()
+        crawl_id = args.crawl or f"crawl-{datetime.now():%Y%m%d-%H%M%S}"
+        categories = tasks.db_manager.get_all_categories()
+        added = tasks.enqueue(crawl_id, [c["id"] for c in categories], args.max_products, args.max_pages)
+        print(f"{crawl_id}: {added} tasks queued")
+        return 0
+    if args.command == "status":
+        print(CategoryTaskQueue().progress(args.crawl))
+        return 0
+
+    from .amazon_scraper import AmazonScraper
+    scraper = AmazonScraper(headless=not args.no_headless)
+    try:
+        worker = CategoryWorker(scraper, CategoryTaskQueue(scraper.db_manager, lease_seconds=args.lease),
+                                freshness=FreshnessPolicy() if args.incremental else None)
+        worker.run(args.crawl, wait_seconds=args.wait)
+    finally:
+        scraper.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
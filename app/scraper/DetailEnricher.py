@@ -0,0 +1,175 @@
+import asyncio
+import time
+from contextlib import ExitStack
+from typing import Dict, List
+from app.utils.logger import setup_logger
+from .html_parser import parse_details
+from .RateLimiter import HostRateLimiter
+from .parsing import DETAIL_FIELDS, build_detail_data, is_captcha_page, is_captcha_page_async, read_fields, read_fields_async
+
+
+class EnrichmentStats:
+    """Per-product latency and failure counts for one enrichment stage"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.failures = 0
+        self.cached = 0
+        self.cache_hits = 0
+        # Products whose detail fields were read from a page (live or snapshot) in this stage
+        self.enriched: List[Dict] = []
+
+    def record(self, latency: float, ok: bool):
+        self.latencies.append(latency)
+        if not ok:
+            self.failures += 1
+
+    def summary(self) -> Dict:
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+        return {
+            "fetched": count,
+            "failed": self.failures,
+            "cached": self.cached,
+            "cache_hits": self.cache_hits,
+            "avg_latency": sum(latencies) / count if count else 0.0,
+            "p95_latency": latencies[min(count - 1, int(count * 0.95))] if count else 0.0,
+        }
+
+
+class DetailEnricher:
+    """Fills detail-page fields (brand, ...) by loading product pages in parallel tabs.
+
+    The sync path borrows up to `max_tabs` pages from the BrowserPool, starts
+    every navigation with wait_until="commit" so the browser loads them side by
+    side, then reads each tab in turn. The async path runs one task per product
+    on the engine's bounded pages. The search results page is never touched.
+    Products whose fields are in the EnrichmentCache are not loaded at all,
+    and those whose page is in the SnapshotCache are parsed offline instead.
+    """
+
+    def __init__(self, browser_pool=None, max_tabs: int = 4, timeout: int = 30000, snapshot_cache=None, rate_limiter=None,
+                 enrichment_cache=None):
+        self.browser_pool = browser_pool
+        self.snapshot_cache = snapshot_cache
+        self.enrichment_cache = enrichment_cache
+        self.rate_limiter = rate_limiter or HostRateLimiter()
+        self.max_tabs = max(1, max_tabs)
+        self.timeout = timeout
+        self.logger = setup_logger(__name__)
+
+    def enrich(self, products: List[Dict]) -> EnrichmentStats:
+        """Fill detail fields for every product with a link"""
+        stats = EnrichmentStats()
+        pending = self._pending(self._uncached(products, stats), stats)
+        for start in range(0, len(pending), self.max_tabs):
+            self._enrich_batch(pending[start:start + self.max_tabs], stats)
+        self._remember(stats)
+        self._log(stats)
+        return stats
+
+    def _enrich_batch(self, batch: List[Dict], stats: EnrichmentStats):
+        with ExitStack() as stack:
+            tabs = []
+            for product in batch:
+                page = stack.enter_context(self.browser_pool.page("detail"))
+                self.rate_limiter.acquire(product["product_link"])
+                started = time.monotonic()
+                try:
+                    response = page.goto(product["product_link"], wait_until="commit", timeout=self.timeout)
+                    tabs.append((product, page, started, response))
+                except Exception as e:
+                    self.logger.warning(f"Could not open product page {product['product_link']}: {e}")
+                    stats.record(time.monotonic() - started, ok=False)
+                    self.rate_limiter.feedback(product["product_link"], elapsed=time.monotonic() - started)
+
+            for product, page, started, response in tabs:
+                try:
+                    page.wait_for_load_state("domcontentloaded", timeout=self.timeout)
+                    self.rate_limiter.feedback(
+                        product["product_link"],
+                        status=response.status if response else None,
+                        elapsed=time.monotonic() - started,
+                        captcha=is_captcha_page(page),
+                    )
+                    product.update(build_detail_data(read_fields(page, DETAIL_FIELDS)))
+                    if self.snapshot_cache:
+                        self.snapshot_cache.store(product["product_link"], page.content())
+                    stats.record(time.monotonic() - started, ok=True)
+                    stats.enriched.append(product)
+                except Exception as e:
+                    self.logger.warning(f"Could not extract details from product page {product['product_link']}: {e}")
+                    stats.record(time.monotonic() - started, ok=False)
+
+    async def enrich_async(self, products: List[Dict], open_page) -> EnrichmentStats:
+        """Fill detail fields concurrently; `open_page(url)` is an async page context manager"""
+        stats = EnrichmentStats()
+
+        async def enrich_one(product):
+            await self.rate_limiter.acquire_async(product["product_link"])
+            started = time.monotonic()
+            reported = False
+            try:
+                async with open_page(product["product_link"]) as page:
+                    response = await page.goto(product["product_link"], wait_until="domcontentloaded", timeout=self.timeout)
+                    self.rate_limiter.feedback(
+                        product["product_link"],
+                        status=response.status if response else None,
+                        elapsed=time.monotonic() - started,
+                        captcha=await is_captcha_page_async(page),
+                    )
+                    reported = True
+                    product.update(build_detail_data(await read_fields_async(page, DETAIL_FIELDS)))
+                    if self.snapshot_cache:
+                        self.snapshot_cache.store(product["product_link"], await page.content())
+                stats.record(time.monotonic() - started, ok=True)
+                stats.enriched.append(product)
+            except Exception as e:
+                self.logger.warning(f"Could not extract details from product page {product['product_link']}: {e}")
+                stats.record(time.monotonic() - started, ok=False)
+                if not reported:
+                    # The navigation itself failed; back off like any failed request
+                    self.rate_limiter.feedback(product["product_link"], elapsed=time.monotonic() - started)
+
+        uncached = await asyncio.to_thread(self._uncached, products, stats)
+        await asyncio.gather(*[enrich_one(p) for p in self._pending(uncached, stats)])
+        await asyncio.to_thread(self._remember, stats)
+        self._log(stats)
+        return stats
+
+    def _uncached(self, products: List[Dict], stats: EnrichmentStats) -> List[Dict]:
+        """Products left after filling what the EnrichmentCache knows"""
+        if not self.enrichment_cache:
+            return products
+        linked = [p for p in products if p.get("product_link")]
+        pending = self.enrichment_cache.fill(linked)
+        stats.cache_hits += len(linked) - len(pending)
+        return pending
+
+    def _remember(self, stats: EnrichmentStats):
+        if self.enrichment_cache and stats.enriched:
+            self.enrichment_cache.store(stats.enriched)
+
+    def _pending(self, products: List[Dict], stats: EnrichmentStats) -> List[Dict]:
+        """Products that still need a live detail fetch after the snapshot lookup"""
+        pending = []
+        for product in products:
+            if not product.get("product_link"):
+                continue
+            html = self.snapshot_cache.lookup(product["product_link"]) if self.snapshot_cache else None
+            if html is not None:
+                product.update(parse_details(html))
+                stats.cached += 1
+                stats.enriched.append(product)
+            elif not (self.snapshot_cache and self.snapshot_cache.replay):
+                pending.append(product)
+        return pending
+
+    def _log(self, stats: EnrichmentStats):
+        summary = stats.summary()
+        if summary["fetched"] or summary["cached"] or summary["cache_hits"]:
+            self.logger.info(
+                f"Detail enrichment: {summary['fetched']} pages, {summary['failed']} failed, {summary['cached']} from snapshots, "
+                f"{summary['cache_hits']} from the enrichment cache, "
+                f"avg {summary['avg_latency']:.2f}s, p95 {summary['p95_latency']:.2f}s"
+            )
@@ -0,0 +1,93 @@
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from app.utils.logger import setup_logger
+from .parsing import DETAIL_FIELDS, DETAIL_FIELD_TTLS
+
+# Detail values that mean "not found on the page"; trusted for a shorter time
+EMPTY_VALUES = (None, "", "Unknown")
+
+
+class EnrichmentCache:
+    """Detail-page fields per ASIN, persisted in the product_enrichment table.
+
+    `fill` copies cached values onto products and returns the ones that still
+    need a product page load: those without an ASIN, and those with any
+    DETAIL_FIELDS value missing or older than its TTL. Values that were not
+    found on the page are trusted for `empty_ttl_seconds` only. The table is
+    shared, so every scraper process and CategoryWorker benefits from pages
+    any of them loaded.
+    """
+
+    def __init__(self, db_manager, ttls: Dict[str, float] = None, default_ttl_seconds: float = 7 * 86400,
+                 empty_ttl_seconds: float = 86400):
+        self.db_manager = db_manager
+        self.ttls = dict(DETAIL_FIELD_TTLS, **(ttls or {}))
+        self.default_ttl_seconds = default_ttl_seconds
+        self.empty_ttl_seconds = empty_ttl_seconds
+        self.logger = setup_logger(__name__)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.stored = 0
+
+    def ttl(self, field: str, value) -> float:
+        if value in EMPTY_VALUES:
+            return min(self.empty_ttl_seconds, self.ttls.get(field, self.default_ttl_seconds))
+        return self.ttls.get(field, self.default_ttl_seconds)
+
+    def fill(self, products: List[Dict], now: Optional[datetime] = None) -> List[Dict]:
+        """Apply fresh cached fields; returns the products that still need their detail page"""
+        now = now or datetime.now(timezone.utc)
+        cached: Dict[str, Dict] = {}
+        for row in self.db_manager.get_enrichment([p.get("asin") for p in products]):
+            cached.setdefault(row["asin"], {})[row["field"]] = row
+
+        pending = []
+        hits = misses = expired = 0
+        for product in products:
+            fields = cached.get(product.get("asin")) if product.get("asin") else None
+            values = {}
+            for field in DETAIL_FIELDS:
+                row = (fields or {}).get(field)
+                if row is None:
+                    break
+                if (now - row["fetched_at"]).total_seconds() > self.ttl(field, row["value"]):
+                    expired += 1
+                    break
+                values[field] = row["value"]
+            if len(values) == len(DETAIL_FIELDS):
+                product.update(values)
+                hits += 1
+            else:
+                misses += 1
+                pending.append(product)
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.expired += expired
+        return pending
+
+    def store(self, products: List[Dict]) -> int:
+        """Remember the detail fields of freshly enriched products"""
+        rows = [
+            (product["asin"], field, product.get(field))
+            for product in products if product.get("asin")
+            for field in DETAIL_FIELDS
+        ]
+        stored = self.db_manager.upsert_enrichment(rows)
+        with self._lock:
+            self.stored += stored
+        return stored
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "stored": self.stored,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
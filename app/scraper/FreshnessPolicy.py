@@ -0,0 +1,120 @@
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from app.utils.logger import setup_logger
+from .parsing import results_fingerprint
+
+SKIP = "skip"
+CHECK = "check"
+FULL = "full"
+
+
+class FreshnessPolicy:
+    """Decides per category whether an incremental run skips, checks or fully re-scrapes it.
+
+    A category visited less than `min_interval` seconds ago is skipped without
+    a page load. One whose last full scrape is older than `max_age` seconds,
+    or that has never been fingerprinted, is scraped in full. Anything else is
+    checked: its first results page is loaded and fingerprinted, and the rest
+    of the category is only scraped if the fingerprint changed.
+    """
+
+    def __init__(self, min_interval: float = 6 * 3600, max_age: float = 7 * 86400):
+        self.min_interval = min_interval
+        self.max_age = max_age
+        self.logger = setup_logger(__name__)
+        self._lock = threading.Lock()
+        self._counts = {SKIP: 0, "unchanged": 0, "changed": 0, FULL: 0, "details_fetched": 0, "details_skipped": 0}
+
+    def plan(self, category: Dict, now: Optional[datetime] = None) -> str:
+        now = now or datetime.now(timezone.utc)
+        last_scraped = category.get("last_scraped_at")
+        last_changed = category.get("last_changed_at")
+        if last_scraped and (now - last_scraped).total_seconds() < self.min_interval:
+            decision = SKIP
+        elif not category.get("content_fingerprint") or not last_changed \
+                or (now - last_changed).total_seconds() >= self.max_age:
+            decision = FULL
+        else:
+            decision = CHECK
+        if decision == SKIP:
+            self.count(SKIP)
+        return decision
+
+    def refresh(self, db_manager, category: Dict, decision: str) -> "CategoryRefresh":
+        """Change tracking for one category's scrape under `decision`"""
+        return CategoryRefresh(db_manager, category["id"], category.get("content_fingerprint"),
+                               check=decision == CHECK, policy=self)
+
+    def count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counts[name] += amount
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._counts)
+        details = stats["details_fetched"] + stats["details_skipped"]
+        stats["details_skipped_share"] = stats["details_skipped"] / details if details else 0.0
+        return stats
+
+
+class CategoryRefresh:
+    """Change detection for one category during an incremental scrape.
+
+    The scraper hands it the first results page (`first_page`) and each page's
+    products before detail enrichment (`needs_details`), then calls `finish`
+    once the category is saved.
+    """
+
+    def __init__(self, db_manager, category_id: int, previous_fingerprint: Optional[str] = None,
+                 check: bool = True, policy: FreshnessPolicy = None):
+        self.db_manager = db_manager
+        self.category_id = category_id
+        self.previous_fingerprint = previous_fingerprint
+        self.check = check
+        self.policy = policy
+        self.fingerprint: Optional[str] = None
+        self.changed: Optional[bool] = None
+
+    @property
+    def checking(self) -> bool:
+        """Whether the first page is still to decide if the scrape goes on"""
+        return self.check and self.fingerprint is None
+
+    def first_page(self, products: List[Dict]) -> bool:
+        """Fingerprint the first results page; False if the rest of the category can be skipped"""
+        self.fingerprint = results_fingerprint(products)
+        self.changed = self.fingerprint != self.previous_fingerprint
+        if self.policy:
+            self.policy.count(FULL if not self.check else "changed" if self.changed else "unchanged")
+        return self.changed or not self.check
+
+    def needs_details(self, products: List[Dict]) -> List[Dict]:
+        """Products that are new or whose price or availability changed.
+
+        The others keep the brand already stored and skip the detail page.
+        """
+        known = self.db_manager.get_known_products([p.get("product_link") for p in products])
+        pending = []
+        for product in products:
+            stored = known.get(product.get("product_link"))
+            if stored is None or not _same_listing(stored, product):
+                pending.append(product)
+            elif stored.get("brand"):
+                product["brand"] = stored["brand"]
+        if self.policy:
+            self.policy.count("details_fetched", len(pending))
+            self.policy.count("details_skipped", len(products) - len(pending))
+        return pending
+
+    def finish(self) -> bool:
+        """Store the fingerprint; a no-op if the first page never loaded"""
+        if self.fingerprint is None:
+            return False
+        return self.db_manager.mark_category_scraped(self.category_id, self.fingerprint, self.changed or not self.check)
+
+
+def _same_listing(stored: Dict, product: Dict) -> bool:
+    stored_price = float(stored["price"]) if stored.get("price") is not None else None
+    price = round(float(product["price"]), 2) if product.get("price") is not None else None
+    return stored_price == price and stored.get("availability") == product.get("availability")
@@ -1,250 +1,199 @@
-from typing import List, Dict,Optional
+from typing import Iterator, List, Dict,Optional
 from urllib.parse import urljoin
-import time,random
-import  re 
+import time
 from app.utils.logger import setup_logger
 from .BaseScraper import BaseScraper
+from .parsing import CARD_ASIN_ATTRIBUTE, CARD_SELECTOR, CARD_FIELDS, NEXT_PAGE_SELECTOR, build_product_data, extract_cards, is_captcha_page, read_fields
+from .DetailEnricher import DetailEnricher
+from .html_parser import parse_next_page_url, parse_products
 class ProductScraper(BaseScraper):
-    def __init__(self, db_manager, headless: bool = True, base_url="https://www.amazon.com"):
-        super().__init__(db_manager, headless, base_url)
+    def __init__(self, db_manager, headless: bool = True, base_url="https://www.amazon.com", browser_pool=None, extraction_mode: str = "bulk", snapshot_cache=None, rate_limiter=None, enrichment_cache=None):
+        super().__init__(db_manager, headless, base_url, browser_pool, snapshot_cache, rate_limiter)
         self.logger = setup_logger(__name__)  
+        # "bulk" reads every card in one page.evaluate, "element" walks ElementHandles,
+        # "html" fetches page.content() once and parses it offline
+        self.extraction_mode = extraction_mode
+        self.detail_enricher = DetailEnricher(self.browser_pool, snapshot_cache=snapshot_cache, rate_limiter=self.rate_limiter,
+                                              enrichment_cache=enrichment_cache)
         
         
-    def scrape_products_from_category(self,category,max_products:int=10)->List[Dict]:
-        """Scrape products from a given category URL"""
+    def scrape_products_from_category(self,category,max_products:int=10,max_pages:int=1)->List[Dict]:
+        """Scrape products from a given category URL; after an error, the products of the pages before it"""
         products = []
         try:
-            playwright, browser, context = self.setup_browser()
-            page = context.new_page()
-            self.logger.info(f"Navigating to category: {category.name}")
-            page.goto(category.url,wait_until='load', timeout=60000)
-            self._random_delay(2, 5)
-            
-            
-            page.wait_for_selector("[data-component-type='s-search-result']", timeout=15000)
-
-            product_cards = page.query_selector_all("[data-component-type='s-search-result']")[:max_products]
-            self.logger.info(f"Found {len(product_cards)} products in category {category.name}")
-            for i,product in enumerate(product_cards):
-                try:
-                    product_data=self._extract_product_data(product,category.name,category.id)
-                    if product_data:
-                        products.append(product_data)
-                        self.logger.info(f"Scraped product {i+1}: {product_data['title'][:50]}...")
-                        
-                except Exception as e:
-                        self.logger.warning(f"Failed to extract product {i+1}: {e}")
-                        continue
-                    
-            for product_data in products:
-                if product_data["product_link"]:
-                    product_data["brand"] = self._extract_brand(page, product_data["product_link"])
-            
-        
-                    
+            for product in self.iter_products(category, max_products=max_products, max_pages=max_pages):
+                products.append(product)
             self.logger.info(f"Scraping completed for category {category.name}. Total products scraped: {len(products)}")
-            return products
         except Exception as e:
-            self.logger.error(f"Error scraping products from category {category.name}: {e}")
-            return []
+            self.logger.error(f"Error scraping products from category {category.name} after {len(products)} products: {e}")
+        return products
+
+    def iter_products(self, category, max_products: int = 10, max_pages: int = 1, refresh=None, seen=None) -> Iterator[Dict]:
+        """Yield a category's products page by page, following the results pagination.
+
+        While page N is extracted and enriched, page N+1 is already loading in
+        a second tab. `max_products` and `max_pages` apply across all pages.
+        With a CategoryRefresh, an unchanged first page ends the category and
+        only new or changed products get their detail page fetched. With a
+        run's SeenProducts, products already taken earlier in the run are
+        dropped and do not count towards `max_products`.
+        """
+        remaining = max_products
+        url = category.url
+        loading = None
+        try:
+            for page_number in range(1, max_pages + 1):
+                if not url or remaining <= 0:
+                    break
+
+                html = self.snapshot_cache.lookup(url) if self.snapshot_cache and not loading else None
+                if html is not None:
+                    products = parse_products(html, self.base_url, category.name, category.id, remaining)
+                    url = parse_next_page_url(html, self.base_url)
+                    self.logger.info(f"Parsed {len(products)} products from the snapshot of {category.name} page {page_number}")
+                elif self.snapshot_cache and self.snapshot_cache.replay:
+                    self.logger.warning(f"No snapshot for {category.name} page {page_number}, stopping in replay mode")
+                    break
+                else:
+                    current = loading or self._start_results_load(url)
+                    loading = None
+                    try:
+                        self.logger.info(f"Navigating to category: {category.name} (page {page_number})")
+                        page = self._finish_results_load(current)
+                        url = self._next_page_url(page)
+                        # Let the browser fetch the next page while this one is extracted
+                        if url and page_number < max_pages and page.locator(CARD_SELECTOR).count() < remaining \
+                                and not (refresh and refresh.checking):
+                            loading = self._start_results_load(url)
+                        products = self._extract_products(page, category, remaining)
+                    finally:
+                        current[0].__exit__(None, None, None)
+
+                if refresh and page_number == 1 and not refresh.first_page(products[:remaining]):
+                    self.logger.info(f"Results of {category.name} unchanged since the last scrape, skipping")
+                    break
+                if seen is not None:
+                    products = seen.first_sightings(products[:remaining])
+
+                # Detail pages load in their own tabs; the results page is not revisited
+                self.detail_enricher.enrich(refresh.needs_details(products[:remaining]) if refresh else products)
+                for product_data in products[:remaining]:
+                    remaining -= 1
+                    yield product_data
         finally:
-            try:
-                page.close()
-                browser.close()
-                playwright.stop()
-            except Exception as e:
-                self.logger.error(f"Cleanup error: {e}")
-            
+            if loading:
+                loading[0].__exit__(None, None, None)
 
-    def _extract_product_data(self, product_card, category_name:str,category_id:int)->Optional[Dict]:
-        """Extract product data from a product card element"""
+    def _start_results_load(self, url: str):
+        """Borrow a search page and start navigating it without waiting for the load"""
+        borrowed = self.browser_pool.page("search")
+        page = borrowed.__enter__()
         try:
-             # Extract title
-            title_element = product_card.query_selector("a h2 span")
-            title = title_element.text_content().strip() if title_element else None
-            
-            if not title:
-                return None
+            self.rate_limiter.acquire(url)
+            started = time.monotonic()
+            response = page.goto(url, wait_until="commit", timeout=60000)
+            return borrowed, page, url, started, response
+        except Exception:
+            borrowed.__exit__(None, None, None)
+            raise
 
-            # Extract product URL
-            link_element = product_card.query_selector("a.a-link-normal")
-            product_link = link_element.get_attribute("href") if link_element else None
-            if product_link:
-                product_link = urljoin(self.base_url, product_link)
-                
-                
-            
+    def _finish_results_load(self, loading):
+        """Wait for a started results page and report it to the rate limiter"""
+        borrowed, page, url, started, response = loading
+        try:
+            page.wait_for_load_state("load", timeout=60000)
+            page.wait_for_selector(CARD_SELECTOR, timeout=15000)
+        finally:
+            self.rate_limiter.feedback(
+                url,
+                status=response.status if response else None,
+                elapsed=time.monotonic() - started,
+                captcha=is_captcha_page(page),
+            )
+        if self.snapshot_cache:
+            self.snapshot_cache.store(url, page.content())
+        return page
 
-            # Extract price information
-            price_data = self._extract_price_data(product_card)
+    def _next_page_url(self, page) -> Optional[str]:
+        """Absolute URL behind the results page's Next link"""
+        next_link = page.query_selector(NEXT_PAGE_SELECTOR)
+        href = next_link.get_attribute("href") if next_link else None
+        if next_link:
+            next_link.dispose()
+        return urljoin(self.base_url, href) if href else None
 
-            # Extract rating and reviews
-            rating_data = self._extract_rating_data(product_card)
-            
-            # Extract image URL
-            image_element = product_card.query_selector(".s-image")
-            image_url = image_element.get_attribute("src") if image_element else None
-            
-            # Extract availability
-            availability = self._extract_availability(product_card)
+    def _extract_products(self, page, category, max_products: int) -> List[Dict]:
+        """Extract product dicts from the loaded results page"""
+        products = []
+        if self.extraction_mode == "html":
+            products = parse_products(page.content(), self.base_url, category.name, category.id, max_products)
+            self.logger.info(f"Parsed {len(products)} products in category {category.name}")
+            return products
 
-            product_data = {
-                "category_id": category_id,
-                "category_name": category_name,
-                "title": title,
-                "brand": "Unknown",
-                "price": price_data["current_price"] if price_data else None,
-                "original_price": price_data["original_price"] if price_data else None,
-                "discount_percent": price_data["discount_percent"] if price_data else None,
-                "rating": rating_data["rating"]if rating_data else None,
-                "reviews_count": rating_data["reviews_count"] if rating_data else None,
-                "product_link": product_link,
-                "image_url": image_url,
-                "availability": availability,
-                
-            }
-            return product_data
+        if self.extraction_mode == "bulk":
+            raw_cards = extract_cards(page, max_products)
+            self.logger.info(f"Found {len(raw_cards)} products in category {category.name}")
+            for i, raw in enumerate(raw_cards):
+                product_data = build_product_data(raw, self.base_url, category.name, category.id)
+                if product_data:
+                    products.append(product_data)
+                    self.logger.info(f"Scraped product {i+1}: {product_data['title'][:50]}...")
+            return products
+
+        product_cards = self.browser_pool.track(page.query_selector_all(CARD_SELECTOR))[:max_products]
+        self.logger.info(f"Found {len(product_cards)} products in category {category.name}")
+        for i,product in enumerate(product_cards):
+            try:
+                product_data=self._extract_product_data(product,category.name,category.id)
+                if product_data:
+                    products.append(product_data)
+                    self.logger.info(f"Scraped product {i+1}: {product_data['title'][:50]}...")
+                    
+            except Exception as e:
+                    self.logger.warning(f"Failed to extract product {i+1}: {e}")
+                    continue
+        return products
+
+    def _extract_product_data(self, product_card, category_name:str,category_id:int)->Optional[Dict]:
+        """Extract product data from a product card element"""
+        try:
+            return build_product_data(self._read_card(product_card), self.base_url, category_name, category_id)
         except Exception as e:
             self.logger.error(f"Error extracting product data: {e}")
             return {}
-        
-        
-    def _extract_price_data(self, product_element) -> Dict:
-        """Extract price, original price, and discount percentage"""
-        try:
-            # Current price
-            price_element = product_element.query_selector(".a-price .a-offscreen")
-            current_text = price_element.text_content().strip() if price_element else "0"
-            current_price=self._clean_price(current_text)
-            
-            # Original price (for discounts)
-            original_price_element = product_element.query_selector(".a-price.a-text-price .a-offscreen")
-            original_price_text = original_price_element.text_content().strip() if original_price_element else current_price
-            
-            original_price=self._clean_price(original_price_text)
-            
-            # Calculate discount percentage
-            discount_percent = 0
-            if original_price != current_price:
-                try:
-                    # Extract numeric values from price strings
-                    current_num = float(re.sub(r'[^\d.]', '', current_price))
-                    original_num = float(re.sub(r'[^\d.]', '', original_price))
-                    if original_num > 0:
-                        discount_percent = int(((original_num - current_num) / original_num) * 100)
-                except:
-                    discount_percent = 0
 
-            return {
-                "current_price": current_price,
-                "original_price": original_price,
-                "discount_percent": discount_percent
-            }
-            
-        except Exception as e:
-            self.logger.debug(f"Could not extract price data: {e}")
-            return {"current_price": "0", "original_price": "0", "discount_percent": 0}
-        
+    def _read_card(self, product_card) -> Dict:
+        """Read the raw text and attributes of every card field, one element at a time"""
+        return dict(read_fields(product_card, CARD_FIELDS), asin=product_card.get_attribute(CARD_ASIN_ATTRIBUTE))
         
-    def _clean_price(self, price_text: str) -> float:
-        """Convert price string to numeric value"""
-        try:
-            # Remove dollar sign, commas, and any non-numeric characters except decimal point
-            cleaned = re.sub(r'[^\d.]', '', price_text)
-            return float(cleaned) if cleaned else 0.0
-        except:
-            return 0.0
-        
-    def _extract_rating_data(self, product_element) -> Dict:
-        """Extract rating and review count"""
-        try:
-            # Rating
-            rating_element = product_element.query_selector(".a-icon-alt")
-            rating_text = rating_element.text_content().strip() if rating_element else ""
-            
-            # Extract numeric rating
-            rating_match = re.search(r"(\d+\.\d+)", rating_text)
-            rating = rating_match.group(1) if rating_match else "0"
-            
-            # Review count
-            reviews_element = product_element.query_selector(".a-size-mini.puis-normal-weight-text.s-underline-text")
-            reviews_text = reviews_element.text_content().strip() if reviews_element else "0"
-            
-            # Convert review text to number (e.g., "1,234" -> 1234)
-            reviews_count = 0
-            if reviews_text and reviews_text != "0":
-                try:
-                    reviews_count = int(re.sub(r'[^\d]', '', reviews_text))
-                except:
-                    reviews_count = 0
+    def scrape_products_and_save_to_database(self,category_id:int,category_name:str,category_url:str, max_products: int = 20, max_pages: int = 1, batch_size: int = 100, refresh=None, seen=None,
+                                             raise_errors: bool = False):
+        """Save scraped products to the database in bulk batches as pages stream in.
 
-            return {
-                "rating": rating,
-                "reviews_count": reviews_count
-            }
-            
-        except Exception as e:
-            self.logger.debug(f"Could not extract rating data: {e}")
-            return {"rating": "0", "reviews_count": 0}
-        
-    
-        
-    def _extract_availability(self, product_element) -> str:
-        """Check product availability"""
-        try:
-            # Check for out of stock indicators
-            availability_span = product_element.query_selector(
-            ".a-size-base.a-color-price"
-        )
-            if availability_span:
-                return availability_span.text_content().strip()
-                
-            
-            return "In Stock"
-            
-        except Exception as e:
-            self.logger.debug(f"Could not determine availability: {e}")
-            return "In Stock"
-    
-    def _extract_brand(self,page, product_url: str) -> str:
-        """Navigate to product page and extract brand information"""
+        Products scraped before an error are still saved; the error, or a
+        failed write, is logged, or re-raised with `raise_errors` so the
+        caller can retry.
+        """
+        category = type("Category", (object,), {"id": category_id, "name": category_name, "url": category_url})()
+        saved = 0
+        batch = []
+        completed = False
         try:
-            # Save current URL to navigate back later
-            current_url = page.url
-            
-            # Navigate to product page
-            page.goto(product_url, wait_until="domcontentloaded", timeout=30000)
-            self._random_delay(2, 3)
-            
-            # Try the bylineInfo element
-            brand_element = page.query_selector("#bylineInfo")
-            if brand_element:
-                brand = brand_element.text_content().strip()
-                if brand and len(brand) > 1:
-                    brand = brand.replace("Brand: ", "").replace("Visit the ", "").replace(" Store", "")
-                    brand = brand.strip()
-                    return brand
-            
-            return "Unknown"
-            
+            for product in self.iter_products(category, max_products=max_products, max_pages=max_pages, refresh=refresh, seen=seen):
+                batch.append(product)
+                if len(batch) >= batch_size:
+                    saved += len(self.db_manager.upsert_products(batch, raise_errors=raise_errors))
+                    batch = []
+            completed = True
         except Exception as e:
-            self.logger.warning(f"Could not extract brand from product page {product_url}: {e}")
-            return "Unknown"
+            self.logger.error(f"Error scraping products from category {category_name}: {e}")
+            if raise_errors:
+                raise
         finally:
-            # Always navigate back to search results
-            try:
-                page.goto(current_url, wait_until="domcontentloaded")
-                self._random_delay(1, 2)
-            except Exception as e:
-                self.logger.debug(f"Could not navigate back to search results: {e}")
-                
-                
-    def scrape_products_and_save_to_database(self,category_id:int,category_name:str,category_url:str, max_products: int = 20):
-        """Save scraped products to the database"""
-        products = self.scrape_products_from_category(
-            category=type("Category", (object,), {"id": category_id, "name": category_name, "url": category_url})(),
-            max_products=max_products
-        )
-        for product in products:
-            self.db_manager.insert_product(product)
-        self.logger.info(f"Saved {len(products)} products to the database for category {category_name}.")
\ No newline at end of file
+            if batch:
+                saved += len(self.db_manager.upsert_products(batch, raise_errors=raise_errors))
+        # A failed scrape keeps the old fingerprint so the next run looks again
+        if refresh and completed:
+            refresh.finish()
+        self.logger.info(f"Saved {saved} products to the database for category {category_name}.")
+        return saved
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+from app.utils.logger import setup_logger
+
+THROTTLE_STATUSES = {429, 503}
+
+
+class _HostBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.requests = 0
+        self.throttled = 0
+        self.waited = 0.0
+
+
+class HostRateLimiter:
+    """Token bucket per host whose refill rate adapts to how the site responds.
+
+    Every navigation calls `acquire(url)` (or `acquire_async`) first and
+    `feedback(...)` afterwards. 429/503 responses and captcha pages halve the
+    host's rate and pause it for `cooldown_seconds`; failed navigations (no
+    status), 5xx responses and responses slower than `slow_seconds` cut it by
+    a quarter; only responses with a status below 400 raise it by
+    `recovery_step` until it reaches `max_rate`, the configured ceiling in
+    requests per second. One limiter is shared by every scraper of a run.
+    """
+
+    def __init__(self, rate: float = 0.5, max_rate: float = 1.0, min_rate: float = 0.05, burst: float = 2.0,
+                 slow_seconds: float = 10.0, cooldown_seconds: float = 30.0, recovery_step: float = 0.05):
+        self.initial_rate = min(rate, max_rate)
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.burst = burst
+        self.slow_seconds = slow_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self.recovery_step = recovery_step
+        self.logger = setup_logger(__name__)
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, _HostBucket] = {}
+
+    def _bucket(self, url: str) -> _HostBucket:
+        host = urlparse(url).netloc or url
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = _HostBucket(self.initial_rate, self.burst)
+        return bucket
+
+    def _reserve(self, url: str) -> float:
+        """Take a token for `url`'s host and return how long to wait for it"""
+        with self._lock:
+            bucket = self._bucket(url)
+            now = time.monotonic()
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+            bucket.updated = now
+            bucket.tokens -= 1
+            bucket.requests += 1
+            wait = -bucket.tokens / bucket.rate if bucket.tokens < 0 else 0.0
+            bucket.waited += wait
+            return wait
+
+    def acquire(self, url: str):
+        """Block until a request to `url` fits under its host's rate"""
+        wait = self._reserve(url)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, url: str):
+        """Async twin of acquire"""
+        wait = self._reserve(url)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def feedback(self, url: str, status: Optional[int] = None, elapsed: Optional[float] = None, captcha: bool = False):
+        """Adjust the host's rate from the outcome of a request; no `status` means it failed"""
+        with self._lock:
+            bucket = self._bucket(url)
+            if captcha or status in THROTTLE_STATUSES:
+                bucket.rate = max(self.min_rate, bucket.rate * 0.5)
+                bucket.tokens = min(bucket.tokens, -self.cooldown_seconds * bucket.rate)
+                bucket.throttled += 1
+                reason = "captcha" if captcha else f"HTTP {status}"
+                self.logger.warning(f"Throttling {urlparse(url).netloc} after {reason}: {bucket.rate:.2f} req/s")
+            elif status is None or status >= 500 or (elapsed is not None and elapsed > self.slow_seconds):
+                bucket.rate = max(self.min_rate, bucket.rate * 0.75)
+            elif status < 400:
+                bucket.rate = min(self.max_rate, bucket.rate + self.recovery_step)
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                host: {
+                    "rate": bucket.rate,
+                    "requests": bucket.requests,
+                    "throttled": bucket.throttled,
+                    "waited_seconds": bucket.waited,
+                }
+                for host, bucket in self._buckets.items()
+            }
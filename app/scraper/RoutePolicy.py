@@ -0,0 +1,177 @@
+import asyncio
+import re
+import threading
+from typing import Dict, Optional
+from app.utils.logger import setup_logger
+
+# Hosts and paths that only serve ads, beacons and metrics
+TRACKER_PATTERNS = [
+    r"amazon-adsystem\.com",
+    r"doubleclick\.net",
+    r"google-analytics\.com",
+    r"googletagmanager\.com",
+    r"fls-[a-z]+\.amazon\.",
+    r"unagi(-[a-z]+)?\.amazon\.",
+    r"/uedata",
+    r"/1/batch/1/OE/",
+    r"aax-[a-z-]+\.amazon",
+    r"/gp/ads/",
+]
+
+# Per page kind: resource types to abort and URL patterns to abort
+DEFAULT_RULES = {
+    # The menu is clicked and scrolled, so keep stylesheets for layout
+    "menu": {
+        "block_types": {"image", "media", "font"},
+        "block_patterns": TRACKER_PATTERNS,
+    },
+    "search": {
+        "block_types": {"image", "media", "font", "stylesheet"},
+        "block_patterns": TRACKER_PATTERNS,
+    },
+    "detail": {
+        "block_types": {"image", "media", "font", "stylesheet"},
+        "block_patterns": TRACKER_PATTERNS,
+    },
+}
+
+
+class PageTraffic:
+    """Requests and bytes seen by one page while it was borrowed.
+
+    Bytes are the transferred response headers and (encoded) bodies that
+    Playwright measures once a request finishes, so chunked and compressed
+    responses without a content-length are counted too.
+    """
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.allowed = 0
+        self.blocked = 0
+        self.bytes = 0
+        self.handler = None
+        self._pending = set()
+
+    def _add_sizes(self, sizes: Dict):
+        self.bytes += sizes["responseBodySize"] + sizes["responseHeadersSize"]
+
+    def on_request_finished(self, request):
+        try:
+            self._add_sizes(request.sizes())
+        except Exception:
+            pass
+
+    def on_request_finished_async(self, request):
+        async def measure():
+            try:
+                self._add_sizes(await request.sizes())
+            except Exception:
+                pass
+        task = asyncio.get_running_loop().create_task(measure())
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def settle(self):
+        """Wait for the sizes of finished requests still being read; call before closing the page"""
+        if self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+
+
+class RoutePolicy:
+    """Aborts requests the extractors never use, per page kind.
+
+    `attach(page, kind)` installs the route handler and a response listener;
+    `detach(page, traffic)` removes them and folds the page's counters into the
+    per-kind totals returned by `stats()`.
+    """
+
+    def __init__(self, rules: Optional[Dict] = None):
+        self.rules = {}
+        for kind, rule in (rules or DEFAULT_RULES).items():
+            self.rules[kind] = {
+                "block_types": set(rule.get("block_types", ())),
+                "block_patterns": re.compile("|".join(rule["block_patterns"])) if rule.get("block_patterns") else None,
+            }
+        self.logger = setup_logger(__name__)
+        self._lock = threading.Lock()
+        self._totals: Dict[str, Dict[str, int]] = {}
+
+    def should_block(self, kind: str, resource_type: str, url: str) -> bool:
+        rule = self.rules.get(kind)
+        if not rule:
+            return False
+        if resource_type in rule["block_types"]:
+            return True
+        return bool(rule["block_patterns"] and rule["block_patterns"].search(url))
+
+    def attach(self, page, kind: str) -> PageTraffic:
+        """Install the routing rules of `kind` on a sync API page"""
+        traffic = PageTraffic(kind)
+
+        def handle(route):
+            request = route.request
+            if self.should_block(kind, request.resource_type, request.url):
+                traffic.blocked += 1
+                route.abort("blockedbyclient")
+            else:
+                traffic.allowed += 1
+                route.continue_()
+
+        page.route("**/*", handle)
+        page.on("requestfinished", traffic.on_request_finished)
+        traffic.handler = handle
+        return traffic
+
+    async def attach_async(self, page, kind: str) -> PageTraffic:
+        """Install the routing rules of `kind` on an async API page"""
+        traffic = PageTraffic(kind)
+
+        async def handle(route):
+            request = route.request
+            if self.should_block(kind, request.resource_type, request.url):
+                traffic.blocked += 1
+                await route.abort("blockedbyclient")
+            else:
+                traffic.allowed += 1
+                await route.continue_()
+
+        await page.route("**/*", handle)
+        page.on("requestfinished", traffic.on_request_finished_async)
+        traffic.handler = handle
+        return traffic
+
+    def detach(self, page, traffic: PageTraffic):
+        """Remove the handlers of a sync API page and record its traffic"""
+        try:
+            if not page.is_closed():
+                page.unroute("**/*", traffic.handler)
+                page.remove_listener("requestfinished", traffic.on_request_finished)
+        except Exception as e:
+            self.logger.debug(f"Could not remove route handler: {e}")
+        self.record(traffic)
+
+    def record(self, traffic: PageTraffic):
+        """Fold one page's counters into the per-kind totals"""
+        with self._lock:
+            totals = self._totals.setdefault(traffic.kind, {"pages": 0, "allowed": 0, "blocked": 0, "bytes": 0})
+            totals["pages"] += 1
+            totals["allowed"] += traffic.allowed
+            totals["blocked"] += traffic.blocked
+            totals["bytes"] += traffic.bytes
+        self.logger.debug(
+            f"{traffic.kind} page: {traffic.allowed} allowed, {traffic.blocked} blocked, {traffic.bytes / 1024:.0f} KB"
+        )
+
+    def stats(self) -> Dict[str, Dict]:
+        """Per page kind totals with per-page averages"""
+        with self._lock:
+            report = {}
+            for kind, totals in self._totals.items():
+                pages = totals["pages"] or 1
+                report[kind] = dict(
+                    totals,
+                    allowed_per_page=totals["allowed"] / pages,
+                    blocked_per_page=totals["blocked"] / pages,
+                    kb_per_page=totals["bytes"] / pages / 1024,
+                )
+            return report
@@ -0,0 +1,180 @@
+import os
+import socket
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from app.database.scrape_jobs import ScrapeJobStore
+from app.utils.logger import setup_logger
+
+JOB_PARAMS = ("max_categories", "max_subcategories", "max_products", "max_pages")
+
+
+class ScrapeJob:
+    """One scrape run's row of scrape_jobs; the progress calls of a running job write through to it"""
+
+    def __init__(self, row: Dict, store: ScrapeJobStore = None):
+        self.row = row
+        self.store = store
+        self._lock = threading.Lock()
+
+    @property
+    def job_id(self) -> str:
+        return self.row["job_id"]
+
+    @property
+    def params(self) -> Dict:
+        return self.row["params"]
+
+    @property
+    def status(self) -> str:
+        return self.row["status"]
+
+    @property
+    def products_ingested(self) -> int:
+        return self.row["products_ingested"]
+
+    def _update(self, row: Optional[Dict]):
+        if row:
+            with self._lock:
+                self.row = row
+
+    def categories_found(self, total: int):
+        self._update(self.store.progress(self.job_id, categories_total=total))
+
+    def category_done(self, category: Dict, saved: int):
+        self._update(self.store.progress(self.job_id, categories_done=1, products_ingested=saved))
+
+    def finish(self, error: Optional[str] = None, status: Optional[str] = None):
+        self._update(self.store.finish(self.job_id, status or ("failed" if error else "succeeded"), error))
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            row = dict(self.row)
+        if row["started_at"] is None:
+            elapsed = 0.0
+        else:
+            elapsed = ((row["finished_at"] or datetime.now(timezone.utc)) - row["started_at"]).total_seconds()
+        return dict(
+            row,
+            params=dict(row["params"]),
+            elapsed_seconds=elapsed,
+            products_per_minute=row["products_ingested"] / elapsed * 60 if elapsed else 0.0,
+        )
+
+
+class ScrapeJobQueue:
+    """Runs scrape jobs on background worker threads, outside the request path.
+
+    Jobs live in Postgres (ScrapeJobStore), so with several API worker
+    processes a job can be polled from any of them, runs on exactly one, and
+    a submission whose parameters equal a queued or running job's is merged
+    into that job wherever it was submitted. Each worker thread keeps one
+    AmazonScraper (and so one warm Chromium) for all the jobs it runs;
+    Playwright's sync API ties that browser to the worker's thread.
+    """
+
+    def __init__(self, workers: int = 1, history: int = 100, scraper_factory: Callable = None,
+                 store: ScrapeJobStore = None, poll_seconds: float = 2.0):
+        self.workers = max(1, workers)
+        self.scraper_factory = scraper_factory
+        self.store = store or ScrapeJobStore(history=history)
+        self.poll_seconds = poll_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.logger = setup_logger(__name__)
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        if self._threads:
+            return
+        self._stopping.clear()
+        self._threads.append(threading.Thread(target=self._heartbeat, name="scrape-heartbeat", daemon=True))
+        for index in range(self.workers):
+            self._threads.append(threading.Thread(target=self._work, name=f"scrape-worker-{index}", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, params: Dict) -> Tuple[ScrapeJob, bool]:
+        """Queue a job for `params`, or return the active job with the same params; (job, merged)"""
+        row, merged = self.store.submit({name: params.get(name) for name in JOB_PARAMS})
+        if merged:
+            self.logger.info(f"Merged scrape request into job {row['job_id']}")
+        else:
+            self.logger.info(f"Queued scrape job {row['job_id']} with {row['params']}")
+            self._wake.set()
+        return ScrapeJob(row, self.store), merged
+
+    def get(self, job_id: str) -> Optional[ScrapeJob]:
+        row = self.store.get(job_id)
+        return ScrapeJob(row, self.store) if row else None
+
+    def jobs(self) -> List[ScrapeJob]:
+        """Known jobs, newest first"""
+        return [ScrapeJob(row, self.store) for row in self.store.recent(self.store.history)]
+
+    def _make_scraper(self):
+        if self.scraper_factory:
+            return self.scraper_factory()
+        from .amazon_scraper import AmazonScraper
+        return AmazonScraper()
+
+    def _claim(self) -> Optional[ScrapeJob]:
+        try:
+            row = self.store.claim(self.worker_id)
+        except Exception as e:
+            self.logger.error(f"Could not claim a scrape job: {e}")
+            return None
+        return ScrapeJob(row, self.store) if row else None
+
+    def _work(self):
+        scraper = None
+        while not self._stopping.is_set():
+            job = self._claim()
+            if job is None:
+                # Jobs submitted to other processes are only seen by polling
+                self._wake.wait(self.poll_seconds)
+                self._wake.clear()
+                continue
+            self.logger.info(f"Running scrape job {job.job_id}")
+            try:
+                if scraper is None:
+                    scraper = self._make_scraper()
+                scraper.run_full_scraping(progress=job, **job.params)
+                job.finish()
+            except Exception as e:
+                self.logger.error(f"Scrape job {job.job_id} failed: {e}")
+                job.finish(error=str(e))
+                # Start the next job from a fresh browser
+                if scraper is not None:
+                    self._close_scraper(scraper)
+                    scraper = None
+            self.logger.info(f"Scrape job {job.job_id} {job.status}: {job.products_ingested} products")
+        if scraper is not None:
+            self._close_scraper(scraper)
+
+    def _heartbeat(self):
+        """Keep the leases of this process's running jobs alive"""
+        while not self._stopping.wait(self.store.lease_seconds / 3):
+            try:
+                self.store.heartbeat(self.worker_id)
+            except Exception as e:
+                self.logger.warning(f"Scrape job heartbeat failed: {e}")
+
+    def _close_scraper(self, scraper):
+        try:
+            scraper.close()
+        except Exception as e:
+            self.logger.debug(f"Scraper close error: {e}")
+
+    def stop(self, timeout: float = 10.0):
+        """Stop claiming jobs and let running ones finish within `timeout`.
+
+        Queued jobs stay queued for another worker process, or for this one
+        after a restart.
+        """
+        self._stopping.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
@@ -0,0 +1,38 @@
+import threading
+from typing import Dict, List
+
+
+class SeenProducts:
+    """Products already taken during one scrape run, keyed by ASIN (or link without one).
+
+    A product listed in several categories, or on two results pages while
+    the ranking shifts, is kept at its first sighting; later copies are
+    dropped before any detail fetch or database write.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys = set()
+        self.duplicates = 0
+
+    @staticmethod
+    def key(product: Dict):
+        return product.get("asin") or product.get("product_link")
+
+    def first_sightings(self, products: List[Dict]) -> List[Dict]:
+        """The products not seen before in this run, which are now marked seen"""
+        fresh = []
+        with self._lock:
+            for product in products:
+                key = self.key(product)
+                if key is None:
+                    fresh.append(product)
+                elif key in self._keys:
+                    self.duplicates += 1
+                else:
+                    self._keys.add(key)
+                    fresh.append(product)
+        return fresh
+
+    def __len__(self):
+        return len(self._keys)
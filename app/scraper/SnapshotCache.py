@@ -0,0 +1,172 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+from app.utils.logger import setup_logger
+
+MODES = ("off", "record", "prefer", "replay")
+
+
+class SnapshotCache:
+    """Compressed, content-addressed store of fetched HTML keyed by URL.
+
+    Page bodies are gzipped under objects/<digest[:2]>/<digest>.html.gz so
+    identical pages share one blob; a small sqlite index maps each URL to its
+    digest and fetch time. Modes:
+
+    - "record": always fetch, store every page
+    - "prefer": serve snapshots younger than `ttl_seconds`, fetch and store the rest
+    - "replay": serve snapshots of any age and never touch the network
+    """
+
+    def __init__(self, root: str = None, mode: str = "prefer", ttl_seconds: float = 24 * 3600, max_bytes: int = 2 * 1024 ** 3):
+        if mode not in MODES:
+            raise ValueError(f"Unknown snapshot mode '{mode}', expected one of {MODES}")
+        self.root = root or os.getenv("SNAPSHOT_DIR", "cache/snapshots")
+        self.mode = mode
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.logger = setup_logger(__name__)
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.join(self.root, "objects"), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(self.root, "index.sqlite3"), check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS snapshots (
+                url TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS snapshots_accessed ON snapshots (accessed_at);
+            CREATE INDEX IF NOT EXISTS snapshots_digest ON snapshots (digest);
+        """)
+        # Bytes of the distinct blobs in the index, kept up to date by store() so
+        # a write does not scan the index; other processes sharing the store
+        # are only seen when _evict recounts
+        self._bytes = self._stored_bytes()
+
+    @property
+    def replay(self) -> bool:
+        return self.mode == "replay"
+
+    @staticmethod
+    def normalize_url(url: str) -> str:
+        """Drop the fragment and lowercase scheme and host"""
+        parts = urlsplit(url)
+        return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, parts.query, ""))
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], f"{digest}.html.gz")
+
+    def lookup(self, url: str) -> Optional[str]:
+        """HTML to use instead of fetching `url`, or None if it must be fetched"""
+        if self.mode not in ("prefer", "replay"):
+            return None
+        key = self.normalize_url(url)
+        with self._lock:
+            row = self._db.execute("SELECT digest, fetched_at FROM snapshots WHERE url = ?", (key,)).fetchone()
+            fresh = row and (self.replay or time.time() - row[1] <= self.ttl_seconds)
+            if fresh:
+                self._db.execute("UPDATE snapshots SET accessed_at = ? WHERE url = ?", (time.time(), key))
+                self._db.commit()
+        if not fresh:
+            self.misses += 1
+            return None
+        try:
+            with gzip.open(self._blob_path(row[0]), "rt", encoding="utf-8") as f:
+                html = f.read()
+            self.hits += 1
+            return html
+        except OSError as e:
+            self.logger.warning(f"Snapshot blob missing for {url}: {e}")
+            self.misses += 1
+            return None
+
+    def store(self, url: str, html: str):
+        """Save the fetched HTML of `url` unless the cache is read-only"""
+        if self.mode not in ("record", "prefer"):
+            return
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as raw, gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0) as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        key = self.normalize_url(url)
+        size = os.path.getsize(path)
+        now = time.time()
+        with self._lock:
+            replaced = self._db.execute("SELECT digest, size FROM snapshots WHERE url = ?", (key,)).fetchone()
+            if not self._db.execute("SELECT 1 FROM snapshots WHERE digest = ? LIMIT 1", (digest,)).fetchone():
+                self._bytes += size
+            self._db.execute(
+                "INSERT OR REPLACE INTO snapshots (url, digest, size, fetched_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, digest, size, now, now),
+            )
+            if replaced and replaced[0] != digest and \
+                    not self._db.execute("SELECT 1 FROM snapshots WHERE digest = ? LIMIT 1", (replaced[0],)).fetchone():
+                self._bytes -= replaced[1]
+            self._db.commit()
+            over = self._bytes > self.max_bytes
+        if over:
+            self._evict()
+
+    def _stored_bytes(self) -> int:
+        return self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM snapshots)"
+        ).fetchone()[0]
+
+    def _evict(self):
+        """Drop least recently used URLs until the stored blobs fit in max_bytes"""
+        with self._lock:
+            total = self._bytes = self._stored_bytes()
+            if total <= self.max_bytes:
+                return
+            rows = self._db.execute("SELECT url, digest, size FROM snapshots ORDER BY accessed_at").fetchall()
+            evicted = 0
+            for url, digest, size in rows:
+                if total <= self.max_bytes:
+                    break
+                self._db.execute("DELETE FROM snapshots WHERE url = ?", (url,))
+                if not self._db.execute("SELECT 1 FROM snapshots WHERE digest = ? LIMIT 1", (digest,)).fetchone():
+                    try:
+                        os.remove(self._blob_path(digest))
+                    except OSError:
+                        pass
+                    total -= size
+                evicted += 1
+            self._db.commit()
+            self._bytes = total
+        self.logger.info(f"Evicted {evicted} snapshots, store now {total / 1024 ** 2:.1f} MB")
+
+    def snapshots(self) -> Iterator[Tuple[str, str]]:
+        """Yield (url, html) for every stored page, e.g. as a benchmark corpus"""
+        with self._lock:
+            rows = self._db.execute("SELECT url, digest FROM snapshots ORDER BY url").fetchall()
+        for url, digest in rows:
+            try:
+                with gzip.open(self._blob_path(digest), "rt", encoding="utf-8") as f:
+                    yield url, f.read()
+            except OSError:
+                continue
+
+    def stats(self) -> Dict:
+        with self._lock:
+            count = self._db.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+            size = self._stored_bytes()
+        return {"mode": self.mode, "pages": count, "bytes": size, "hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
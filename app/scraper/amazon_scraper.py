@@ -3,41 +3,161 @@ import time, random, logging
 from typing import List, Dict
 from urllib.parse import urljoin
 from app.database.database_manager import DBManager
+from app.database.category_tree import CategoryTreeStore
 from app.utils.logger import setup_logger
 from .CategoryScraper import CategoryScraper
 from .ProductScraper import ProductScraper
+from .BrowserPool import BrowserPool
+from .AsyncEngine import AsyncScrapeEngine
+from .SnapshotCache import SnapshotCache
+from .RoutePolicy import RoutePolicy
+from .RateLimiter import HostRateLimiter
+from .FreshnessPolicy import SKIP, FreshnessPolicy
+from .SeenProducts import SeenProducts
+from .EnrichmentCache import EnrichmentCache
 
 class AmazonScraper:
-    def __init__(self, headless: bool = True):
-        self.db_manager = DBManager()
-        self.category_scraper = CategoryScraper(self.db_manager, headless)
-        self.product_scraper = ProductScraper(self.db_manager, headless)
+    def __init__(self, headless: bool = True, concurrency: int = 1, browsers: int = 1, snapshot_mode: str = "off", block_resources: bool = True,
+                 max_requests_per_second: float = 1.0, cache_details: bool = True):
+        self.headless = headless
+        # concurrency > 1 scrapes product pages through the async engine
+        self.concurrency = concurrency
+        self.browsers = browsers
+        self.db_manager = DBManager(pool_name="scraper")
+        # "record"/"prefer"/"replay" route page loads through the on-disk snapshot store
+        self.snapshot_cache = SnapshotCache(mode=snapshot_mode) if snapshot_mode != "off" else None
+        # Abort images, fonts, media and trackers the extractors never read
+        self.route_policy = RoutePolicy() if block_resources else None
+        # Per-host pacing shared by every scraper; adapts to 503s and captchas
+        self.rate_limiter = HostRateLimiter(max_rate=max_requests_per_second)
+        # Detail-page fields per ASIN, so repeat crawls skip most product page loads
+        self.enrichment_cache = EnrichmentCache(self.db_manager) if cache_details else None
+        # One browser for the whole run, shared by both scrapers
+        self.browser_pool = BrowserPool(headless=headless, route_policy=self.route_policy)
+        # Versioned menu trees, so category runs within the TTL skip the browser
+        self.tree_store = CategoryTreeStore(self.db_manager)
+        self.category_scraper = CategoryScraper(self.db_manager, headless, browser_pool=self.browser_pool, snapshot_cache=self.snapshot_cache, rate_limiter=self.rate_limiter,
+                                                tree_store=self.tree_store)
+        self.product_scraper = ProductScraper(self.db_manager, headless, browser_pool=self.browser_pool, snapshot_cache=self.snapshot_cache, rate_limiter=self.rate_limiter,
+                                              enrichment_cache=self.enrichment_cache)
         self.logger = setup_logger(__name__)
+
+    def _scrape_products(self, categories: List[Dict], max_products: int, max_pages: int = 1, progress=None, refreshes: Dict = None) -> int:
+        """Scrape products for each category, concurrently when configured.
+
+        `progress`, if given, is told how many categories there are and is
+        called with each category and its saved product count as it finishes.
+        `refreshes` maps category ids to their CategoryRefresh in incremental
+        runs. A product listed in several categories is scraped once, in the
+        first. Returns the number of products saved.
+        """
+        refreshes = refreshes or {}
+        seen = SeenProducts()
+        if progress:
+            progress.categories_found(len(categories))
+        if self.concurrency > 1:
+            engine = AsyncScrapeEngine(
+                self.db_manager,
+                headless=self.headless,
+                browsers=self.browsers,
+                pages_per_browser=self.concurrency,
+                pages_per_host=self.concurrency,
+                snapshot_cache=self.snapshot_cache,
+                route_policy=self.route_policy,
+                rate_limiter=self.rate_limiter,
+                enrichment_cache=self.enrichment_cache,
+            )
+            total = engine.run(categories, max_products=max_products, max_pages=max_pages,
+                               on_category_done=progress.category_done if progress else None, refreshes=refreshes, seen=seen)
+            self.logger.info(f"Async engine saved {total} products for {len(categories)} categories, {seen.duplicates} duplicate cards dropped")
+            return total
+
+        total = 0
+        for category in categories:
+            print(f"Scraping products for category: {category['name']}") 
+            saved = self.product_scraper.scrape_products_and_save_to_database(
+                category_id=category['id'],
+                category_name=category['name'],
+                category_url=category['url'],
+                max_products=max_products,
+                max_pages=max_pages,
+                refresh=refreshes.get(category['id']),
+                seen=seen
+            )
+            total += saved
+            if progress:
+                progress.category_done(category, saved)
+            self.logger.info(f"Completed scraping for category: {category['name']}")
+        self.logger.info(f"Saved {total} products for {len(categories)} categories, {seen.duplicates} duplicate cards dropped")
+        return total
+
+    def close(self):
+        """Shut down the shared browser"""
+        self.browser_pool.close()
+        for host, limits in self.rate_limiter.stats().items():
+            self.logger.info(
+                f"Rate limiter {host}: {limits['requests']} requests, {limits['throttled']} throttled, "
+                f"{limits['waited_seconds']:.1f}s waited, ending at {limits['rate']:.2f} req/s"
+            )
+        if self.route_policy:
+            for kind, totals in self.route_policy.stats().items():
+                self.logger.info(
+                    f"Traffic on {kind} pages: {totals['pages']} pages, "
+                    f"{totals['allowed_per_page']:.0f} allowed / {totals['blocked_per_page']:.0f} blocked requests "
+                    f"and {totals['kb_per_page']:.0f} KB per page"
+                )
+        if self.enrichment_cache:
+            cache = self.enrichment_cache.stats()
+            self.logger.info(
+                f"Enrichment cache: {cache['hits']} hits, {cache['misses']} misses ({cache['expired']} expired), "
+                f"{cache['hit_rate']:.0%} hit rate, {cache['stored']} fields stored"
+            )
+        if self.snapshot_cache:
+            self.logger.info(f"Snapshot cache: {self.snapshot_cache.stats()}")
+            self.snapshot_cache.close()
+        pool = self.db_manager.pool_stats()
+        self.logger.info(
+            f"DB pool {pool['name']}: {pool['checkouts']} checkouts, {pool['waits']} waited "
+            f"(max {pool['max_wait_ms']:.0f} ms), {pool['connections_created']} connections created"
+        )
     
-    def run_full_scraping(self, max_categories: int = 5, max_subcategories: int = 10, max_products: int = 10):
-        """Complete workflow: scrape categories -> scrape products -> save to DB"""
+    def run_full_scraping(self, max_categories: int = 5, max_subcategories: int = 10, max_products: int = 10, max_pages: int = 1, progress=None,
+                          refresh_categories: bool = False) -> int:
+        """Complete workflow: scrape categories -> scrape products -> save to DB; returns products saved
+
+        The category tree comes from its cached snapshot while that is fresh;
+        `refresh_categories` reads the menu again regardless.
+        """
         print("Starting full workflow: categories -> products")
         
         
-        categories = self.category_scraper.scrape_and_save_categories(
-            max_categories=max_categories, 
-            max_subcategories=max_subcategories
-        )
+        if self.snapshot_cache and self.snapshot_cache.replay:
+            # The menu is interactive and cannot be replayed; reuse the stored tree or categories
+            snapshot = self.tree_store.latest(self.category_scraper.base_url)
+            if snapshot:
+                categories = self.category_scraper.save_categories(
+                    CategoryTreeStore.flatten(snapshot["tree"], max_categories, max_subcategories))
+            else:
+                categories = self.db_manager.get_all_categories()
+        else:
+            categories = self.category_scraper.scrape_and_save_categories(
+                max_categories=max_categories, 
+                max_subcategories=max_subcategories,
+                refresh=refresh_categories
+            )
         print(f"Scraped {len(categories)} categories")
         
         # 2. Scrape products for each category
-        for category in categories:
-            print(f"Scraping products for category: {category['name']}") 
-            self.product_scraper.scrape_products_and_save_to_database(
-               category_id=category['id'],
-                category_name=category['name'],
-                category_url=category['url'],
-                max_products=max_products
-            )
-            self.logger.info(f"Completed scraping for category: {category['name']}")
+        return self._scrape_products(categories, max_products, max_pages, progress)
     
-    def scrape_products_for_existing_categories(self, max_products: int = 10):
-        """Workflow 2: Get categories from DB -> scrape products"""
+    def scrape_products_for_existing_categories(self, max_products: int = 10, max_pages: int = 1, progress=None,
+                                                incremental: bool = False, freshness: FreshnessPolicy = None) -> int:
+        """Workflow 2: Get categories from DB -> scrape products
+
+        With `incremental`, the FreshnessPolicy skips recently visited
+        categories and those whose first results page has not changed, and
+        detail pages are fetched only for new or changed products.
+        """
         
         
         
@@ -46,15 +166,24 @@ class AmazonScraper:
         
         if not categories:
             print("No categories found in database. Run full workflow first.")
-            return
-        
+            return 0
         
+        if not incremental:
+            return self._scrape_products(categories, max_products, max_pages, progress)
+
+        freshness = freshness or FreshnessPolicy()
+        refreshes = {}
         for category in categories:
-            print(f"Scraping products for category: {category['name']}") 
-            self.product_scraper.scrape_products_and_save_to_database(
-                category_url=category['url'],   
-                category_name=category['name'],
-                category_id=category['id'],
-                max_products=max_products
-            )
-            self.logger.info(f"Completed scraping for category: {category['name']}")
\ No newline at end of file
+            decision = freshness.plan(category)
+            if decision != SKIP:
+                refreshes[category['id']] = freshness.refresh(self.db_manager, category, decision)
+        due = [category for category in categories if category['id'] in refreshes]
+        print(f"{len(due)} of {len(categories)} categories are due for a refresh")
+        total = self._scrape_products(due, max_products, max_pages, progress, refreshes)
+        stats = freshness.stats()
+        self.logger.info(
+            f"Incremental refresh: {stats['skip']} categories fresh, {stats['unchanged']} unchanged, "
+            f"{stats['changed']} changed, {stats['full']} scraped in full; "
+            f"{stats['details_skipped']} detail pages skipped, {stats['details_fetched']} fetched"
+        )
+        return total
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""Browser-free parsing of saved Amazon pages.
+
+The functions here take raw HTML (from `page.content()` or a file on disk) and
+return the same dicts as the live-DOM extractors, so extraction can run in a
+process pool, in benchmarks, or against fixtures without Chromium.
+
+    python -m app.scraper.html_parser saved_results_page.html
+"""
+import sys
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+from selectolax.lexbor import LexborHTMLParser
+from .parsing import CARD_ASIN_ATTRIBUTE, CARD_SELECTOR, CARD_FIELDS, MENU_ROOT_LABEL, NEXT_PAGE_SELECTOR, DETAIL_FIELDS, RawCard, build_product_data, build_detail_data
+
+
+def _read_node_fields(root, fields: Dict) -> Dict:
+    raw = {}
+    for field, (selector, attribute) in fields.items():
+        node = root.css_first(selector)
+        if node is None:
+            raw[field] = None
+        elif attribute:
+            raw[field] = node.attributes.get(attribute)
+        else:
+            raw[field] = node.text().strip()
+    return raw
+
+
+def parse_cards(html: str, limit: Optional[int] = None) -> List[RawCard]:
+    """Raw fields of the search result cards in a results page"""
+    cards = LexborHTMLParser(html).css(CARD_SELECTOR)
+    if limit is not None:
+        cards = cards[:limit]
+    return [dict(_read_node_fields(card, CARD_FIELDS), asin=card.attributes.get(CARD_ASIN_ATTRIBUTE)) for card in cards]
+
+
+def parse_products(html: str, base_url: str, category_name: str, category_id: int, max_products: Optional[int] = None) -> List[Dict]:
+    """Product dicts for a results page, matching ProductScraper._extract_product_data"""
+    products = []
+    for raw in parse_cards(html, max_products):
+        product_data = build_product_data(raw, base_url, category_name, category_id)
+        if product_data:
+            products.append(product_data)
+    return products
+
+
+def parse_next_page_url(html: str, base_url: str) -> Optional[str]:
+    """Absolute URL of the next results page, if the page has one"""
+    node = LexborHTMLParser(html).css_first(NEXT_PAGE_SELECTOR)
+    href = node.attributes.get("href") if node is not None else None
+    return urljoin(base_url, href) if href else None
+
+
+def parse_details(html: str) -> Dict:
+    """Detail-page fields (brand, ...) of a product page"""
+    return build_detail_data(_read_node_fields(LexborHTMLParser(html), DETAIL_FIELDS))
+
+
+def parse_menu_section(html: str, label: str, base_url: str) -> Optional[List[Dict[str, str]]]:
+    """Links of one hamburger menu section, filtered like CategoryScraper.extract_subcategories; None without the section"""
+    tree = LexborHTMLParser(html)
+    for section in tree.css("section[aria-labelledby]"):
+        if section.attributes.get("aria-labelledby") == label:
+            return _menu_links(section, base_url)
+    return None
+
+
+def parse_menu(html: str, base_url: str) -> Dict[str, List[Dict[str, str]]]:
+    """Every department section present in the menu DOM, keyed by department name"""
+    tree = LexborHTMLParser(html)
+    menu = {}
+    for section in tree.css("section[aria-labelledby]"):
+        label = section.attributes.get("aria-labelledby")
+        if label and label != MENU_ROOT_LABEL:
+            menu[label] = _menu_links(section, base_url)
+    return menu
+
+
+def _menu_links(section, base_url: str) -> List[Dict[str, str]]:
+    links = []
+    for node in section.css("a.hmenu-item"):
+        name = node.text().strip()
+        href = node.attributes.get("href")
+        if name and href and len(name) > 2:
+            links.append({"name": name, "url": urljoin(base_url, href)})
+    return links
+
+
+def parse_file(path: str, base_url: str = "https://www.amazon.com", category_name: str = "", category_id: int = 0) -> List[Dict]:
+    """Parse a saved results page from disk"""
+    with open(path, encoding="utf-8") as f:
+        return parse_products(f.read(), base_url, category_name, category_id)
+
+
+if __name__ == "__main__":
+    for path in sys.argv[1:]:
+        started = time.perf_counter()
+        products = parse_file(path)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"{path}: {len(products)} products in {elapsed:.1f} ms")
+        for product in products:
+            print(f"  {product['price']:>9.2f}  {product['rating']:.1f}  {product['title'][:70]}")
@@ -0,0 +1,276 @@
+import hashlib
+import json
+import re
+from typing import Dict, List, Optional, TypedDict
+from urllib.parse import unquote, urljoin, urlsplit
+
+# Link to the next results page
+NEXT_PAGE_SELECTOR = "a.s-pagination-next"
+
+# Search result card and the fields read from it: key -> (selector, attribute or None for text)
+CARD_SELECTOR = "[data-component-type='s-search-result']"
+CARD_FIELDS = {
+    "title": ("a h2 span", None),
+    "link": ("a.a-link-normal", "href"),
+    "price_text": (".a-price .a-offscreen", None),
+    "original_price_text": (".a-price.a-text-price .a-offscreen", None),
+    "rating_text": (".a-icon-alt", None),
+    "reviews_text": (".a-size-mini.puis-normal-weight-text.s-underline-text", None),
+    "image_url": (".s-image", "src"),
+    "availability_text": (".a-size-base.a-color-price", None),
+}
+
+# Attribute of the card element itself that holds the product's ASIN
+CARD_ASIN_ATTRIBUTE = "data-asin"
+
+# Amazon Standard Identification Number, and where product URLs carry it
+ASIN_PATTERN = re.compile(r"^[A-Z0-9]{10}$")
+ASIN_IN_URL = re.compile(r"/(?:dp|gp/product|gp/aw/d)/([A-Z0-9]{10})(?=[/?&#]|$)")
+
+
+class RawCard(TypedDict):
+    """Raw strings of one search result card, keyed like CARD_FIELDS"""
+    title: Optional[str]
+    link: Optional[str]
+    price_text: Optional[str]
+    original_price_text: Optional[str]
+    rating_text: Optional[str]
+    reviews_text: Optional[str]
+    image_url: Optional[str]
+    availability_text: Optional[str]
+    asin: Optional[str]
+
+
+# Reads every CARD_FIELDS entry of every card in a single page.evaluate round trip
+EXTRACT_CARDS_JS = """
+([cardSelector, fields, limit, asinAttribute]) => {
+    const cards = Array.from(document.querySelectorAll(cardSelector)).slice(0, limit);
+    return cards.map((card) => {
+        const raw = {asin: card.getAttribute(asinAttribute)};
+        for (const [field, [selector, attribute]] of Object.entries(fields)) {
+            const el = card.querySelector(selector);
+            raw[field] = !el ? null : attribute ? el.getAttribute(attribute) : el.textContent.trim();
+        }
+        return raw;
+    });
+}
+"""
+
+
+def extract_cards(page, limit: int) -> List[RawCard]:
+    """Collect the raw fields of up to `limit` result cards in one call"""
+    return page.evaluate(EXTRACT_CARDS_JS, [CARD_SELECTOR, CARD_FIELDS, limit, CARD_ASIN_ATTRIBUTE])
+
+
+async def extract_cards_async(page, limit: int) -> List[RawCard]:
+    """Async twin of extract_cards"""
+    return await page.evaluate(EXTRACT_CARDS_JS, [CARD_SELECTOR, CARD_FIELDS, limit, CARD_ASIN_ATTRIBUTE])
+
+
+# Label of the hamburger menu's department list; each department has its own section
+MENU_ROOT_LABEL = "Shop by Department"
+
+# Reads every rendered menu section's links in a single page.evaluate round trip
+EXTRACT_MENU_JS = """
+() => {
+    const sections = {};
+    for (const section of document.querySelectorAll('section[aria-labelledby]')) {
+        sections[section.getAttribute('aria-labelledby')] = Array.from(section.querySelectorAll('a.hmenu-item')).map(
+            (link) => ({name: link.textContent.trim(), href: link.getAttribute('href')})
+        );
+    }
+    return sections;
+}
+"""
+
+
+def extract_menu_sections(page) -> Dict[str, List[Dict]]:
+    """Raw {"name", "href"} links of every menu section in the DOM, keyed by section label"""
+    return page.evaluate(EXTRACT_MENU_JS)
+
+
+def menu_departments(sections: Dict[str, List[Dict]]) -> List[str]:
+    """Department names listed in the menu's root section"""
+    names = [link["name"] for link in sections.get(MENU_ROOT_LABEL, [])]
+    return [name for name in names if len(name) > 2 and name.lower() != "see all"]
+
+
+def menu_links(links: List[Dict], base_url: str) -> List[Dict[str, str]]:
+    """Absolute subcategory links of a section, without back buttons and other unnamed items"""
+    return [
+        {"name": link["name"], "url": urljoin(base_url, link["href"])}
+        for link in links
+        if link.get("name") and link.get("href") and len(link["name"]) > 2
+    ]
+
+
+def read_fields(root, fields: Dict) -> Dict:
+    """Read the raw text or attribute of each field below a Playwright element or page"""
+    raw = {}
+    for field, (selector, attribute) in fields.items():
+        element = root.query_selector(selector)
+        if not element:
+            raw[field] = None
+        elif attribute:
+            raw[field] = element.get_attribute(attribute)
+        else:
+            raw[field] = element.text_content().strip()
+    return raw
+
+
+async def read_fields_async(root, fields: Dict) -> Dict:
+    """Async twin of read_fields for playwright.async_api handles"""
+    raw = {}
+    for field, (selector, attribute) in fields.items():
+        element = await root.query_selector(selector)
+        if not element:
+            raw[field] = None
+        elif attribute:
+            raw[field] = await element.get_attribute(attribute)
+        else:
+            raw[field] = (await element.text_content()).strip()
+    return raw
+
+
+# Amazon's robot check replaces the requested page with this form
+CAPTCHA_SELECTOR = "form[action*='validateCaptcha']"
+
+
+def is_captcha_page(page) -> bool:
+    """Whether a loaded Playwright page is Amazon's robot check"""
+    try:
+        return "validateCaptcha" in page.url or page.query_selector(CAPTCHA_SELECTOR) is not None
+    except Exception:
+        return False
+
+
+async def is_captcha_page_async(page) -> bool:
+    """Async twin of is_captcha_page"""
+    try:
+        return "validateCaptcha" in page.url or await page.query_selector(CAPTCHA_SELECTOR) is not None
+    except Exception:
+        return False
+
+
+def clean_price(price_text: Optional[str]) -> float:
+    """Convert price string to numeric value"""
+    try:
+        # Remove dollar sign, commas, and any non-numeric characters except decimal point
+        cleaned = re.sub(r'[^\d.]', '', price_text or "")
+        return float(cleaned) if cleaned else 0.0
+    except ValueError:
+        return 0.0
+
+
+def parse_rating(rating_text: Optional[str]) -> float:
+    """Extract numeric rating from text like '4.5 out of 5 stars'"""
+    rating_match = re.search(r"(\d+(?:\.\d+)?)", rating_text or "")
+    return float(rating_match.group(1)) if rating_match else 0.0
+
+
+def parse_reviews_count(reviews_text: Optional[str]) -> int:
+    """Convert review text to number (e.g., "1,234" -> 1234)"""
+    digits = re.sub(r'[^\d]', '', reviews_text or "")
+    return int(digits) if digits else 0
+
+
+def discount_percent(current_price: float, original_price: float) -> int:
+    """Percentage saved against the original price"""
+    if original_price > 0 and original_price > current_price:
+        return int(((original_price - current_price) / original_price) * 100)
+    return 0
+
+
+def build_product_data(raw: RawCard, base_url: str, category_name: str, category_id: int) -> Optional[Dict]:
+    """Normalize the raw strings read from a search result card into a product dict"""
+    title = (raw.get("title") or "").strip()
+    if not title:
+        return None
+
+    product_link = raw.get("link")
+    if product_link:
+        product_link = urljoin(base_url, product_link.strip())
+    asin = extract_asin(raw.get("asin"), product_link)
+    product_link = canonical_product_url(base_url, asin) if asin else stable_link(product_link)
+
+    current_price = clean_price(raw.get("price_text"))
+    original_price = clean_price(raw.get("original_price_text")) if raw.get("original_price_text") else current_price
+    availability = (raw.get("availability_text") or "").strip()
+
+    return {
+        "category_id": category_id,
+        "category_name": category_name,
+        "title": title,
+        "brand": "Unknown",
+        "price": current_price,
+        "original_price": original_price,
+        "discount_percent": discount_percent(current_price, original_price),
+        "rating": parse_rating(raw.get("rating_text")),
+        "reviews_count": parse_reviews_count(raw.get("reviews_text")),
+        "product_link": product_link,
+        "asin": asin,
+        "image_url": raw.get("image_url"),
+        "availability": availability or "In Stock",
+    }
+
+
+def extract_asin(card_asin: Optional[str], product_link: Optional[str] = None) -> Optional[str]:
+    """ASIN from the card's data-asin, else from the /dp/ path of the (possibly redirecting) link"""
+    card_asin = (card_asin or "").strip().upper()
+    if ASIN_PATTERN.match(card_asin):
+        return card_asin
+    # Sponsored cards link through /sspa/click?...&url=%2Fdp%2F<ASIN>...
+    match = ASIN_IN_URL.search(unquote(product_link or ""))
+    return match.group(1) if match else None
+
+
+def canonical_product_url(base_url: str, asin: str) -> str:
+    """The one product URL stored for an ASIN"""
+    return urljoin(base_url, f"/dp/{asin}")
+
+
+def stable_link(product_link: Optional[str]) -> Optional[str]:
+    """Product link without the query string and /ref= segment that change on every visit"""
+    if not product_link:
+        return product_link
+    parts = urlsplit(product_link)
+    return f"{parts.scheme}://{parts.netloc}{re.sub(r'/ref=[^/]*$', '', parts.path)}"
+
+
+def results_fingerprint(products: List[Dict]) -> str:
+    """Hash of the listing order, prices and availability of a results page.
+
+    Ratings and review counts are left out: they tick up constantly and would
+    make every page look changed.
+    """
+    shown = [
+        [stable_link(p.get("product_link")), p.get("price"), p.get("original_price"), p.get("availability")]
+        for p in products
+    ]
+    return hashlib.sha256(json.dumps(shown).encode()).hexdigest()
+
+
+def clean_brand(byline_text: Optional[str]) -> str:
+    """Turn the product page byline into a brand name"""
+    brand = (byline_text or "").strip()
+    if len(brand) > 1:
+        return brand.replace("Brand: ", "").replace("Visit the ", "").replace(" Store", "").strip()
+    return "Unknown"
+
+
+# Product detail page fields filled in by the enrichment stage
+DETAIL_FIELDS = {
+    "brand": ("#bylineInfo", None),
+}
+
+# Seconds a cached detail field stays valid, per field of DETAIL_FIELDS
+DETAIL_FIELD_TTLS = {
+    "brand": 30 * 86400,
+}
+
+
+def build_detail_data(raw: Dict) -> Dict:
+    """Normalize the raw strings read from a product detail page"""
+    return {
+        "brand": clean_brand(raw.get("brand")),
+    }
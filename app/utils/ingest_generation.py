@@ -0,0 +1,21 @@
+"""Process-wide counter bumped whenever products are ingested.
+
+Caches of derived data (e.g. filtered product counts) store the generation
+they were computed at and treat themselves as stale once it moves on.
+"""
+import threading
+
+_lock = threading.Lock()
+_generation = 0
+
+
+def current() -> int:
+    return _generation
+
+
+def bump() -> int:
+    """Mark everything computed so far as stale and return the new generation"""
+    global _generation
+    with _lock:
+        _generation += 1
+        return _generation
@@ -0,0 +1,75 @@
+"""Compare bulk (single page.evaluate), per-element and offline HTML card extraction.
+
+Usage:
+    python -m benchmarks.extraction_benchmark --html saved_results_page.html
+    python -m benchmarks.extraction_benchmark --url "https://www.amazon.com/s?k=headphones"
+"""
+import argparse
+import time
+from pathlib import Path
+from app.scraper.BrowserPool import BrowserPool
+from app.scraper.html_parser import parse_products
+from app.scraper.parsing import CARD_SELECTOR, CARD_FIELDS, build_product_data, extract_cards, read_fields
+
+BASE_URL = "https://www.amazon.com"
+
+
+def bulk_extract(page, limit):
+    return [build_product_data(raw, BASE_URL, "bench", 0) for raw in extract_cards(page, limit)]
+
+
+def element_extract(page, limit):
+    cards = page.query_selector_all(CARD_SELECTOR)[:limit]
+    products = [build_product_data(read_fields(card, CARD_FIELDS), BASE_URL, "bench", 0) for card in cards]
+    for card in cards:
+        card.dispose()
+    return products
+
+
+def html_extract(html, limit):
+    return parse_products(html, BASE_URL, "bench", 0, limit)
+
+
+def time_runs(fn, page, limit, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        products = fn(page, limit)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return len(products), timings[len(timings) // 2], timings[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--html", help="Saved search results page")
+    source.add_argument("--url", help="Live search results URL")
+    parser.add_argument("--limit", type=int, default=60, help="Cards to extract per run")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    pool = BrowserPool(headless=True)
+    try:
+        with pool.page() as page:
+            if args.html:
+                page.set_content(Path(args.html).read_text(encoding="utf-8"), wait_until="domcontentloaded")
+            else:
+                page.goto(args.url, wait_until="load", timeout=60000)
+            page.wait_for_selector(CARD_SELECTOR, timeout=15000)
+
+            for name, fn in (("bulk", bulk_extract), ("element", element_extract)):
+                cards, median, best = time_runs(fn, page, args.limit, args.runs)
+                per_card = median / cards * 1000 if cards else 0.0
+                print(f"{name:8s} cards={cards:3d} median={median * 1000:8.2f} ms best={best * 1000:8.2f} ms per_card={per_card:6.3f} ms")
+
+            # Same page through the browser-free parser
+            cards, median, best = time_runs(html_extract, page.content(), args.limit, args.runs)
+            per_card = median / cards * 1000 if cards else 0.0
+            print(f"{'html':8s} cards={cards:3d} median={median * 1000:8.2f} ms best={best * 1000:8.2f} ms per_card={per_card:6.3f} ms")
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Re-parse every page in the snapshot store without a browser or network.
+
+Usage:
+    python -m benchmarks.replay_benchmark [--dir cache/snapshots]
+"""
+import argparse
+import time
+from app.scraper.SnapshotCache import SnapshotCache
+from app.scraper.html_parser import parse_details, parse_products
+
+BASE_URL = "https://www.amazon.com"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default=None, help="Snapshot store (defaults to SNAPSHOT_DIR or cache/snapshots)")
+    args = parser.parse_args()
+
+    cache = SnapshotCache(root=args.dir, mode="replay")
+    pages = products = 0
+    read_time = parse_time = 0.0
+    started = time.perf_counter()
+    try:
+        for url, html in cache.snapshots():
+            parse_started = time.perf_counter()
+            read_time += parse_started - started
+            found = parse_products(html, BASE_URL, "replay", 0)
+            if not found:
+                parse_details(html)
+            parse_time += time.perf_counter() - parse_started
+            pages += 1
+            products += len(found)
+            started = time.perf_counter()
+    finally:
+        cache.close()
+
+    rate = pages / parse_time if parse_time else 0.0
+    print(f"pages={pages} products={products} read={read_time:.2f}s parse={parse_time:.2f}s ({rate:.0f} pages/s)")
+
+
+if __name__ == "__main__":
+    main()
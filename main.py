@@ -1,15 +1,54 @@
-from fastapi import FastAPI
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.endpoints import products, categories, deals , scrape
+from app.api.endpoints import products, categories, deals , scrape, stats
+from app.api.response_cache import ResponseCacheMiddleware
+from app.database.async_database_manager import AsyncDBManager, DatabaseUnavailable
+from app.database.ingest_events import IngestListener
+from app.database.pool import close_pools
+from app.scraper.ScrapeJobs import ScrapeJobQueue
 import uvicorn
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Async pool for the read endpoints, opened once per worker
+    app.state.db = AsyncDBManager()
+    await app.state.db.start()
+    # Ingests by the scraper or other workers invalidate this worker's caches
+    app.state.ingest_listener = IngestListener(app.state.db.connection_params)
+    app.state.ingest_listener.start()
+    # Scrapes run on background workers, each keeping one browser warm
+    app.state.scrape_jobs = ScrapeJobQueue(workers=int(os.getenv("SCRAPE_WORKERS", 1)))
+    app.state.scrape_jobs.start()
+    try:
+        yield
+    finally:
+        await asyncio.to_thread(app.state.scrape_jobs.stop)
+        await app.state.ingest_listener.stop()
+        await app.state.db.close()
+        close_pools()
+
+
 app = FastAPI(
     title="Amazon Best Deals API",
     description="API for querying and filtering Amazon product deals",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+@app.exception_handler(DatabaseUnavailable)
+async def database_unavailable(request: Request, exc: DatabaseUnavailable):
+    # Not a 200, so the response cache does not keep it
+    return JSONResponse(status_code=503, content={"detail": f"Database unavailable while reading {exc}"})
+
+# Cached JSON for the read endpoints, invalidated by the ingest generation.
+# Added before CORS so cached responses still get CORS headers.
+app.add_middleware(ResponseCacheMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -17,6 +56,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 # Include routers
@@ -24,6 +64,7 @@ app.include_router(products.router, prefix="/api", tags=["products"])
 app.include_router(categories.router, prefix="/api", tags=["categories"])
 app.include_router(deals.router, prefix="/api", tags=["deals"])
 app.include_router(scrape.router, prefix="/api", tags=["scraping"])  
+app.include_router(stats.router, prefix="/api", tags=["stats"])
 
 
 